@@ -18,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from xPOURY4_recon.core.config_manager import config
 from xPOURY4_recon.core.logger import logger
 from xPOURY4_recon.core.recon_engine import ReconEngine
+from xPOURY4_recon.core.ct_index import CTIndex, iter_extract_names
 from xPOURY4_recon.web.app import create_app
 
 
@@ -41,6 +42,14 @@ async def run_cli_mode():
     
     recon_engine = ReconEngine()
     
+    try:
+        await run_cli_menu(recon_engine)
+    finally:
+        await recon_engine.close()
+
+
+async def run_cli_menu(recon_engine):
+    """Run the interactive CLI menu loop"""
     while True:
         print("\n🔍 xPOURY4 Recon - Main Menu")
         print("=" * 50)
@@ -337,11 +346,108 @@ def display_module_status(recon_engine):
     print("-" * 30)
     
     status = recon_engine.get_module_status()
+    budget_status = recon_engine.get_budget_status()
     
     for module, is_configured in status.items():
         status_icon = "✅" if is_configured else "⚠️ "
         status_text = "Ready" if is_configured else "Needs configuration"
         print(f"{status_icon} {module.upper()}: {status_text}")
+        for provider, budget in budget_status.get(module, {}).items():
+            print(f"    💳 {provider}: {budget['remaining']}/{budget['limit']} left (resets {budget['resets_at']})")
+
+
+async def run_github_bulk_mode(input_path: str, output_path: str = None, concurrency: int = None):
+    """Run bulk GitHub reconnaissance over a file of usernames"""
+    recon_engine = ReconEngine()
+    
+    try:
+        summary = await recon_engine.run_github_bulk_recon(
+            recon_engine.iter_targets(input_path, with_priority=True),
+            output_path=output_path,
+            concurrency=concurrency
+        )
+    finally:
+        await recon_engine.close()
+    
+    print(f"✅ Bulk GitHub reconnaissance completed in {summary['duration_seconds']}s")
+    print(f"👥 Users processed: {summary['total']}")
+    print(f"✅ Successful: {summary['successful']}")
+    print(f"❌ Failed: {summary['failed']}")
+    print(f"⏸️  Deferred (budget exhausted): {summary['deferred']}")
+    print(f"📄 Results: {summary['output_file']}")
+
+
+async def run_github_org_mode(org: str, output_path: str = None, concurrency: int = None):
+    """Run GitHub reconnaissance on every public member of an organization"""
+    recon_engine = ReconEngine()
+    
+    try:
+        summary = await recon_engine.run_github_org_recon(
+            org, output_path=output_path, concurrency=concurrency
+        )
+    finally:
+        await recon_engine.close()
+    
+    aggregate = summary['aggregate']
+    top_languages = list(aggregate['languages'])[:5]
+    print(f"✅ Organization reconnaissance completed in {summary['duration_seconds']}s")
+    print(f"👥 Members investigated: {aggregate['members_investigated']}")
+    print(f"📂 Repositories: {aggregate['total_repos']}")
+    print(f"⭐ Total Stars: {aggregate['total_stars']}")
+    print(f"💻 Top languages: {', '.join(top_languages) or 'N/A'}")
+    print(f"📧 Emails found: {len(aggregate['member_emails'])}")
+    print(f"📄 Results: {summary['output_file']}")
+
+
+async def run_shodan_bulk_mode(input_path: str, output_path: str = None, concurrency: int = None):
+    """Run Shodan host lookups over a file of IP addresses and CIDR blocks"""
+    recon_engine = ReconEngine()
+    
+    try:
+        summary = await recon_engine.run_shodan_bulk_recon(
+            recon_engine.iter_targets(input_path, with_priority=True),
+            output_path=output_path,
+            concurrency=concurrency
+        )
+    finally:
+        await recon_engine.close()
+    
+    aggregate = summary['aggregate']
+    top_ports = [str(port) for port in list(aggregate['ports'])[:10]]
+    print(f"✅ Bulk Shodan reconnaissance completed in {summary['duration_seconds']}s")
+    print(f"🖥️  Hosts looked up: {aggregate['hosts_investigated']} ({aggregate['hosts_skipped']} non-global skipped)")
+    print(f"✅ With Shodan data: {aggregate['hosts_found']}")
+    print(f"❌ Failed: {aggregate['hosts_failed']}")
+    print(f"🔌 Top ports: {', '.join(top_ports) or 'N/A'}")
+    print(f"🚨 Vulnerabilities: {aggregate['total_vulnerabilities']}")
+    print(f"📄 Results: {summary['output_file']}")
+
+
+async def run_shodan_search_mode(query: str, output_path: str = None, max_pages: int = None):
+    """Run a Shodan search query and stream its matches to NDJSON"""
+    recon_engine = ReconEngine()
+    
+    try:
+        summary = await recon_engine.run_shodan_search(query, output_path=output_path, max_pages=max_pages)
+    finally:
+        await recon_engine.close()
+    
+    top_ports = [str(port) for port in list(summary['facets']['port'])[:10]]
+    top_countries = list(summary['facets']['country'])[:5]
+    print(f"✅ Shodan search completed in {summary['duration_seconds']}s")
+    print(f"🔎 Total results: {summary['total']}")
+    print(f"📥 Matches fetched: {summary['matches_fetched']} ({summary['pages_fetched']} pages)")
+    print(f"🔌 Top ports: {', '.join(top_ports) or 'N/A'}")
+    print(f"🌍 Top countries: {', '.join(top_countries) or 'N/A'}")
+    print(f"📄 Results: {summary['output_file']}")
+
+
+def run_ct_import_mode(paths):
+    """Import Certificate Transparency extracts into the local subdomain index"""
+    index = CTIndex()
+    print(f"📥 Importing {len(paths)} extract(s) into {index.path}...")
+    count = index.import_names(iter_extract_names(paths))
+    print(f"✅ CT index now holds {count} names")
 
 
 def run_web_mode():
@@ -378,6 +484,13 @@ Examples:
   python main.py --web             # Run web interface
   python main.py --config          # Show configuration
   python main.py --version         # Show version
+  python main.py --github-bulk users.txt --output users.ndjson
+  python main.py --github-org my-org
+  python main.py --shodan-bulk ranges.txt --output hosts.ndjson
+  python main.py --shodan-bulk ranges.txt --cache-only
+  python main.py --shodan-search 'ssl.cert.subject.cn:*.example.com' --max-pages 5
+  python main.py --ct-import names.txt.gz
+  python main.py --active          # Also resolve, TLS-scan and HTTP-probe discovered subdomains
         """
     )
     
@@ -399,6 +512,67 @@ Examples:
         help='Show version and exit'
     )
     
+    parser.add_argument(
+        '--github-bulk',
+        metavar='FILE',
+        help='Profile every GitHub username in FILE (one per line as username[,priority], - for stdin)'
+    )
+    
+    parser.add_argument(
+        '--github-org',
+        metavar='ORG',
+        help='Profile every public member of a GitHub organization'
+    )
+    
+    parser.add_argument(
+        '--shodan-bulk',
+        metavar='FILE',
+        help='Look up every IP and CIDR block in FILE on Shodan (one per line as target[,priority], - for stdin)'
+    )
+    
+    parser.add_argument(
+        '--shodan-search',
+        metavar='QUERY',
+        help='Stream the matches of a Shodan search query (e.g. org:"Acme" port:3389)'
+    )
+    
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        help='Maximum number of Shodan search result pages to fetch (each costs a query credit)'
+    )
+    
+    parser.add_argument(
+        '--cache-only',
+        action='store_true',
+        help='Answer Shodan host lookups from the local host store only, without API calls'
+    )
+    
+    parser.add_argument(
+        '--active',
+        action='store_true',
+        help='Actively resolve, TLS-scan and HTTP-probe the subdomains found in domain reconnaissance'
+    )
+    
+    parser.add_argument(
+        '--ct-import',
+        metavar='FILE',
+        nargs='+',
+        help='Import host names from CT log extracts (plain or .gz, - for stdin) into the offline index'
+    )
+    
+    parser.add_argument(
+        '--output',
+        metavar='FILE',
+        help='NDJSON output file for bulk and search modes'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Number of concurrent workers for bulk modes'
+    )
+    
     args = parser.parse_args()
     
     if args.version:
@@ -410,6 +584,62 @@ Examples:
         display_configuration()
         return
     
+    if args.cache_only:
+        config.set("modules.shodan_recon.host_store.cache_only", True)
+    
+    if args.active:
+        config.set("modules.domain_recon.active", True)
+    
+    if args.github_bulk:
+        try:
+            asyncio.run(run_github_bulk_mode(args.github_bulk, args.output, args.concurrency))
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Bulk reconnaissance cancelled by user.")
+        except Exception as e:
+            logger.error(f"Bulk reconnaissance error: {e}")
+            print(f"❌ Bulk reconnaissance failed: {e}")
+        return
+    
+    if args.github_org:
+        try:
+            asyncio.run(run_github_org_mode(args.github_org, args.output, args.concurrency))
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Organization reconnaissance cancelled by user.")
+        except Exception as e:
+            logger.error(f"Organization reconnaissance error: {e}")
+            print(f"❌ Organization reconnaissance failed: {e}")
+        return
+    
+    if args.shodan_bulk:
+        try:
+            asyncio.run(run_shodan_bulk_mode(args.shodan_bulk, args.output, args.concurrency))
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Bulk reconnaissance cancelled by user.")
+        except Exception as e:
+            logger.error(f"Bulk reconnaissance error: {e}")
+            print(f"❌ Bulk reconnaissance failed: {e}")
+        return
+    
+    if args.shodan_search:
+        try:
+            asyncio.run(run_shodan_search_mode(args.shodan_search, args.output, args.max_pages))
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Shodan search cancelled by user.")
+        except Exception as e:
+            logger.error(f"Shodan search error: {e}")
+            print(f"❌ Shodan search failed: {e}")
+        return
+    
+    if args.ct_import:
+        try:
+            run_ct_import_mode(args.ct_import)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  CT index import cancelled by user.")
+        except Exception as e:
+            logger.error(f"CT index import error: {e}")
+            print(f"❌ CT index import failed: {e}")
+        return
+    
     if args.web:
         run_web_mode()
     else:
@@ -0,0 +1,59 @@
+"""
+Tests for the session handling of BaseReconModule without the engine's pool
+Author: xPOURY4
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from xPOURY4_recon.modules.base_module import BaseReconModule
+
+
+class LocalModule(BaseReconModule):
+    def __init__(self):
+        super().__init__("local_recon")
+
+    async def investigate(self, target, **kwargs):
+        async with self:
+            return self.format_result(True, [await self.make_request(url) for url in target.split()])
+
+    def is_configured(self):
+        return True
+
+
+def test_concurrent_investigations_share_the_owned_session():
+    async def fast(request):
+        return web.json_response({'path': 'fast'})
+
+    async def slow(request):
+        await asyncio.sleep(0.2)
+        return web.json_response({'path': 'slow'})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get('/fast', fast)
+        app.router.add_get('/slow', slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        module = LocalModule()
+        module.single_flight = None
+        try:
+            # The second investigation finishes while the first still has a request to make
+            results = await asyncio.gather(
+                module.investigate(f"http://127.0.0.1:{port}/slow http://127.0.0.1:{port}/fast"),
+                module.investigate(f"http://127.0.0.1:{port}/fast")
+            )
+            return results, module.session
+        finally:
+            await runner.cleanup()
+
+    results, session = asyncio.run(main())
+    assert [result['data'] for result in results] == [
+        [{'path': 'slow'}, {'path': 'fast'}], [{'path': 'fast'}]
+    ]
+    assert session is None
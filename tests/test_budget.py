@@ -0,0 +1,155 @@
+"""
+Tests for query budget accounting of module requests
+Author: xPOURY4
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from xPOURY4_recon.core import budget as budget_module
+from xPOURY4_recon.core.budget import BudgetManager
+from xPOURY4_recon.core.exceptions import BudgetExhausted
+from xPOURY4_recon.core.http_cache import ResponseCache
+from xPOURY4_recon.modules.base_module import BaseReconModule
+from xPOURY4_recon.modules.domain_recon import DomainRecon, SUBDOMAIN_SOURCES, SubdomainSource
+
+
+class LocalModule(BaseReconModule):
+    def __init__(self):
+        super().__init__("local_recon")
+
+    async def investigate(self, target, **kwargs):
+        return self.format_result(True, await self.make_request(target))
+
+    def is_configured(self):
+        return True
+
+
+def local_budget(tmp_path, **spec):
+    return BudgetManager(
+        budgets={'local': {'host': '127.0.0.1', 'limit': 100, 'period': 3600, **spec}},
+        path=str(tmp_path / "budget.sqlite3")
+    )
+
+
+def run_requests(routes, budget, paths, cache=None):
+    async def main():
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        module = LocalModule()
+        module.budget = budget
+        module.response_cache = cache
+        module.single_flight = None
+        try:
+            async with module:
+                return [await module.make_request(f"http://127.0.0.1:{port}{path}") for path in paths]
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_rate_limited_retries_are_charged_once(tmp_path):
+    calls = []
+
+    async def limited(request):
+        calls.append(request.path)
+        if len(calls) < 3:
+            return web.json_response({}, status=429, headers={'Retry-After': '0'})
+        return web.json_response({'ok': True})
+
+    budget = local_budget(tmp_path)
+    assert run_requests({'/limited': limited}, budget, ['/limited']) == [{'ok': True}]
+    assert len(calls) == 3
+    assert budget.used('local') == 1
+
+
+def test_not_modified_answers_are_refunded(tmp_path):
+    async def resource(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({'version': 1}, headers={'ETag': '"v1"'})
+
+    budget = local_budget(tmp_path)
+    cache = ResponseCache(path=str(tmp_path / "http_cache.sqlite3"))
+    results = run_requests({'/resource': resource}, budget, ['/resource', '/resource', '/resource'], cache)
+
+    assert results == [{'version': 1}] * 3
+    assert budget.used('local') == 1
+
+
+def test_budget_follows_rate_limit_headers(tmp_path):
+    async def counted(request):
+        return web.json_response({}, headers={
+            'X-RateLimit-Limit': '60', 'X-RateLimit-Remaining': '42',
+            'X-RateLimit-Reset': '0', 'X-RateLimit-Resource': 'core'
+        })
+
+    async def search(request):
+        return web.json_response({}, headers={
+            'X-RateLimit-Limit': '30', 'X-RateLimit-Remaining': '29',
+            'X-RateLimit-Reset': '0', 'X-RateLimit-Resource': 'search'
+        })
+
+    budget = local_budget(tmp_path, rate_limit_resource='core')
+    run_requests({'/counted': counted, '/search': search}, budget, ['/counted', '/search'])
+
+    # Headers about another resource leave the budget alone; the request
+    # itself is still charged on top of the 18 the provider reported
+    status = budget.status()['local']
+    assert status['limit'] == 60
+    assert status['used'] == 19
+
+
+class ConfigStub:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+@pytest.mark.parametrize("token, limit", [("", 60), ("ghp_token", 5000)])
+def test_github_limit_depends_on_token(monkeypatch, tmp_path, token, limit):
+    monkeypatch.setattr(budget_module, 'config', ConfigStub({'api_keys.github_token': token}))
+    budget = BudgetManager(budgets={}, path=str(tmp_path / "budget.sqlite3"))
+
+    assert budget.budgets['github']['limit'] == limit
+    assert budget.status('github_recon')['github']['remaining'] == limit
+
+
+def test_status_does_not_create_the_database(tmp_path):
+    budget = local_budget(tmp_path)
+
+    assert budget.status()['local']['used'] == 0
+    assert not (tmp_path / "budget.sqlite3").exists()
+
+
+def test_exhausted_domain_sources_defer_the_investigation(monkeypatch):
+    async def exhausted(*args, **kwargs):
+        raise BudgetExhausted('virustotal', 0)
+
+    async def found(module, domain):
+        return ["www.example.com"]
+
+    module = DomainRecon()
+    module.subdomain_sources = ['spent', 'free']
+    monkeypatch.setitem(SUBDOMAIN_SOURCES, 'spent', SubdomainSource(exhausted))
+    monkeypatch.setitem(SUBDOMAIN_SOURCES, 'free', SubdomainSource(found))
+
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(module._get_subdomains("example.com"))
+
+    module.virustotal_api_key = "key"
+    module.make_request = exhausted
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(module._get_domain_reputation("example.com"))
@@ -0,0 +1,88 @@
+"""
+Tests for the bulk worker pool of ReconEngine
+Author: xPOURY4
+"""
+
+import json
+import asyncio
+
+import pytest
+
+from xPOURY4_recon.core.recon_engine import ReconEngine
+
+
+@pytest.fixture
+def engine():
+    return ReconEngine()
+
+
+async def succeed(batch):
+    return [{'success': True, 'data': target, 'error': None} for target in batch]
+
+
+def run_bulk(engine, targets, handler, output, **kwargs):
+    # A hung pool would otherwise block the test run forever
+    return asyncio.run(asyncio.wait_for(
+        engine._run_bulk(targets, handler, str(output), **kwargs), timeout=10
+    ))
+
+
+def test_results_are_streamed_for_every_target(engine, tmp_path):
+    output = tmp_path / "out.ndjson"
+    summary = run_bulk(engine, (f"user{i}" for i in range(100)), succeed, output, concurrency=4)
+
+    assert summary['total'] == summary['successful'] == 100
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(line['target'] for line in lines) == sorted(f"user{i}" for i in range(100))
+
+
+def test_failing_result_callback_does_not_hang(engine, tmp_path):
+    def on_result(target, result):
+        raise RuntimeError("callback failed")
+
+    output = tmp_path / "out.ndjson"
+    summary = run_bulk(engine, (str(i) for i in range(1000)), succeed, output,
+                       concurrency=2, on_result=on_result)
+
+    assert summary['total'] == 1000
+    assert len(output.read_text().splitlines()) == 1000
+
+
+def test_dead_workers_cancel_the_producer(engine, tmp_path):
+    async def broken(batch):
+        return None
+
+    with pytest.raises(TypeError):
+        run_bulk(engine, (str(i) for i in range(1000)), broken, tmp_path / "out.ndjson", concurrency=2)
+
+
+def test_buffered_targets_run_by_priority(engine, tmp_path):
+    handled = []
+
+    async def record(batch):
+        handled.extend(batch)
+        return await succeed(batch)
+
+    targets = [("low1", 0), ("high1", 5), ("low2", 0), ("mid", 2), ("high2", 5)]
+    run_bulk(engine, iter(targets), record, tmp_path / "out.ndjson", concurrency=1)
+
+    assert handled == ["high1", "high2", "mid", "low1", "low2"]
+
+
+def test_target_file_priority_column(tmp_path):
+    path = tmp_path / "targets.txt"
+    path.write_text("# comment\nalice\nbob,3\n203.0.113.0/24, 7\ncarol,soon\n")
+
+    assert list(ReconEngine.iter_targets(str(path))) == ["alice", "bob,3", "203.0.113.0/24, 7", "carol,soon"]
+    assert list(ReconEngine.iter_targets(str(path), with_priority=True)) == [
+        ("alice", 0), ("bob", 3), ("203.0.113.0/24", 7), ("carol", 0)
+    ]
+
+
+def test_failing_input_is_raised(engine, tmp_path):
+    def targets():
+        yield "one"
+        raise OSError("input went away")
+
+    with pytest.raises(OSError):
+        run_bulk(engine, targets(), succeed, tmp_path / "out.ndjson", concurrency=2)
@@ -0,0 +1,80 @@
+"""
+Tests for building and querying the offline CT name index
+Author: xPOURY4
+"""
+
+import gzip
+
+import pytest
+
+from xPOURY4_recon.core.ct_index import CTIndex, iter_extract_names, normalise_name
+
+
+NAMES = [
+    "example.com", "www.example.com", "mail.example.com", "a.b.example.com",
+    "example-cdn.com", "www.example-cdn.com", "example.co", "notexample.com",
+    "example.com.evil.net", "www.example.org",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CTIndex(path=str(tmp_path / "ct_index.bin"), chunk_size=3)
+    yield index
+    index.close()
+
+
+def test_missing_index_is_empty(index):
+    assert not index.exists()
+    assert index.subdomains("example.com") == []
+
+
+def test_suffix_query_skips_sibling_labels(index):
+    assert index.import_names(NAMES) == len(NAMES)
+
+    assert index.subdomains("Example.COM.") == [
+        "example.com", "a.b.example.com", "mail.example.com", "www.example.com"
+    ]
+    assert index.subdomains("example-cdn.com") == ["example-cdn.com", "www.example-cdn.com"]
+    assert index.subdomains("b.example.com") == ["a.b.example.com"]
+    assert index.subdomains("example.net") == []
+
+
+def test_limit(index):
+    index.import_names(NAMES)
+
+    assert index.subdomains("example.com", limit=2) == ["example.com", "a.b.example.com"]
+
+
+def test_merge_and_replace(index):
+    index.import_names(["www.example.com", "mail.example.com"])
+
+    assert index.import_names(["api.example.com", "www.example.com"]) == 3
+    assert index.subdomains("example.com") == ["api.example.com", "mail.example.com", "www.example.com"]
+    assert index.import_names(["dev.example.com"], merge=False) == 1
+    assert index.subdomains("example.com") == ["dev.example.com"]
+
+
+def test_reader_remaps_after_reimport(index, tmp_path):
+    index.import_names(["www.example.com"])
+    reader = CTIndex(path=str(tmp_path / "ct_index.bin"))
+    try:
+        assert reader.subdomains("example.com") == ["www.example.com"]
+        index.import_names(["mail.example.com"])
+        assert reader.subdomains("example.com") == ["mail.example.com", "www.example.com"]
+        assert len(reader) == 2
+    finally:
+        reader.close()
+
+
+def test_extracts_are_normalised(tmp_path):
+    plain = tmp_path / "names.txt"
+    plain.write_text("# header\n*.Example.com, www.example.com.\n\"mail.example.com\" bad..name\n")
+    packed = tmp_path / "names.txt.gz"
+    with gzip.open(packed, 'wt') as handle:
+        handle.write("api.example.com\n")
+
+    assert list(iter_extract_names([str(plain), str(packed)])) == [
+        "example.com", "www.example.com", "mail.example.com", "api.example.com"
+    ]
+    assert normalise_name("localhost") is None
@@ -0,0 +1,192 @@
+"""
+Tests for the asyncio DNS resolver against a local stub server
+Author: xPOURY4
+"""
+
+import socket
+import struct
+import asyncio
+
+import pytest
+
+from xPOURY4_recon.core.dns_cache import DNSCache
+from xPOURY4_recon.core.dns_resolver import (
+    DNSResolver, RECORD_TYPES, RCODE_NXDOMAIN, build_query, parse_response
+)
+
+
+def encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split('.')) + b"\x00"
+
+
+def encode_record(name, rtype, ttl, rdata):
+    return encode_name(name) + struct.pack("!HHIH", rtype, 1, ttl, len(rdata)) + rdata
+
+
+def rdata_for(rtype, value):
+    if rtype == RECORD_TYPES['A']:
+        return socket.inet_aton(value)
+    if rtype == RECORD_TYPES['MX']:
+        preference, exchange = value
+        return struct.pack("!H", preference) + encode_name(exchange)
+    if rtype == RECORD_TYPES['TXT']:
+        return b"".join(bytes([len(part)]) + part.encode() for part in value)
+    raise ValueError(rtype)
+
+
+SOA = encode_name("ns.example.com") + encode_name("admin.example.com") + struct.pack(
+    "!IIIII", 1, 3600, 600, 86400, 60)
+
+
+class StubServer:
+    """Answers queries from a small zone; some names misbehave on purpose
+
+    big.example.com is answered truncated over UDP and in full over TCP.
+    When broken is set, every UDP answer claims a record it does not carry.
+    spoof.example.com first gets an answer to a different question.
+    """
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.zone = {
+            ("www.example.com", RECORD_TYPES['A']): ["192.0.2.1", "192.0.2.2"],
+            ("example.com", RECORD_TYPES['MX']): [(10, "mx1.example.com"), (20, "mx2.example.com")],
+            ("example.com", RECORD_TYPES['TXT']): [["v=spf1 ", "-all"]],
+            ("big.example.com", RECORD_TYPES['A']): [f"198.51.100.{i}" for i in range(1, 31)],
+            ("spoof.example.com", RECORD_TYPES['A']): ["192.0.2.9"],
+        }
+        self.udp_queries = 0
+        self.tcp_queries = 0
+
+    def answer(self, query, over_tcp=False):
+        txid, _, _, _, _, _ = struct.unpack("!HHHHHH", query[:12])
+        end = query.index(b"\x00", 12) + 1
+        labels, offset = [], 12
+        while query[offset]:
+            labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+            offset += 1 + query[offset]
+        name = ".".join(labels)
+        rtype = struct.unpack("!H", query[end:end + 2])[0]
+        question = query[12:end + 4]
+
+        if self.broken:
+            return struct.pack("!HHHHHH", txid, 0x8180, 1, 1, 0, 0) + question + encode_name(name) + b"\x00\x01"
+
+        values = self.zone.get((name, rtype))
+        if values is None:
+            flags = 0x8180 | (RCODE_NXDOMAIN if not any(key[0] == name for key in self.zone) else 0)
+            authority = encode_record("example.com", RECORD_TYPES['SOA'], 300, SOA)
+            return struct.pack("!HHHHHH", txid, flags, 1, 0, 1, 0) + question + authority
+        if name == "big.example.com" and not over_tcp:
+            return struct.pack("!HHHHHH", txid, 0x8380, 1, 0, 0, 0) + question
+
+        answers = b"".join(encode_record(name, rtype, 120, rdata_for(rtype, value)) for value in values)
+        return struct.pack("!HHHHHH", txid, 0x8180, 1, len(values), 0, 0) + question + answers
+
+    async def start(self):
+        server = self
+        loop = asyncio.get_running_loop()
+
+        class UDP(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                server.udp_queries += 1
+                if b"\x05spoof" in data:
+                    other = build_query(struct.unpack("!H", data[:2])[0], "other.example.com", 1)
+                    self.transport.sendto(server.answer(other), addr)
+                self.transport.sendto(server.answer(data), addr)
+
+        async def handle_tcp(reader, writer):
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+            server.tcp_queries += 1
+            response = self.answer(await reader.readexactly(length), over_tcp=True)
+            writer.write(struct.pack("!H", len(response)) + response)
+            await writer.drain()
+            writer.close()
+
+        self.udp, _ = await loop.create_datagram_endpoint(UDP, local_addr=("127.0.0.1", 0))
+        port = self.udp.get_extra_info('sockname')[1]
+        self.tcp = await asyncio.start_server(handle_tcp, "127.0.0.1", port)
+        return ("127.0.0.1", port)
+
+    def stop(self):
+        self.udp.close()
+        self.tcp.close()
+
+
+def run_against_stub(check, broken_first=False):
+    async def main():
+        servers = [StubServer(broken=True)] if broken_first else []
+        servers.append(StubServer())
+        addresses = [await server.start() for server in servers]
+        resolver = DNSResolver(servers=addresses, timeout=1, retries=2, cache=DNSCache())
+        try:
+            return await check(resolver, servers[-1])
+        finally:
+            await resolver.close()
+            for server in servers:
+                server.stop()
+
+    return asyncio.run(main())
+
+
+def test_a_records():
+    async def check(resolver, server):
+        return await resolver.query("www.example.com", "A")
+
+    assert run_against_stub(check) == ["192.0.2.1", "192.0.2.2"]
+
+
+def test_mx_and_txt_records():
+    async def check(resolver, server):
+        return await resolver.resolve("example.com", ("MX", "TXT"))
+
+    records = run_against_stub(check)
+    assert records['MX'] == ["10 mx1.example.com", "20 mx2.example.com"]
+    assert records['TXT'] == ["v=spf1 -all"]
+
+
+def test_nxdomain_is_cached_negatively():
+    async def check(resolver, server):
+        first = await resolver.query_with_status("missing.example.com", "A")
+        second = await resolver.query_with_status("missing.example.com", "A")
+        return first, second, server.udp_queries, resolver.cache.stats()
+
+    first, second, queries, stats = run_against_stub(check)
+    assert first == second == (RCODE_NXDOMAIN, [])
+    assert queries == 1
+    assert stats['negative_hits'] == 1
+
+
+def test_truncated_answer_is_repeated_over_tcp():
+    async def check(resolver, server):
+        return await resolver.query("big.example.com", "A"), server.tcp_queries
+
+    records, tcp_queries = run_against_stub(check)
+    assert len(records) == 30
+    assert tcp_queries == 1
+
+
+def test_malformed_answer_fails_over_to_next_server():
+    async def check(resolver, server):
+        return await resolver.query("www.example.com", "A")
+
+    assert run_against_stub(check, broken_first=True) == ["192.0.2.1", "192.0.2.2"]
+
+
+def test_answer_to_another_question_is_ignored():
+    async def check(resolver, server):
+        return await resolver.query("spoof.example.com", "A")
+
+    assert run_against_stub(check) == ["192.0.2.9"]
+
+
+def test_truncated_record_raises_value_error():
+    query = build_query(1, "www.example.com", RECORD_TYPES['A'])
+    question = query[12:query.index(b"\x00", 12) + 5]
+    message = struct.pack("!HHHHHH", 1, 0x8180, 1, 1, 0, 0) + question + encode_name("www.example.com") + b"\x00"
+
+    with pytest.raises(ValueError):
+        parse_response(message)
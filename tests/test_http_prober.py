@@ -0,0 +1,45 @@
+"""
+Tests for the favicon hash and failure handling of the HTTP prober
+Author: xPOURY4
+"""
+
+import base64
+import asyncio
+
+import pytest
+
+from xPOURY4_recon.core.exceptions import NetworkException
+from xPOURY4_recon.core.http_prober import HTTPProber, favicon_hash, murmur3_32
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", 0),
+    (b"foo", -156908512),
+    (b"hello", 613153351),
+    (b"The quick brown fox jumps over the lazy dog", 776992547),
+])
+def test_murmur3_matches_reference_values(data, expected):
+    assert murmur3_32(data) == expected
+
+
+def test_favicon_hash_uses_wrapped_base64():
+    icon = bytes(range(256)) * 3
+    encoded = base64.b64encode(icon)
+    wrapped = b"".join(encoded[i:i + 76] + b"\n" for i in range(0, len(encoded), 76))
+
+    assert favicon_hash(icon) == murmur3_32(wrapped) == 1836528006
+
+
+class FailingResolver:
+    async def query(self, name, record_type):
+        raise NetworkException(f"No DNS server answered for {name}")
+
+
+def test_unresolvable_hosts_are_recorded_as_errors():
+    prober = HTTPProber(resolver=FailingResolver(), concurrency=2, timeout=5)
+    report = asyncio.run(prober.probe_many(["a.example", "b.example"]))
+
+    assert report['serving'] == []
+    assert set(report['errors']) == {
+        f"{scheme}://{host}/" for scheme in ("http", "https") for host in ("a.example", "b.example")
+    }
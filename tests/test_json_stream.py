@@ -0,0 +1,68 @@
+"""
+Tests for incremental parsing of JSON arrays split across chunks
+Author: xPOURY4
+"""
+
+import json
+import asyncio
+
+import pytest
+
+from xPOURY4_recon.core.json_stream import iter_json_array
+
+
+DOCUMENT = json.dumps([
+    {"name_value": "a.example.com\nb.example.com", "id": 1},
+    "text with ] and [ and , inside",
+    "escaped \"quote\" and backslash \\",
+    ["nested", {"deep": [1, 2, 3]}],
+    12345.678,
+    -0.5e10,
+    True,
+    None,
+    "café ☃",
+], ensure_ascii=False).encode('utf-8')
+
+
+def parse(chunks, **kwargs):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def main():
+        return [element async for element in iter_json_array(source(), **kwargs)]
+
+    return asyncio.run(main())
+
+
+def test_every_split_point():
+    expected = json.loads(DOCUMENT)
+
+    for split in range(len(DOCUMENT) + 1):
+        assert parse([DOCUMENT[:split], DOCUMENT[split:]]) == expected, split
+
+
+def test_byte_by_byte_chunks():
+    assert parse([DOCUMENT[i:i + 1] for i in range(len(DOCUMENT))]) == json.loads(DOCUMENT)
+
+
+def test_number_at_chunk_boundary_is_not_cut():
+    assert parse([b"[1, 4.", b"5, 10", b"0]"]) == [1, 4.5, 100]
+
+
+def test_empty_array():
+    assert parse([b" [ ", b"] "]) == []
+
+
+def test_oversized_element_is_rejected():
+    chunks = [b'["'] + [b"x" * 100] * 20 + [b'"]']
+
+    with pytest.raises(ValueError, match="size limit"):
+        parse(chunks, max_element_size=1000)
+    assert parse(chunks, max_element_size=4096) == ["x" * 2000]
+
+
+@pytest.mark.parametrize("document", [b'{"a": 1}', b'[1, 2', b'["open'])
+def test_malformed_documents_raise(document):
+    with pytest.raises(ValueError):
+        parse([document])
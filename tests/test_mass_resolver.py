@@ -0,0 +1,34 @@
+"""
+Tests for how the mass resolver keeps and counts failed lookups
+Author: xPOURY4
+"""
+
+import asyncio
+
+from xPOURY4_recon.core.exceptions import NetworkException
+from xPOURY4_recon.core.mass_resolver import MassResolver
+
+
+class FailingResolver:
+    async def query_with_status(self, name, record_type):
+        raise NetworkException(f"No DNS server answered for {name}")
+
+
+def resolve(names, **kwargs):
+    resolver = MassResolver(FailingResolver(), concurrency=4)
+    resolver.MAX_UNRESOLVED = 5
+    return asyncio.run(resolver.resolve_all(names, "example.com", **kwargs))
+
+
+def test_unresolved_names_are_capped():
+    result = resolve(f"host{i}.example.com" for i in range(20))
+
+    assert len(result['unresolved']) == 5
+    assert result['statistics']['unresolved'] == 20
+
+
+def test_unresolved_names_can_be_counted_only():
+    result = resolve((f"host{i}.example.com" for i in range(20)), keep_unresolved=False)
+
+    assert result['unresolved'] == []
+    assert result['statistics']['unresolved'] == 20
@@ -0,0 +1,41 @@
+"""
+Tests for header-driven quotas of the rate limiter
+Author: xPOURY4
+"""
+
+import time
+
+from xPOURY4_recon.core.rate_limiter import RateLimiter
+
+
+def exhausted(resource):
+    return {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 60),
+            'X-RateLimit-Resource': resource}
+
+
+def test_github_resources_keep_separate_quotas():
+    limiter = RateLimiter(limits={})
+
+    assert limiter.update_from_response("https://api.github.com/graphql", 200, exhausted('graphql'))
+    assert limiter.get_bucket("api.github.com", "core").reserve() == 0
+    assert limiter.get_bucket("api.github.com", "graphql").reserve() > 0
+
+    limiter.update_from_response("https://api.github.com/users/octocat", 200, exhausted('core'))
+    assert limiter.get_bucket("api.github.com", "core").reserve() > 0
+    assert limiter.get_bucket("api.github.com", "search").reserve() == 0
+
+
+def test_headers_naming_another_resource_update_that_resource():
+    limiter = RateLimiter(limits={})
+
+    assert not limiter.update_from_response("https://api.github.com/users/octocat", 200, exhausted('search'))
+    assert limiter.get_bucket("api.github.com", "core").reserve() == 0
+    assert limiter.get_bucket("api.github.com", "search").reserve() > 0
+
+
+def test_other_hosts_share_one_bucket():
+    limiter = RateLimiter(limits={})
+
+    assert limiter.update_from_response("https://api.example.com/a", 429, exhausted('anything'))
+    assert RateLimiter.resource_of("https://api.example.com/b") is None
+    assert limiter.get_bucket("api.example.com").reserve() > 0
@@ -0,0 +1,102 @@
+"""
+Tests for the DER certificate parser and TLS verification
+Author: xPOURY4
+"""
+
+import ssl
+import asyncio
+import ipaddress
+from pathlib import Path
+
+import pytest
+
+from xPOURY4_recon.core.exceptions import NetworkException
+from xPOURY4_recon.core.tls_grabber import TLSGrabber, parse_certificate
+
+
+DATA = Path(__file__).parent / "data"
+CERTIFICATES = ["selfsigned.pem", "ec_longlived.pem"]
+
+
+def expected_fields(path):
+    """What the ssl module itself decodes from a certificate"""
+    decoded = ssl._ssl._test_decode_cert(str(path))
+    alt_names = []
+    for kind, value in decoded.get('subjectAltName', ()):
+        alt_names.append(str(ipaddress.ip_address(value)) if kind == 'IP Address' else value)
+    return {
+        'subject': {key: value for rdn in decoded['subject'] for key, value in rdn},
+        'issuer': {key: value for rdn in decoded['issuer'] for key, value in rdn},
+        'version': decoded['version'],
+        'serial_number': decoded['serialNumber'],
+        'not_before': decoded['notBefore'],
+        'not_after': decoded['notAfter'],
+        'subject_alt_names': alt_names
+    }
+
+
+@pytest.mark.parametrize("name", CERTIFICATES)
+def test_parser_matches_ssl_module(name):
+    path = DATA / name
+    der = ssl.PEM_cert_to_DER_cert(path.read_text())
+    parsed = parse_certificate(der)
+
+    for field, value in expected_fields(path).items():
+        assert parsed[field] == value, field
+
+
+def test_truncated_certificate_is_rejected():
+    der = ssl.PEM_cert_to_DER_cert((DATA / "selfsigned.pem").read_text())
+
+    with pytest.raises((ValueError, IndexError)):
+        parse_certificate(der[:len(der) // 2])
+
+
+def grab_from_local_server(trusted):
+    async def main():
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(DATA / "selfsigned.pem", DATA / "selfsigned.key")
+
+        async def handle(reader, writer):
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        grabber = TLSGrabber(timeout=5)
+        if trusted:
+            grabber._verified_context.load_verify_locations(DATA / "selfsigned.pem")
+        try:
+            return await grabber.grab("localhost", port, address="127.0.0.1", verify=True)
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_untrusted_certificate_is_reported_invalid():
+    info = grab_from_local_server(trusted=False)
+
+    assert info['subject']['commonName'] == "localhost"
+    assert info['valid'] is False
+    assert "self" in info['verification_error'] and "signed" in info['verification_error']
+
+
+def test_trusted_certificate_is_reported_valid():
+    info = grab_from_local_server(trusted=True)
+
+    assert info['valid'] is True
+    assert info['verification_error'] is None
+
+
+class FailingResolver:
+    async def query(self, name, record_type):
+        raise NetworkException(f"No DNS server answered for {name}")
+
+
+def test_unresolvable_endpoints_are_recorded_as_errors():
+    grabber = TLSGrabber(resolver=FailingResolver(), concurrency=1, timeout=5)
+    harvest = asyncio.run(grabber.grab_many(["a.example:443", "b.example:443"]))
+
+    assert harvest['certificates'] == {}
+    assert set(harvest['errors']) == {"a.example:443", "b.example:443"}
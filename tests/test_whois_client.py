@@ -0,0 +1,132 @@
+"""
+Tests for the asyncio WHOIS client against fake WHOIS servers
+Author: xPOURY4
+"""
+
+import asyncio
+
+import pytest
+
+from xPOURY4_recon.core.exceptions import NetworkException, ReconException
+from xPOURY4_recon.core.whois_client import WhoisClient, parse_whois
+
+
+class FakeWhoisServer:
+    """Port-43 server answering each query with respond(query)"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.queries = []
+
+    async def start(self):
+        async def handle(reader, writer):
+            query = (await reader.readline()).decode().strip()
+            self.queries.append(query)
+            writer.write(self.respond(query).encode())
+            await writer.drain()
+            writer.close()
+
+        self.server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return f"127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+
+REGISTRAR_RECORD = """Domain Name: EXAMPLE.TEST
+Registrar: Example Registrar, Inc.
+Creation Date: 1995-08-14T04:00:00Z
+Registrar Registration Expiration Date: 2030-08-13T04:00:00Z
+Registrant Organization: Example Org
+Registrant Country: US
+Registrant Email: Hostmaster@Example.test
+Name Server: NS1.EXAMPLE.TEST
+Name Server: NS2.EXAMPLE.TEST
+"""
+
+
+class FailingResolver:
+    async def query(self, name, record_type):
+        raise NetworkException(f"No DNS server answered for {name}")
+
+
+def run_lookups(check, registrar_name=None, resolver=None):
+    async def main():
+        registrar = FakeWhoisServer(lambda query: REGISTRAR_RECORD)
+        registrar_address = await registrar.start()
+        if registrar_name:
+            registrar_address = f"{registrar_name}:{registrar_address.rsplit(':', 1)[1]}"
+
+        def registry_answer(query):
+            if query == "missing.test":
+                return "No match for \"MISSING.TEST\".\r\n"
+            return (f"   Domain Name: {query.upper()}\r\n"
+                    f"   Registrar WHOIS Server: {registrar_address}\r\n"
+                    "   Creation Date: 1995-08-14T04:00:00Z\r\n"
+                    "   Domain Status: clientTransferProhibited https://icann.org/epp\r\n")
+
+        registry = FakeWhoisServer(registry_answer)
+        registry_address = await registry.start()
+        iana = FakeWhoisServer(lambda query: f"domain:       {query.upper()}\nrefer:        {registry_address}\n")
+        iana_address = await iana.start()
+
+        client = WhoisClient(resolver=resolver, timeout=5)
+        client.servers = {}
+        client.iana_server = iana_address
+        try:
+            return await check(client, iana, registry, registrar, registrar_address)
+        finally:
+            for server in (registrar, registry, iana):
+                server.server.close()
+
+    return asyncio.run(main())
+
+
+def test_referral_to_registrar_is_followed():
+    async def check(client, iana, registry, registrar, registrar_address):
+        return await client.lookup("Example.TEST."), registrar_address
+
+    record, registrar_address = run_lookups(check)
+    assert record['registrar'] == "Example Registrar, Inc."
+    assert record['creation_date'] == "1995-08-14 04:00:00"
+    assert record['expiration_date'] == "2030-08-13 04:00:00"
+    assert record['name_servers'] == ["ns1.example.test", "ns2.example.test"]
+    assert record['status'] == ["clientTransferProhibited"]
+    assert record['emails'] == ["hostmaster@example.test"]
+    assert record['whois_server'] == registrar_address
+
+
+def test_records_and_registry_servers_are_cached():
+    async def check(client, iana, registry, registrar, registrar_address):
+        first = await client.lookup("example.test")
+        first['registrar'] = "changed by the caller"
+        second = await client.lookup("example.test")
+        await asyncio.gather(*(client.lookup("other.test") for _ in range(5)))
+        return second, list(iana.queries), list(registry.queries)
+
+    second, iana_queries, registry_queries = run_lookups(check)
+    assert second['registrar'] == "Example Registrar, Inc."
+    assert iana_queries == ["test"]
+    assert registry_queries == ["example.test", "other.test"]
+
+
+def test_unresolvable_registrar_keeps_registry_record():
+    async def check(client, iana, registry, registrar, registrar_address):
+        return await client.lookup("example.test"), registrar_address
+
+    record, registrar_address = run_lookups(check, "whois.registrar.test", FailingResolver())
+    assert record['domain_name'] == "EXAMPLE.TEST"
+    assert record['creation_date'] == "1995-08-14 04:00:00"
+    assert record['registrar'] is None
+    assert record['referral_error'].startswith(registrar_address)
+
+
+def test_missing_domain_raises():
+    async def check(client, iana, registry, registrar, registrar_address):
+        with pytest.raises(ReconException):
+            await client.lookup("missing.test")
+
+    run_lookups(check)
+
+
+def test_indented_name_server_blocks_are_parsed():
+    record = parse_whois("Domain name:\n    example.uk\n\nName servers:\n    ns1.example.uk\n    ns2.example.uk  192.0.2.1\n")
+
+    assert record['name_servers'] == ["ns1.example.uk", "ns2.example.uk"]
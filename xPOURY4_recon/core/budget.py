@@ -0,0 +1,278 @@
+"""
+Query budget management for paid APIs in xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import time
+import heapq
+import asyncio
+import sqlite3
+import itertools
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+from .config_manager import config
+from .logger import logger
+from .exceptions import BudgetExhausted
+
+
+# Known provider quotas. period is in seconds, or "month" for calendar months
+# (UTC). path limits a budget to the endpoints that actually cost credits.
+# Without the credential, unauthenticated_limit applies instead of limit.
+# rate_limit_resource names the X-RateLimit-Resource whose headers keep the
+# budget in step with the provider's own count.
+DEFAULT_BUDGETS = {
+    "github": {"host": "api.github.com", "limit": 5000, "period": 3600, "module": "github_recon",
+               "credential": "api_keys.github_token", "unauthenticated_limit": 60,
+               "rate_limit_resource": "core"},
+    "shodan_query_credits": {"host": "api.shodan.io", "path": "/shodan/host/search", "limit": 100,
+                             "period": "month", "module": "shodan_recon"},
+    "virustotal": {"host": "www.virustotal.com", "limit": 500, "period": 86400, "module": "domain_recon"}
+}
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=0)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Issue the requests made inside the block (and tasks it starts) at a priority
+
+    Higher priorities are served first when requests queue for a budgeted
+    provider, and only priorities above zero may dip into a budget's reserve.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Gate:
+    """Priority-ordered turnstile for the requests of one provider"""
+
+    def __init__(self):
+        self.busy = False
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+
+class BudgetManager:
+    """Persistent per-provider quota accounting shared by all modules
+
+    Every request to a budgeted provider is counted against the current quota
+    window in a small SQLite database, so consumption carries over between
+    runs. Requests queue for a provider in priority order and hold their turn
+    until the rate limiter has cleared them, so when work piles up the most
+    important targets are served (and paid for) first. Once a budget is spent
+    requests raise BudgetExhausted until the window resets. The database is
+    opened on first use.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Dict[str, Any]]] = None, path: Optional[str] = None):
+        budgets = budgets if budgets is not None else config.get("settings.budget.providers", {}) or {}
+        self.budgets = {name: dict(spec) for name, spec in DEFAULT_BUDGETS.items()}
+        for name, spec in budgets.items():
+            self.budgets[name] = {**self.budgets.get(name, {}), **(spec or {})}
+        for spec in self.budgets.values():
+            if spec.get("credential") and not config.get(spec["credential"]) and "unauthenticated_limit" in spec:
+                spec["limit"] = spec["unauthenticated_limit"]
+
+        self.path = Path(path or config.get("settings.budget.path", "cache/budget.sqlite3"))
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self._gates: Dict[Tuple[asyncio.AbstractEventLoop, str], _Gate] = {}
+        self._sequence = itertools.count()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (call with the lock held)"""
+        if self._db is not None:
+            return self._db
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " provider TEXT NOT NULL,"
+            " window REAL NOT NULL,"
+            " used INTEGER NOT NULL,"
+            " PRIMARY KEY (provider, window))"
+        )
+        self._db.execute("DELETE FROM usage WHERE window < ?", (time.time() - 90 * 86400,))
+        self._db.commit()
+        return self._db
+
+    def providers_for(self, url: str) -> List[str]:
+        """Names of the budgets a request to this URL counts against"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        return [
+            name for name, spec in self.budgets.items()
+            if spec.get("host") == host and parsed.path.startswith(spec.get("path", ""))
+        ]
+
+    def window(self, provider: str, now: Optional[float] = None) -> Tuple[float, float]:
+        """Start and end (epoch seconds) of a provider's current quota window"""
+        now = time.time() if now is None else now
+        period = self.budgets[provider].get("period", 86400)
+        if period == "month":
+            moment = datetime.fromtimestamp(now, timezone.utc)
+            start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+            return start.timestamp(), end.timestamp()
+        start = now - now % period
+        return start, start + period
+
+    def used(self, provider: str) -> int:
+        """Requests counted against a provider in the current window"""
+        start, _ = self.window(provider)
+        with self._lock:
+            if self._db is None and not self.path.exists():
+                # Nothing was ever recorded; do not create the database just to read it
+                return 0
+            row = self._connect().execute(
+                "SELECT used FROM usage WHERE provider = ? AND window = ?", (provider, start)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, provider: str) -> int:
+        """Requests left for a provider in the current window"""
+        return max(0, self.budgets[provider].get("limit", 0) - self.used(provider))
+
+    def _check(self, provider: str, cost: int, priority: int):
+        spec = self.budgets[provider]
+        remaining = self.remaining(provider)
+        reserve = spec.get("reserve", 0) if priority <= 0 else 0
+        if remaining - cost < reserve:
+            _, end = self.window(provider)
+            logger.warning(f"Budget for {provider} exhausted ({remaining} left, priority {priority})")
+            raise BudgetExhausted(provider, end)
+
+    def _consume(self, provider: str, cost: int):
+        start, _ = self.window(provider)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR IGNORE INTO usage (provider, window, used) VALUES (?, ?, 0)", (provider, start)
+            )
+            self._db.execute(
+                "UPDATE usage SET used = MAX(0, used + ?) WHERE provider = ? AND window = ?", (cost, provider, start)
+            )
+            self._db.commit()
+
+    def refund(self, url: str, cost: int = 1):
+        """Give back the charge of a request the provider did not count (e.g. 304 Not Modified)"""
+        for provider in self.providers_for(url):
+            self._consume(provider, -cost)
+
+    def reconcile(self, url: str, headers: Mapping[str, str]) -> bool:
+        """Adopt the provider's own count from X-RateLimit-* response headers
+
+        Only budgets with a rate_limit_resource are reconciled, and only from
+        headers about that resource. Returns True if a budget was updated.
+        """
+        reconciled = False
+        for provider in self.providers_for(url):
+            spec = self.budgets[provider]
+            resource = spec.get("rate_limit_resource")
+            if not resource or headers.get("X-RateLimit-Resource", resource) != resource:
+                continue
+            try:
+                limit = int(headers["X-RateLimit-Limit"])
+                remaining = int(headers["X-RateLimit-Remaining"])
+            except (KeyError, ValueError):
+                continue
+
+            spec["limit"] = limit
+            start, _ = self.window(provider)
+            with self._lock:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO usage (provider, window, used) VALUES (?, ?, ?)",
+                    (provider, start, max(0, limit - remaining))
+                )
+                self._db.commit()
+            reconciled = True
+        return reconciled
+
+    def _gate(self, key: str) -> _Gate:
+        loop = asyncio.get_running_loop()
+        for stale in [k for k in self._gates if k[0].is_closed()]:
+            del self._gates[stale]
+        return self._gates.setdefault((loop, key), _Gate())
+
+    async def _enter(self, gate: _Gate, priority: int):
+        if not gate.busy:
+            gate.busy = True
+            return
+        turn = asyncio.get_running_loop().create_future()
+        heapq.heappush(gate.waiters, (-priority, next(self._sequence), turn))
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                # Our turn came as we were cancelled: hand it on
+                self._leave(gate)
+            raise
+
+    @staticmethod
+    def _leave(gate: _Gate):
+        while gate.waiters:
+            _, _, turn = heapq.heappop(gate.waiters)
+            if not turn.done():
+                turn.set_result(None)
+                return
+        gate.busy = False
+
+    @asynccontextmanager
+    async def slot(self, url: str, cost: int = 1, charge: bool = True) -> AsyncIterator[None]:
+        """Take a request's turn for its provider and charge its budget
+
+        The turn is held for the body of the block, which should wait for
+        the rate limiter. Raises BudgetExhausted when the budget is spent.
+        Retries of an already charged request pass charge=False, so they
+        keep their place in the queue without paying again.
+        """
+        providers = self.providers_for(url)
+        if not providers:
+            yield
+            return
+
+        priority = _priority.get()
+        gate = self._gate(",".join(providers))
+        await self._enter(gate, priority)
+        try:
+            if charge:
+                for provider in providers:
+                    self._check(provider, cost, priority)
+                for provider in providers:
+                    self._consume(provider, cost)
+            yield
+        finally:
+            self._leave(gate)
+
+    def status(self, module: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Limit, use and reset time of every budget (optionally only one module's)"""
+        status = {}
+        for name, spec in self.budgets.items():
+            if module is not None and spec.get("module") != module:
+                continue
+            _, end = self.window(name)
+            used = self.used(name)
+            status[name] = {
+                'limit': spec.get("limit", 0),
+                'used': used,
+                'remaining': max(0, spec.get("limit", 0) - used),
+                'period': spec.get("period", 86400),
+                'resets_at': datetime.fromtimestamp(end, timezone.utc).isoformat()
+            }
+        return status
+
+    def close(self):
+        """Close the underlying database (it reopens on next use)"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -49,21 +49,119 @@ class ConfigManager:
                 "timeout": 30,
                 "max_retries": 3,
                 "rate_limit_delay": 1.0,
+                "rate_limits": {
+                    "api.shodan.io": {"rate": 1.0, "burst": 1},
+                    "www.virustotal.com": {"rate": 0.0667, "burst": 4}
+                },
                 "output_format": "json",
                 "save_results": True,
-                "results_directory": "results"
+                "single_flight_ttl": 60,
+                "results_directory": "results",
+                "bulk_concurrency": 10,
+                "bulk_buffer_size": 1000,
+                "budget": {
+                    "enabled": True,
+                    "path": "cache/budget.sqlite3",
+                    "providers": {
+                        "github": {"host": "api.github.com", "limit": 5000, "period": 3600,
+                                   "module": "github_recon", "credential": "api_keys.github_token",
+                                   "unauthenticated_limit": 60, "rate_limit_resource": "core"},
+                        "shodan_query_credits": {"host": "api.shodan.io", "path": "/shodan/host/search",
+                                                 "limit": 100, "period": "month", "module": "shodan_recon"},
+                        "virustotal": {"host": "www.virustotal.com", "limit": 500, "period": 86400,
+                                       "module": "domain_recon"}
+                    }
+                },
+                "http_cache": {
+                    "enabled": True,
+                    "path": "cache/http_cache.sqlite3",
+                    "ttl": 604800,
+                    "max_size_mb": 256
+                },
+                "http_pool": {
+                    "limit": 100,
+                    "limit_per_host": 10,
+                    "keepalive_timeout": 60,
+                    "dns_cache_ttl": 300
+                }
             },
             "modules": {
                 "github_recon": {
                     "enabled": True,
+                    "backend": "rest",
+                    "graphql_batch_size": 20,
                     "include_repos": True,
                     "include_gists": True,
-                    "max_repos": 100
+                    "max_repos": 100,
+                    "max_gists": 50,
+                    "max_organizations": 100,
+                    "max_events": 20,
+                    "page_concurrency": 4,
+                    "section_timeout": 30
                 },
                 "domain_recon": {
                     "enabled": True,
-                    "subdomain_sources": ["crt.sh", "threatcrowd", "virustotal"],
-                    "dns_servers": ["8.8.8.8", "1.1.1.1"]
+                    "subdomain_sources": ["crt.sh", "threatcrowd", "virustotal", "ct_index"],
+                    "crtsh_max_subdomains": 100000,
+                    "ct_index": {
+                        "path": "cache/ct_index.bin",
+                        "sort_chunk_size": 1000000
+                    },
+                    "source_timeouts": {
+                        "crt.sh": 45,
+                        "threatcrowd": 15,
+                        "virustotal": 20
+                    },
+                    "dns_servers": ["8.8.8.8", "1.1.1.1"],
+                    "dns_timeout": 3.0,
+                    "dns_retries": 2,
+                    "dns_cache_size": 100000,
+                    "dns_negative_ttl": 300,
+                    "active": False,
+                    "resolve_subdomains": True,
+                    "resolve_concurrency": 1000,
+                    "wildcard_probes": 3,
+                    "whois": {
+                        "iana_server": "whois.iana.org",
+                        "servers": {},
+                        "timeout": 10,
+                        "cache_ttl": 86400,
+                        "referral_ttl": 604800,
+                        "per_server_concurrency": 2
+                    },
+                    "tls": {
+                        "enabled": True,
+                        "ports": [443],
+                        "concurrency": 200,
+                        "timeout": 10
+                    },
+                    "http_probe": {
+                        "enabled": True,
+                        "concurrency": 100,
+                        "per_host_concurrency": 2,
+                        "timeout": 10,
+                        "max_redirects": 5,
+                        "max_body_size": 1048576,
+                        "favicon": True
+                    },
+                    "bruteforce": {
+                        "enabled": False,
+                        "wordlist": None,
+                        "permutations": True,
+                        "qps": 2000,
+                        "max_candidates": 1000000
+                    },
+                    "phase_timeouts": {
+                        "whois": 30,
+                        "dns": 15,
+                        "subdomains": 60,
+                        "resolution": 120,
+                        "bruteforce": 600,
+                        "certificates": 180,
+                        "http_probe": 300,
+                        "ssl": 15,
+                        "reputation": 30
+                    }
                 },
                 "phone_recon": {
                     "enabled": True,
@@ -73,6 +171,22 @@ class ConfigManager:
                 "linkedin_recon": {
                     "enabled": True,
                     "auto_open_browser": True
+                },
+                "shodan_recon": {
+                    "enabled": True,
+                    "max_ips": 20,
+                    "host_concurrency": 4,
+                    "host_store": {
+                        "enabled": True,
+                        "path": "cache/shodan_hosts.sqlite3",
+                        "max_age": 604800,
+                        "recheck_interval": 86400,
+                        "cache_only": False
+                    },
+                    "search": {
+                        "max_pages": 10,
+                        "facets": ["port", "country", "org", "product"]
+                    }
                 }
             },
             "web_ui": {
@@ -0,0 +1,238 @@
+"""
+Offline Certificate Transparency name index for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import os
+import re
+import sys
+import gzip
+import mmap
+import heapq
+import shutil
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional
+
+from .config_manager import config
+from .logger import logger
+
+
+MAGIC = b'XPCTIDX1'
+HEADER = struct.Struct('<8sQ')
+OFFSET = struct.Struct('<Q')
+
+_VALID_NAME = re.compile(r'^[a-z0-9_-]+(\.[a-z0-9_-]+)+$')
+_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+def reverse_name(name: str) -> str:
+    """Turn www.example.com into com.example.www"""
+    return '.'.join(reversed(name.split('.')))
+
+
+def normalise_name(name: str) -> Optional[str]:
+    """Clean a host name from a CT extract; None if it is not usable"""
+    name = name.strip().strip('"\'').lower().rstrip('.')
+    while name.startswith('*.'):
+        name = name[2:]
+    return name if _VALID_NAME.match(name) else None
+
+
+def _open_text(path: str) -> IO[str]:
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='ignore')
+    return open(path, 'r', encoding='utf-8', errors='ignore')
+
+
+def iter_extract_names(paths: Iterable[str]) -> Iterator[str]:
+    """Read host names from plain or gzipped extracts, one or more per line"""
+    for path in paths:
+        handle = _open_text(path)
+        try:
+            for line in handle:
+                if line.startswith('#'):
+                    continue
+                for token in _SEPARATORS.split(line):
+                    name = normalise_name(token) if token else None
+                    if name:
+                        yield name
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+class CTIndex:
+    """Sorted, memory-mapped index of host names keyed by reversed labels
+
+    The index is a single file: a header with the entry count, a table of
+    little-endian offsets and the newline-separated keys (com.example.www).
+    Keys sort so that every name under a domain forms one contiguous range,
+    which is found by binary search over the memory-mapped offset table.
+    Imports use an external merge sort and replace the file atomically, so
+    extracts far larger than memory can be indexed while lookups continue.
+    """
+
+    def __init__(self, path: Optional[str] = None, chunk_size: Optional[int] = None):
+        self.path = Path(path or config.get("modules.domain_recon.ct_index.path", "cache/ct_index.bin"))
+        self.chunk_size = chunk_size or config.get("modules.domain_recon.ct_index.sort_chunk_size", 1000000)
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._stat = None
+        self._count = 0
+
+    def exists(self) -> bool:
+        """Whether an index has been built"""
+        return self.path.exists()
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def _open(self):
+        """Map the index file, remapping it if an import replaced it"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.close()
+            return
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._stat:
+            return
+        with self._lock:
+            self.close()
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                self.close()
+                raise ValueError(f"{self.path} is not a CT index")
+            self._stat = signature
+
+    def close(self):
+        """Unmap the index file"""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = self._stat = None
+        self._count = 0
+
+    def _key(self, i: int) -> bytes:
+        data_start = HEADER.size + OFFSET.size * self._count
+        start = data_start + OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * i)[0]
+        return self._map[start:self._map.find(b'\n', start)]
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def subdomains(self, domain: str, limit: Optional[int] = None) -> List[str]:
+        """All indexed names equal to or below a domain"""
+        self._open()
+        if self._map is None:
+            return []
+
+        domain = domain.strip().lower().rstrip('.')
+        key = reverse_name(domain).encode('ascii')
+        prefix = key + b'.'
+        names = []
+
+        i = self._lower_bound(key)
+        if i < self._count and self._key(i) == key:
+            names.append(domain)
+            i += 1
+        # '-' sorts before '.', so siblings like com.example-cdn can sit
+        # between the domain and its children; skip to the children's range
+        i = max(i, self._lower_bound(prefix))
+        while i < self._count and (limit is None or len(names) < limit):
+            candidate = self._key(i)
+            if not candidate.startswith(prefix):
+                break
+            names.append(reverse_name(candidate.decode('ascii')))
+            i += 1
+        return names
+
+    def _iter_keys(self) -> Iterator[str]:
+        self._open()
+        for i in range(self._count):
+            yield self._key(i).decode('ascii')
+
+    def import_names(self, names: Iterable[str], merge: bool = True) -> int:
+        """Add host names to the index and return the resulting entry count
+
+        Names are sorted in chunks of chunk_size into temporary runs, which
+        are merged (together with the current index when merge is set) into
+        a new index file that atomically replaces the old one.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=str(self.path.parent)) as workdir:
+            runs = []
+            chunk = set()
+            for name in names:
+                chunk.add(reverse_name(name))
+                if len(chunk) >= self.chunk_size:
+                    runs.append(self._write_run(workdir, len(runs), chunk))
+                    chunk = set()
+            if chunk:
+                runs.append(self._write_run(workdir, len(runs), chunk))
+            logger.info(f"CT index import sorted {len(runs)} runs")
+
+            handles = [open(run, 'r', encoding='ascii') for run in runs]
+            try:
+                streams = [(line.rstrip('\n') for line in handle) for handle in handles]
+                if merge and self.exists():
+                    streams.append(self._iter_keys())
+                count = self._write_index(workdir, heapq.merge(*streams))
+            finally:
+                for handle in handles:
+                    handle.close()
+
+        logger.info(f"CT index now holds {count} names")
+        return count
+
+    @staticmethod
+    def _write_run(workdir: str, number: int, keys: set) -> str:
+        path = os.path.join(workdir, f"run-{number:05d}")
+        with open(path, 'w', encoding='ascii') as handle:
+            for key in sorted(keys):
+                handle.write(key + '\n')
+        return path
+
+    def _write_index(self, workdir: str, keys: Iterator[str]) -> int:
+        data_path = os.path.join(workdir, 'data')
+        offsets_path = os.path.join(workdir, 'offsets')
+        count = 0
+        previous = None
+        position = 0
+        with open(data_path, 'wb') as data, open(offsets_path, 'wb') as offsets:
+            for key in keys:
+                if key == previous:
+                    continue
+                previous = key
+                encoded = key.encode('ascii') + b'\n'
+                offsets.write(OFFSET.pack(position))
+                data.write(encoded)
+                position += len(encoded)
+                count += 1
+
+        staging = os.path.join(workdir, 'index')
+        with open(staging, 'wb') as index:
+            index.write(HEADER.pack(MAGIC, count))
+            for part in (offsets_path, data_path):
+                with open(part, 'rb') as source:
+                    shutil.copyfileobj(source, index, 1024 * 1024)
+        # Unmap first: a mapped file cannot be replaced on every platform
+        self.close()
+        os.replace(staging, self.path)
+        return count
@@ -0,0 +1,113 @@
+"""
+Active subdomain discovery for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import re
+import itertools
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Set
+
+from .config_manager import config
+from .logger import logger
+from .mass_resolver import MassResolver
+
+
+# Words combined with discovered labels (dev-www, www-staging, dev.example.com)
+PERMUTATION_WORDS = (
+    'dev', 'development', 'staging', 'stage', 'test', 'qa', 'uat', 'prod',
+    'preprod', 'internal', 'admin', 'api', 'beta', 'old', 'new', 'v2'
+)
+
+_NUMBER = re.compile(r'\d+')
+
+
+def iter_wordlist(path: str) -> Iterator[str]:
+    """Read a wordlist lazily, skipping blank lines and comments"""
+    with Path(path).open('r', encoding='utf-8', errors='ignore') as handle:
+        for line in handle:
+            word = line.strip().lower().strip('.')
+            if word and not word.startswith('#'):
+                yield word
+
+
+def wordlist_candidates(words: Iterable[str], domain: str) -> Iterator[str]:
+    """Turn wordlist entries into names under the target domain"""
+    for word in words:
+        yield f"{word}.{domain}"
+
+
+def permutation_candidates(names: Iterable[str], domain: str,
+                           words: Iterable[str] = PERMUTATION_WORDS,
+                           number_range: int = 3) -> Iterator[str]:
+    """Generate permutations of already discovered names
+
+    For every name below the domain, the left-most label is combined with
+    each word as a prefix and a suffix (dev-www, www-staging), numbers in
+    the label are stepped up and down (web1 -> web2, web3), and each word
+    is tried as a sibling label in the same zone (dev.example.com).
+    """
+    words = list(words)
+    suffix = '.' + domain
+    zones_done: Set[str] = set()
+
+    for name in names:
+        if not name.endswith(suffix):
+            continue
+        label, zone = name.split('.', 1)
+
+        for word in words:
+            yield f"{word}-{label}.{zone}"
+            yield f"{label}-{word}.{zone}"
+
+        for match in _NUMBER.finditer(label):
+            number, width = int(match.group()), len(match.group())
+            for step in range(-number_range, number_range + 1):
+                if step and number + step >= 0:
+                    digits = str(number + step).zfill(width)
+                    yield f"{label[:match.start()]}{digits}{label[match.end():]}.{zone}"
+
+        if zone not in zones_done:
+            zones_done.add(zone)
+            for word in words:
+                yield f"{word}.{zone}"
+
+
+class DNSBruteForcer:
+    """Brute-force subdomains from a wordlist and from permutations
+
+    Candidates are produced lazily and fed straight into the mass resolver,
+    which paces lookups to the configured queries-per-second rate, skips
+    names that are already known and drops candidates that only hit a
+    wildcard record.
+    """
+
+    def __init__(self, mass_resolver: MassResolver, qps: Optional[float] = None,
+                 max_candidates: Optional[int] = None):
+        self.mass_resolver = mass_resolver
+        self.qps = qps or config.get("modules.domain_recon.bruteforce.qps", 2000)
+        self.max_candidates = max_candidates or config.get("modules.domain_recon.bruteforce.max_candidates", 1000000)
+
+    def candidates(self, domain: str, known: Iterable[str], wordlist: Optional[str] = None,
+                   permutations: bool = True) -> Iterator[str]:
+        """Chain wordlist and permutation candidates, capped at max_candidates"""
+        sources = []
+        if wordlist:
+            sources.append(wordlist_candidates(iter_wordlist(wordlist), domain))
+        if permutations:
+            sources.append(permutation_candidates(sorted(known), domain))
+        return itertools.islice(itertools.chain.from_iterable(sources), self.max_candidates)
+
+    async def run(self, domain: str, known: Set[str], wordlist: Optional[str] = None,
+                  permutations: bool = True) -> Dict[str, Any]:
+        """Resolve all candidates and return the live names found"""
+        domain = domain.lower()
+        known = {name.lower() for name in known}
+        logger.info(f"Brute-forcing subdomains of {domain} at up to {self.qps} queries/s")
+
+        result = await self.mass_resolver.resolve_all(
+            self.candidates(domain, known, wordlist, permutations), domain,
+            exclude=known, qps=self.qps, keep_dead=False, keep_wildcard=False, keep_unresolved=False
+        )
+        result['sources'] = {'wordlist': wordlist, 'permutations': permutations}
+        return result
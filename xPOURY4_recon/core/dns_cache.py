@@ -0,0 +1,76 @@
+"""
+Shared DNS answer cache for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config_manager import config
+
+
+class DNSCache:
+    """TTL-aware cache of DNS answers shared by every module
+
+    Positive answers live for the lowest TTL of their records. Empty answers
+    (NXDOMAIN or no records of the type) are cached negatively for the
+    zone's SOA minimum, capped at negative_ttl (RFC 2308). The least
+    recently used entries are dropped above max_size.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, negative_ttl: Optional[float] = None):
+        self.max_size = max_size or config.get("modules.domain_recon.dns_cache_size", 100000)
+        self.negative_ttl = negative_ttl if negative_ttl is not None else config.get(
+            "modules.domain_recon.dns_negative_ttl", 300)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, int, List[Any]]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str, rtype: int) -> Optional[Tuple[int, List[Any]]]:
+        """Get a cached (rcode, records) answer, or None if missing or expired"""
+        key = (name, rtype)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if not entry[2]:
+                    self.negative_hits += 1
+                return entry[1], list(entry[2])
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, name: str, rtype: int, rcode: int, records: List[Any],
+            ttl: Optional[float], soa_minimum: Optional[float] = None):
+        """Cache an answer for its TTL, or negatively for an empty answer"""
+        if not records:
+            ttl = min(soa_minimum or self.negative_ttl, self.negative_ttl)
+        if not ttl:
+            return
+
+        key = (name, rtype)
+        self._entries[key] = (time.monotonic() + ttl, rcode, list(records))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,393 @@
+"""
+Asynchronous DNS resolver for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import asyncio
+import random
+import socket
+import struct
+import time
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from .config_manager import config
+from .logger import logger
+from .exceptions import NetworkException
+from .single_flight import SingleFlight
+from .dns_cache import DNSCache
+
+
+RECORD_TYPES = {
+    'A': 1,
+    'NS': 2,
+    'CNAME': 5,
+    'SOA': 6,
+    'MX': 15,
+    'TXT': 16,
+    'AAAA': 28
+}
+RECORD_NAMES = {value: name for name, value in RECORD_TYPES.items()}
+
+RCODE_NOERROR = 0
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_REFUSED = 5
+
+
+class DNSResponse:
+    """Parsed DNS response message"""
+
+    def __init__(self, txid: int, rcode: int, truncated: bool,
+                 answers: List[Tuple[str, int, int, Any]],
+                 authority: List[Tuple[str, int, int, Any]],
+                 question: Optional[Tuple[str, int]] = None):
+        self.txid = txid
+        self.question = question
+        self.rcode = rcode
+        self.truncated = truncated
+        self.answers = answers
+        self.authority = authority
+
+    def records(self, record_type: int) -> List[Any]:
+        """Get answer values of one record type"""
+        return [value for _, rtype, _, value in self.answers if rtype == record_type]
+
+    def min_ttl(self, record_type: int) -> Optional[int]:
+        """Get the lowest TTL among answers of one record type"""
+        ttls = [ttl for _, rtype, ttl, _ in self.answers if rtype == record_type]
+        return min(ttls) if ttls else None
+
+    def negative_ttl(self) -> Optional[int]:
+        """Get the negative caching TTL from the authority SOA record (RFC 2308)"""
+        for _, rtype, ttl, value in self.authority:
+            if rtype == RECORD_TYPES['SOA']:
+                return min(ttl, value[-1])
+        return None
+
+
+def build_query(txid: int, name: str, record_type: int) -> bytes:
+    """Build a recursive DNS query with an EDNS0 OPT record"""
+    header = struct.pack("!HHHHHH", txid, 0x0100, 1, 0, 0, 1)
+    qname = b"".join(
+        bytes([len(label)]) + label
+        for label in (part.encode('idna') for part in name.rstrip('.').split('.') if part)
+    ) + b"\x00"
+    question = qname + struct.pack("!HH", record_type, 1)
+    # OPT pseudo-record advertising a 1232 byte UDP payload
+    opt = b"\x00" + struct.pack("!HHIH", 41, 1232, 0, 0)
+    return header + question + opt
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Read a possibly compressed domain name, returning it and the offset after it"""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if jumps > 64:
+                raise ValueError("Compression loop")
+            pointer = ((length & 0x3F) << 8) | data[offset + 1]
+            if end is None:
+                end = offset + 2
+            offset = pointer
+            jumps += 1
+        elif length == 0:
+            offset += 1
+            break
+        else:
+            labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+            offset += 1 + length
+    return ".".join(labels).lower(), end if end is not None else offset
+
+
+def _parse_rdata(data: bytes, offset: int, rtype: int, rdlength: int) -> Any:
+    """Decode the rdata of the record types we care about"""
+    rdata = data[offset:offset + rdlength]
+    if rtype == RECORD_TYPES['A']:
+        return socket.inet_ntop(socket.AF_INET, rdata)
+    if rtype == RECORD_TYPES['AAAA']:
+        return socket.inet_ntop(socket.AF_INET6, rdata)
+    if rtype in (RECORD_TYPES['NS'], RECORD_TYPES['CNAME']):
+        return _read_name(data, offset)[0]
+    if rtype == RECORD_TYPES['MX']:
+        preference = struct.unpack("!H", rdata[:2])[0]
+        return f"{preference} {_read_name(data, offset + 2)[0]}"
+    if rtype == RECORD_TYPES['TXT']:
+        strings = []
+        position = 0
+        while position < len(rdata):
+            length = rdata[position]
+            strings.append(rdata[position + 1:position + 1 + length].decode('utf-8', 'replace'))
+            position += 1 + length
+        return "".join(strings)
+    if rtype == RECORD_TYPES['SOA']:
+        mname, position = _read_name(data, offset)
+        rname, position = _read_name(data, position)
+        return (mname, rname) + struct.unpack("!IIIII", data[position:position + 20])
+    return rdata
+
+
+def read_question(data: bytes) -> Optional[Tuple[str, int]]:
+    """Get the (name, type) of a message's single question, or None if it has none or several"""
+    try:
+        if len(data) < 12 or struct.unpack("!H", data[4:6])[0] != 1:
+            return None
+        name, offset = _read_name(data, 12)
+        return name, struct.unpack("!H", data[offset:offset + 2])[0]
+    except (ValueError, struct.error, IndexError):
+        return None
+
+
+def parse_response(data: bytes) -> DNSResponse:
+    """Parse a DNS response message; raises ValueError if it is malformed or truncated"""
+    if len(data) < 12:
+        raise ValueError("Short DNS message")
+    try:
+        txid, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", data[:12])
+        offset = 12
+        for _ in range(qdcount):
+            _, offset = _read_name(data, offset)
+            offset += 4
+
+        sections = []
+        for count in (ancount, nscount):
+            records = []
+            for _ in range(count):
+                name, offset = _read_name(data, offset)
+                rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+                offset += 10
+                if offset + rdlength > len(data):
+                    raise ValueError("Truncated record data")
+                records.append((name, rtype, ttl, _parse_rdata(data, offset, rtype, rdlength)))
+                offset += rdlength
+            sections.append(records)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Malformed DNS message: {e}")
+
+    return DNSResponse(txid, flags & 0x000F, bool(flags & 0x0200), sections[0], sections[1],
+                       read_question(data))
+
+
+class _UDPChannel(asyncio.DatagramProtocol):
+    """Connected UDP socket to one DNS server, multiplexing queries by transaction ID
+
+    A datagram only answers a query if both its transaction ID and its
+    question match; anything else is dropped as stray or spoofed.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, Tuple[asyncio.Future, Optional[Tuple[str, int]]]] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # A large receive buffer avoids dropping bursts of answers
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            except OSError:
+                pass
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 12:
+            return
+        txid = struct.unpack("!H", data[:2])[0]
+        pending = self.pending.get(txid)
+        if pending is None or read_question(data) != pending[1]:
+            return
+        future = self.pending.pop(txid)[0]
+        if not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        self._fail_all(exc)
+
+    def connection_lost(self, exc):
+        self._fail_all(exc or ConnectionError("DNS socket closed"))
+
+    def _fail_all(self, exc: Exception):
+        pending, self.pending = self.pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    async def exchange(self, name: str, rtype: int, timeout: float) -> bytes:
+        """Send a query for a name and record type and wait for the matching response"""
+        txid = random.getrandbits(16)
+        while txid in self.pending:
+            txid = random.getrandbits(16)
+        query = build_query(txid, name, rtype)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[txid] = (future, read_question(query))
+        try:
+            self.transport.sendto(query)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(txid, None)
+
+
+class DNSResolver:
+    """Pure-asyncio stub resolver for the configured DNS servers
+
+    Queries go over UDP with one multiplexed socket per server, so thousands
+    of lookups can be in flight at once, falling back to TCP for truncated
+    answers. Queries are spread across the servers and retried on the next
+    server on timeout or SERVFAIL. Answers are kept in a DNSCache, which can
+    be shared so every module benefits from lookups made by the others.
+    """
+
+    def __init__(self, servers: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None, cache_size: Optional[int] = None,
+                 cache: Optional[DNSCache] = None):
+        servers = servers or config.get("modules.domain_recon.dns_servers", ["8.8.8.8", "1.1.1.1"])
+        self.servers = [self._parse_server(server) for server in servers]
+        self.timeout = timeout if timeout is not None else config.get("modules.domain_recon.dns_timeout", 3.0)
+        self.retries = retries if retries is not None else config.get("modules.domain_recon.dns_retries", 2)
+        self.cache = cache if cache is not None else DNSCache(cache_size)
+        self._channels: Dict[Tuple[asyncio.AbstractEventLoop, Tuple[str, int]], asyncio.Future] = {}
+        self._inflight = SingleFlight(ttl=0)
+        self._next_server = 0
+        self._down_until: Dict[Tuple[str, int], float] = {}
+
+    @staticmethod
+    def _parse_server(server: Any) -> Tuple[str, int]:
+        """Parse 'host', 'host:port', '[v6]:port' or a (host, port) tuple"""
+        if isinstance(server, (tuple, list)):
+            return str(server[0]), int(server[1])
+        server = str(server)
+        if server.startswith('['):
+            host, _, port = server[1:].partition(']')
+            return host, int(port.lstrip(':') or 53)
+        if server.count(':') == 1:
+            host, port = server.split(':')
+            return host, int(port)
+        return server, 53
+
+    async def query(self, name: str, record_type: str = 'A') -> List[Any]:
+        """Resolve one record type for a name; an empty list means no such records"""
+        rcode, records = await self.query_with_status(name, record_type)
+        return records
+
+    async def query_with_status(self, name: str, record_type: str = 'A') -> Tuple[int, List[Any]]:
+        """Resolve one record type and also return the response code (e.g. NXDOMAIN)"""
+        name = name.rstrip('.').lower()
+        rtype = RECORD_TYPES[record_type.upper()]
+        key = (name, rtype)
+
+        cached = self.cache.get(name, rtype)
+        if cached is not None:
+            return cached
+
+        rcode, records = await self._inflight.do(key, lambda: self._lookup(name, rtype))
+        return rcode, list(records)
+
+    async def resolve(self, name: str, record_types: Iterable[str] = ('A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME')
+                      ) -> Dict[str, List[Any]]:
+        """Resolve several record types for a name concurrently"""
+        record_types = list(record_types)
+        outcomes = await asyncio.gather(
+            *(self.query(name, record_type) for record_type in record_types), return_exceptions=True
+        )
+        records = {}
+        for record_type, outcome in zip(record_types, outcomes):
+            if isinstance(outcome, Exception):
+                logger.debug(f"DNS {record_type} lookup failed for {name}: {outcome}")
+                records[record_type] = []
+            else:
+                records[record_type] = outcome
+        return records
+
+    async def _lookup(self, name: str, rtype: int) -> Tuple[int, List[Any]]:
+        """Query the servers in turn until one gives a usable answer"""
+        last_error: Optional[Exception] = None
+        start = self._next_server
+        self._next_server = (self._next_server + 1) % len(self.servers)
+
+        # Rotate through the servers, trying ones that recently refused us last
+        now = time.monotonic()
+        order = [self.servers[(start + i) % len(self.servers)] for i in range(len(self.servers))]
+        order.sort(key=lambda server: self._down_until.get(server, 0) > now)
+
+        for attempt in range(self.retries + 1):
+            server = order[attempt % len(order)]
+            try:
+                response = await self._exchange_udp(server, name, rtype)
+                if response.truncated:
+                    response = await self._exchange_tcp(server, name, rtype)
+            except OSError as e:
+                # Unreachable server: skip it for a while
+                self._down_until[server] = time.monotonic() + 30
+                last_error = e
+                continue
+            except (asyncio.TimeoutError, ValueError) as e:
+                last_error = e
+                continue
+
+            if response.rcode in (RCODE_SERVFAIL, RCODE_REFUSED):
+                last_error = NetworkException(f"DNS server {server[0]} returned rcode {response.rcode}")
+                continue
+
+            records = response.records(rtype)
+            self.cache.put(name, rtype, response.rcode, records, response.min_ttl(rtype), response.negative_ttl())
+            return response.rcode, records
+
+        raise NetworkException(
+            f"DNS query for {name} ({RECORD_NAMES.get(rtype, rtype)}) failed: {str(last_error) or 'timed out'}"
+        )
+
+    async def _get_channel(self, server: Tuple[str, int]) -> _UDPChannel:
+        """Get (or open) the UDP channel to a server for the running event loop"""
+        loop = asyncio.get_running_loop()
+        key = (loop, server)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = loop.create_task(self._open_channel(loop, server))
+            self._channels[key] = channel
+        try:
+            protocol = await asyncio.shield(channel)
+        except Exception:
+            self._channels.pop(key, None)
+            raise
+        if protocol.transport is None or protocol.transport.is_closing():
+            self._channels.pop(key, None)
+            return await self._get_channel(server)
+        return protocol
+
+    @staticmethod
+    async def _open_channel(loop: asyncio.AbstractEventLoop, server: Tuple[str, int]) -> _UDPChannel:
+        _, protocol = await loop.create_datagram_endpoint(_UDPChannel, remote_addr=server)
+        return protocol
+
+    async def _exchange_udp(self, server: Tuple[str, int], name: str, rtype: int) -> DNSResponse:
+        channel = await self._get_channel(server)
+        data = await channel.exchange(name, rtype, self.timeout)
+        return parse_response(data)
+
+    async def _exchange_tcp(self, server: Tuple[str, int], name: str, rtype: int) -> DNSResponse:
+        """Repeat a query over TCP after a truncated UDP answer"""
+        txid = random.getrandbits(16)
+        query = build_query(txid, name, rtype)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*server), self.timeout)
+        try:
+            writer.write(struct.pack("!H", len(query)) + query)
+            await writer.drain()
+            length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            response = parse_response(await asyncio.wait_for(reader.readexactly(length), self.timeout))
+            if response.txid != txid or response.question != read_question(query):
+                raise ValueError("DNS response does not match the query")
+            return response
+        finally:
+            writer.close()
+
+    async def close(self):
+        """Close the UDP channels opened on the running event loop"""
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._channels if key[0] is loop or key[0].is_closed()]:
+            channel = self._channels.pop(key)
+            if channel.done() and not channel.cancelled() and channel.exception() is None:
+                channel.result().transport.close()
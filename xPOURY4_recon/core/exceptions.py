@@ -3,6 +3,8 @@ Custom exceptions for xPOURY4 Recon
 Author: xPOURY4
 """
 
+from datetime import datetime, timezone
+
 
 class ReconException(Exception):
     """Base exception for all reconnaissance operations"""
@@ -29,4 +31,13 @@ class ConfigurationException(ReconException):
 
 class NetworkException(ReconException):
     """Exception raised when network operations fail"""
-    pass 
\ No newline at end of file
+    pass
+
+
+class BudgetExhausted(ReconException):
+    """Exception raised when a provider's query budget is spent for the current window"""
+    def __init__(self, provider: str, resets_at: float):
+        self.provider = provider
+        self.resets_at = resets_at
+        reset = datetime.fromtimestamp(resets_at, timezone.utc).isoformat()
+        super().__init__(f"deferred: budget exhausted for {provider} until {reset}")
@@ -0,0 +1,108 @@
+"""
+Persistent Shodan host store for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from .config_manager import config
+
+
+def parse_last_update(value: Optional[str]) -> Optional[float]:
+    """Turn Shodan's last_update (UTC, e.g. 2024-05-01T12:34:56.123456) into a timestamp"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value.rstrip('Z'))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class HostStore:
+    """On-disk store of normalised Shodan host records keyed by IP
+
+    A record is fresh while the scan data it holds (Shodan's last_update) is
+    younger than max_age. Records without a last_update, such as history or
+    "no information" answers, age from the moment they were fetched. A stale
+    record is not fetched again within recheck_interval of the last fetch,
+    because Shodan usually has nothing newer until it rescans the host.
+    The database is opened on first use.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age: Optional[float] = None,
+                 recheck_interval: Optional[float] = None):
+        self.path = Path(path or config.get("modules.shodan_recon.host_store.path", "cache/shodan_hosts.sqlite3"))
+        self.max_age = max_age if max_age is not None else config.get(
+            "modules.shodan_recon.host_store.max_age", 604800)
+        self.recheck_interval = recheck_interval if recheck_interval is not None else config.get(
+            "modules.shodan_recon.host_store.recheck_interval", 86400)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (call with the lock held)"""
+        if self._db is not None:
+            return self._db
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS hosts ("
+            " ip TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " last_update REAL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (ip, kind))"
+        )
+        self._db.commit()
+        return self._db
+
+    def get(self, kind: str, ip: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Get a stored (record, fresh) pair, or None if the IP was never stored"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT record, last_update, fetched_at FROM hosts WHERE ip = ? AND kind = ?", (ip, kind)
+            ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        record, last_update, fetched_at = json.loads(row[0]), row[1], row[2]
+        fresh = now - (last_update or fetched_at) <= self.max_age or now - fetched_at < self.recheck_interval
+        return record, fresh
+
+    def put(self, kind: str, ip: str, record: Dict[str, Any]):
+        """Store the latest record fetched for an IP"""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO hosts (ip, kind, record, last_update, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (ip, kind, json.dumps(record, default=str), parse_last_update(record.get('last_update')), time.time())
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(DISTINCT ip) FROM hosts").fetchone()[0]
+
+    def clear(self):
+        """Remove all stored records"""
+        with self._lock:
+            self._connect().execute("DELETE FROM hosts")
+            self._db.commit()
+
+    def close(self):
+        """Close the underlying database (it reopens on next use)"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,208 @@
+"""
+Conditional-request HTTP response cache for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .config_manager import config
+from .logger import logger
+
+
+class ResponseCache:
+    """Persistent on-disk cache of API responses and their validators
+
+    Responses carrying an ETag or Last-Modified header are stored together
+    with their body so later requests can be sent as conditional requests.
+    A 304 Not Modified answer is then served from disk. Entries expire after
+    a TTL and the least recently used ones are evicted above a size cap.
+    The database is opened on first use, and access times of cache hits are
+    written in batches rather than on every hit.
+    """
+    
+    # Request headers that never change the response and are left out of keys
+    UNKEYED_HEADERS = ('if-none-match', 'if-modified-since', 'user-agent')
+    
+    # Number of cache hits whose access times are buffered before being written
+    ACCESS_FLUSH_SIZE = 256
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_size_mb: Optional[float] = None):
+        self.path = Path(path or config.get("settings.http_cache.path", "cache/http_cache.sqlite3"))
+        self.ttl = ttl if ttl is not None else config.get("settings.http_cache.ttl", 604800)
+        max_size_mb = max_size_mb if max_size_mb is not None else config.get("settings.http_cache.max_size_mb", 256)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._size = 0
+        self._accessed: Dict[str, float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (call with the lock held)"""
+        if self._db is not None:
+            return self._db
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " body TEXT NOT NULL,"
+            " headers TEXT,"
+            " size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(responses)")]
+        if 'headers' not in columns:
+            self._db.execute("ALTER TABLE responses ADD COLUMN headers TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self._db
+
+    @classmethod
+    def make_key(cls, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None) -> str:
+        """Build a cache key from method, URL, query parameters and request headers
+
+        Headers such as Authorization or Accept select what the server sends
+        back, so responses fetched with different ones are kept apart. The key
+        is a digest, so credentials are never stored in the clear.
+        """
+        varying = sorted(
+            (name.lower(), str(value)) for name, value in (headers or {}).items()
+            if name.lower() not in cls.UNKEYED_HEADERS
+        )
+        raw = json.dumps([method.upper(), url, sorted((params or {}).items()), varying], default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached entry, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT etag, last_modified, body, headers, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[4] > self.ttl:
+                self._delete(key)
+                db.commit()
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                db.commit()
+
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'body': row[2],
+            'headers': json.loads(row[3]) if row[3] else {}
+        }
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Build conditional request headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str], body: str,
+            headers: Optional[Dict[str, str]] = None):
+        """Store a response body with its validators and selected headers"""
+        if not etag and not last_modified:
+            return
+
+        size = len(body.encode('utf-8'))
+        if size > self.max_size:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._connect()
+            self._flush_access()
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO responses (key, etag, last_modified, body, headers, size, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, body, json.dumps(headers or {}), size, now, now)
+            )
+            self._size += size
+            if self._size > self.max_size:
+                self._evict()
+            self._db.commit()
+
+    def touch(self, key: str):
+        """Mark an entry as revalidated by the server"""
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._connect().execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key)
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._accessed.clear()
+            self._connect().execute("DELETE FROM responses")
+            self._db.commit()
+            self._size = 0
+
+    def close(self):
+        """Write pending access times and close the database (it reopens on next use)"""
+        with self._lock:
+            if self._db is None:
+                return
+            self._flush_access()
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def _flush_access(self):
+        """Write buffered access times of cache hits"""
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _delete(self, key: str):
+        self._accessed.pop(key, None)
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= row[0]
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under the size cap"""
+        self._db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl,))
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        target = int(self.max_size * 0.9)
+        if self._size > target:
+            evicted = 0
+            for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ).fetchall():
+                if self._size <= target:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                evicted += 1
+            logger.debug(f"Response cache evicted {evicted} entries")
@@ -0,0 +1,68 @@
+"""
+Shared HTTP client pool for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import asyncio
+from typing import Dict
+
+import aiohttp
+
+from .config_manager import config
+from .logger import logger
+
+
+class HTTPClientPool:
+    """Process-wide pooled HTTP client shared by all reconnaissance modules
+
+    A single TCPConnector keeps connections alive between calls so repeated
+    requests to the same API reuse TCP and TLS sessions. aiohttp sessions are
+    bound to the event loop that created them, so one session is kept per loop.
+    """
+
+    def __init__(self):
+        self.timeout = config.get("settings.timeout", 30)
+        self.limit = config.get("settings.http_pool.limit", 100)
+        self.limit_per_host = config.get("settings.http_pool.limit_per_host", 10)
+        self.keepalive_timeout = config.get("settings.http_pool.keepalive_timeout", 60)
+        self.dns_cache_ttl = config.get("settings.http_pool.dns_cache_ttl", 300)
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session backed by a keep-alive connector"""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': 'xPOURY4-Recon/1.0.0'}
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+
+        # Forget sessions whose event loop has gone away
+        for stale_loop in [l for l in self._sessions if l.is_closed()]:
+            del self._sessions[stale_loop]
+
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+            logger.debug("Created pooled HTTP session")
+
+        return session
+
+    async def close(self):
+        """Close the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+            logger.debug("Closed pooled HTTP session")
@@ -0,0 +1,274 @@
+"""
+Asynchronous HTTP liveness and fingerprint probing for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import re
+import html
+import time
+import base64
+import socket
+import struct
+import asyncio
+import hashlib
+from typing import Dict, Any, Iterable, List, Optional
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from yarl import URL
+
+from .config_manager import config
+from .logger import logger
+from .exceptions import ReconException
+
+
+SCHEMES = ('https', 'http')
+
+_TITLE = re.compile(rb'<title[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+_ICON_LINK = re.compile(rb'<link\b[^>]*\brel=["\']?[^"\'>]*icon[^>]*>', re.IGNORECASE)
+_HREF = re.compile(rb'\bhref=["\']?([^"\'\s>]+)', re.IGNORECASE)
+_CHARSET = re.compile(r'charset=([\w-]+)', re.IGNORECASE)
+
+
+def murmur3_32(data: bytes, seed: int = 0) -> int:
+    """MurmurHash3 (x86, 32 bit) as a signed int, matching mmh3.hash()"""
+    mask = 0xFFFFFFFF
+    h = seed & mask
+    rounded = len(data) & ~3
+    for (k,) in struct.iter_unpack('<I', data[:rounded]):
+        k = (k * 0xCC9E2D51) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * 0x1B873593) & mask
+        h = ((h << 13) | (h >> 19)) & mask
+        h = (h * 5 + 0xE6546B64) & mask
+
+    tail = data[rounded:]
+    if tail:
+        k = int.from_bytes(tail, 'little')
+        k = (k * 0xCC9E2D51) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        h ^= (k * 0x1B873593) & mask
+
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & mask
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & mask
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def favicon_hash(content: bytes) -> int:
+    """Shodan-style favicon hash (http.favicon.hash): mmh3 of the base64 encoded icon"""
+    return murmur3_32(base64.encodebytes(content))
+
+
+def extract_title(body: bytes, content_type: str = '') -> Optional[str]:
+    """Get the HTML title of a page, if it has one"""
+    match = _TITLE.search(body)
+    if not match:
+        return None
+    charset = _CHARSET.search(content_type or '')
+    try:
+        title = match.group(1).decode(charset.group(1) if charset else 'utf-8', errors='replace')
+    except LookupError:
+        title = match.group(1).decode('utf-8', errors='replace')
+    return ' '.join(html.unescape(title).split())[:256] or None
+
+
+class _AddressResolver(AbstractResolver):
+    """aiohttp resolver answering from known addresses, then the shared DNS resolver"""
+
+    def __init__(self, addresses: Dict[str, str], resolver: Any = None):
+        self.addresses = addresses
+        self.resolver = resolver
+        self._fallback = aiohttp.DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+        address = self.addresses.get(host)
+        if address is None and self.resolver is not None:
+            found = await self.resolver.query(host, 'A') or await self.resolver.query(host, 'AAAA')
+            if not found:
+                raise OSError(f"{host} does not resolve")
+            address = found[0]
+        if address is None:
+            return await self._fallback.resolve(host, port, family)
+
+        address_family = socket.AF_INET6 if ':' in address else socket.AF_INET
+        return [{'hostname': host, 'host': address, 'port': port, 'family': address_family,
+                 'proto': 0, 'flags': socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        await self._fallback.close()
+
+
+class HTTPProber:
+    """Probe many hosts over HTTP and HTTPS and fingerprint what they serve
+
+    Every host is fetched on both schemes at once over a dedicated keep-alive
+    connection pool, following redirects by hand so the chain is recorded.
+    A global cap bounds the requests in flight and a per-host cap keeps us
+    from hammering any single server. Body and favicon hashes let hosts
+    serving the same application be clustered together.
+    """
+
+    def __init__(self, resolver: Any = None, concurrency: Optional[int] = None,
+                 per_host_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 max_redirects: Optional[int] = None, max_body_size: Optional[int] = None,
+                 favicon: Optional[bool] = None):
+        self.resolver = resolver
+        self.concurrency = concurrency or config.get("modules.domain_recon.http_probe.concurrency", 100)
+        self.per_host_concurrency = per_host_concurrency or config.get(
+            "modules.domain_recon.http_probe.per_host_concurrency", 2)
+        self.timeout = timeout or config.get("modules.domain_recon.http_probe.timeout", 10)
+        self.max_redirects = max_redirects if max_redirects is not None else config.get(
+            "modules.domain_recon.http_probe.max_redirects", 5)
+        self.max_body_size = max_body_size or config.get("modules.domain_recon.http_probe.max_body_size", 1048576)
+        self.favicon = favicon if favicon is not None else config.get("modules.domain_recon.http_probe.favicon", True)
+
+    def _create_session(self, addresses: Dict[str, str]) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host_concurrency,
+            ssl=False,
+            resolver=_AddressResolver(addresses, self.resolver)
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': 'xPOURY4-Recon/1.0.0'}
+        )
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: URL) -> Dict[str, Any]:
+        """GET a URL, following redirects by hand; return the final response details"""
+        redirects = []
+        for _ in range(self.max_redirects + 1):
+            async with session.get(url, allow_redirects=False) as response:
+                location = response.headers.get('Location')
+                if response.status in (301, 302, 303, 307, 308) and location:
+                    redirects.append({'url': str(url), 'status': response.status, 'location': location})
+                    url = url.join(URL(location))
+                    continue
+
+                body = b''
+                truncated = False
+                while len(body) < self.max_body_size:
+                    chunk = await response.content.read(min(65536, self.max_body_size - len(body)))
+                    if not chunk:
+                        break
+                    body += chunk
+                else:
+                    truncated = not response.content.at_eof()
+
+                content_type = response.headers.get('Content-Type', '')
+                length = response.headers.get('Content-Length', '')
+                return {
+                    'url': str(url),
+                    'status': response.status,
+                    'title': extract_title(body, content_type),
+                    'server': response.headers.get('Server'),
+                    'content_type': content_type or None,
+                    'content_length': int(length) if length.isdigit() else len(body),
+                    'body_sha256': hashlib.sha256(body).hexdigest(),
+                    'body_truncated': truncated,
+                    'redirects': redirects,
+                    '_body': body
+                }
+        raise ValueError(f"More than {self.max_redirects} redirects")
+
+    async def _fetch_favicon(self, session: aiohttp.ClientSession, page: Dict[str, Any]) -> Optional[int]:
+        """Hash the icon a page links to, or /favicon.ico of its origin"""
+        page_url = URL(page['url'])
+        icon_url = page_url.join(URL('/favicon.ico'))
+        link = _ICON_LINK.search(page['_body'])
+        href = _HREF.search(link.group(0)) if link else None
+        if href and not href.group(1).startswith(b'data:'):
+            icon_url = page_url.join(URL(html.unescape(href.group(1).decode('utf-8', errors='ignore'))))
+
+        async with session.get(icon_url) as response:
+            if response.status != 200:
+                return None
+            content = await response.content.read(self.max_body_size)
+        return favicon_hash(content) if content else None
+
+    async def probe(self, session: aiohttp.ClientSession, host: str, limit: asyncio.Semaphore,
+                    host_limit: asyncio.Semaphore, errors: Dict[str, str]) -> Dict[str, Any]:
+        """Probe one host on both schemes; the caps are shared by the caller"""
+        url_host = f"[{host}]" if ':' in host else host
+
+        async def fetch(scheme: str) -> Optional[Dict[str, Any]]:
+            url = URL(f"{scheme}://{url_host}/", encoded=True)
+            async with limit, host_limit:
+                try:
+                    return await self._fetch(session, url)
+                except asyncio.TimeoutError:
+                    errors[str(url)] = f"Timed out after {self.timeout}s"
+                except (aiohttp.ClientError, OSError, ValueError, ReconException) as e:
+                    errors[str(url)] = str(e) or type(e).__name__
+            return None
+
+        responses = dict(zip(SCHEMES, await asyncio.gather(*(fetch(scheme) for scheme in SCHEMES))))
+        result: Dict[str, Any] = {scheme: response for scheme, response in responses.items() if response}
+
+        served = [response for response in result.values() if response['status'] < 400] or list(result.values())
+        if served and self.favicon:
+            async with limit, host_limit:
+                try:
+                    result['favicon_hash'] = await self._fetch_favicon(session, served[0])
+                except (asyncio.TimeoutError, aiohttp.ClientError, OSError, ValueError, ReconException) as e:
+                    logger.debug(f"Favicon fetch failed for {host}: {e}")
+        for response in result.values():
+            if isinstance(response, dict):
+                response.pop('_body', None)
+        return result
+
+    async def probe_many(self, hosts: Iterable[str], addresses: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Probe many hosts concurrently and cluster them by body and favicon hash
+
+        addresses optionally maps host names to already resolved addresses,
+        which are used instead of looking the names up again.
+        """
+        started = time.monotonic()
+        results: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        limit = asyncio.Semaphore(self.concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        pending = iter(dict.fromkeys(host.strip().lower().rstrip('.') for host in hosts if host.strip()))
+
+        async with self._create_session(dict(addresses or {})) as session:
+            async def worker():
+                for host in pending:
+                    host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+                    results[host] = await self.probe(session, host, limit, host_limit, errors)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        serving = sorted(host for host, result in results.items() if any(
+            scheme in result for scheme in SCHEMES))
+        logger.info(f"{len(serving)} of {len(results)} hosts are serving HTTP")
+
+        body_clusters: Dict[str, List[str]] = {}
+        favicon_clusters: Dict[str, List[str]] = {}
+        for host in serving:
+            digests = {results[host][scheme]['body_sha256'] for scheme in SCHEMES if scheme in results[host]}
+            for digest in digests:
+                body_clusters.setdefault(digest, []).append(host)
+            if results[host].get('favicon_hash') is not None:
+                favicon_clusters.setdefault(str(results[host]['favicon_hash']), []).append(host)
+
+        return {
+            'hosts': {host: results[host] for host in serving},
+            'serving': serving,
+            'errors': dict(sorted(errors.items())),
+            'clusters': {
+                'body': {digest: members for digest, members in body_clusters.items() if len(members) > 1},
+                'favicon': {digest: members for digest, members in favicon_clusters.items() if len(members) > 1}
+            },
+            'statistics': {
+                'hosts': len(results),
+                'serving': len(serving),
+                'responses': sum(scheme in results[host] for host in serving for scheme in SCHEMES),
+                'failed': len(errors),
+                'duration': round(time.monotonic() - started, 3)
+            }
+        }
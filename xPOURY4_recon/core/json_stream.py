@@ -0,0 +1,81 @@
+"""
+Incremental JSON parsing for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import json
+import codecs
+from typing import Any, AsyncIterable, AsyncIterator
+
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes], max_element_size: int = 1024 * 1024
+                          ) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array as its bytes arrive
+
+    Only the element being decoded is held in memory, so arbitrarily large
+    arrays can be consumed with a small, bounded buffer. Raises ValueError
+    if the document is not an array, is truncated, or contains an element
+    larger than max_element_size characters.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+
+    try:
+        async for chunk in chunks:
+            buffer = buffer[pos:] + utf8.decode(chunk)
+            pos = 0
+
+            while not finished:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos >= len(buffer):
+                    break
+
+                char = buffer[pos]
+                if not started:
+                    if char != '[':
+                        raise ValueError("Expected a JSON array")
+                    started = True
+                    pos += 1
+                    continue
+                if char == ',':
+                    pos += 1
+                    continue
+                if char == ']':
+                    finished = True
+                    break
+
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Most likely cut off mid-element: wait for more data
+                    if len(buffer) - pos > max_element_size:
+                        raise ValueError("JSON array element exceeds the size limit")
+                    break
+                if not isinstance(element, (dict, list, str)) and (
+                        end == len(buffer) or buffer[end] not in _DELIMITERS):
+                    # A number cut off by the chunk boundary ("4." of "4.5") still
+                    # decodes, so scalars must be followed by a delimiter
+                    if len(buffer) - pos > max_element_size:
+                        raise ValueError("JSON array element exceeds the size limit")
+                    break
+                pos = end
+                yield element
+
+            if finished:
+                break
+    finally:
+        close = getattr(chunks, 'aclose', None)
+        if close is not None:
+            await close()
+
+    if not finished:
+        raise ValueError("Truncated JSON array")
@@ -0,0 +1,180 @@
+"""
+Mass subdomain resolution with wildcard detection for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import time
+import random
+import string
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .config_manager import config
+from .logger import logger
+from .dns_resolver import DNSResolver, RCODE_NOERROR
+from .rate_limiter import TokenBucket
+from .single_flight import SingleFlight
+
+
+class MassResolver:
+    """Resolve large sets of host names and sort them into live/dead/wildcard
+
+    Names are resolved by a fixed pool of workers sharing one iterator, so
+    thousands of queries can be in flight without creating a task per name.
+    Before a name is reported live, its parent zone is probed with random
+    labels; if those resolve too, the zone has wildcard DNS and names that
+    only return the wildcard addresses are reported separately.
+    """
+
+    # Number of recently seen names remembered to skip repeats in the input
+    RECENT_NAMES = 65536
+    # Most names listed in 'unresolved'; any beyond that are only counted
+    MAX_UNRESOLVED = 10000
+
+    def __init__(self, resolver: DNSResolver, concurrency: Optional[int] = None,
+                 wildcard_probes: Optional[int] = None):
+        self.resolver = resolver
+        self.concurrency = concurrency or config.get("modules.domain_recon.resolve_concurrency", 1000)
+        self.wildcard_probes = wildcard_probes or config.get("modules.domain_recon.wildcard_probes", 3)
+        self._wildcards = SingleFlight(ttl=3600)
+        self.wildcard_zones: Dict[str, List[str]] = {}
+
+    async def addresses(self, name: str) -> Tuple[int, List[str]]:
+        """Resolve a name to its IPv4 addresses, falling back to IPv6"""
+        rcode, records = await self.resolver.query_with_status(name, 'A')
+        if not records and rcode == RCODE_NOERROR:
+            rcode, records = await self.resolver.query_with_status(name, 'AAAA')
+        return rcode, records
+
+    async def wildcard_ips(self, zone: str) -> Set[str]:
+        """Addresses that random labels under a zone resolve to (empty if no wildcard)"""
+        return await self._wildcards.do(zone, lambda: self._probe_wildcard(zone))
+
+    async def _probe_wildcard(self, zone: str) -> Set[str]:
+        labels = [
+            ''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+            for _ in range(self.wildcard_probes)
+        ]
+        outcomes = await asyncio.gather(
+            *(self.addresses(f"{label}.{zone}") for label in labels), return_exceptions=True
+        )
+        ips: Set[str] = set()
+        for outcome in outcomes:
+            if not isinstance(outcome, Exception):
+                ips.update(outcome[1])
+        if ips:
+            self.wildcard_zones[zone] = sorted(ips)
+            logger.info(f"Wildcard DNS detected for *.{zone}: {', '.join(sorted(ips))}")
+        return ips
+
+    async def classify(self, name: str, domain: Optional[str] = None) -> Tuple[str, List[str]]:
+        """Classify one name as 'live', 'dead' or 'wildcard' and return its addresses
+
+        Wildcard probing stays within the given domain so the public suffix
+        above it is never probed.
+        """
+        _, ips = await self.addresses(name)
+        if not ips:
+            return 'dead', []
+
+        zone = name.split('.', 1)[1] if '.' in name else ''
+        if zone and (domain is None or zone == domain or zone.endswith('.' + domain)):
+            wildcard = await self.wildcard_ips(zone)
+            if wildcard and set(ips) <= wildcard:
+                return 'wildcard', ips
+        return 'live', ips
+
+    async def resolve_all(self, names: Iterable[str], domain: Optional[str] = None,
+                          exclude: Optional[Set[str]] = None, qps: Optional[float] = None,
+                          keep_dead: bool = True, keep_wildcard: bool = True,
+                          keep_unresolved: bool = True) -> Dict[str, Any]:
+        """Resolve every name and return live/dead/wildcard buckets
+
+        Names are consumed lazily, so a generator of candidates is never
+        materialised. Names in exclude are skipped, and so are repeats among
+        the last RECENT_NAMES names, so memory stays bounded however many
+        candidates are fed in. With qps set,
+        lookups are paced to that many names per second. Names whose lookups
+        failed (timeouts, unreachable servers) are kept apart in 'unresolved'
+        rather than being reported as dead, up to MAX_UNRESOLVED of them.
+        keep_dead=False, keep_wildcard=False and keep_unresolved=False only
+        count those names, which keeps memory flat and drops guesses that
+        merely hit a wildcard in brute-force runs.
+        """
+        started = time.monotonic()
+        live: Dict[str, List[str]] = {}
+        wildcard: Dict[str, List[str]] = {}
+        dead: List[str] = []
+        unresolved: List[str] = []
+        dead_count = 0
+        wildcard_count = 0
+        unresolved_count = 0
+        domain = domain.lower() if domain else None
+        pacer = TokenBucket(rate=qps, burst=max(1, int(qps // 10))) if qps else None
+        exclude = exclude or set()
+        recent: "OrderedDict[str, None]" = OrderedDict()
+        resolved = 0
+
+        def unique():
+            nonlocal resolved
+            for name in names:
+                name = name.rstrip('.').lower()
+                if not name or name in exclude:
+                    continue
+                if name in recent:
+                    recent.move_to_end(name)
+                    continue
+                recent[name] = None
+                if len(recent) > self.RECENT_NAMES:
+                    recent.popitem(last=False)
+                resolved += 1
+                yield name
+
+        pending = unique()
+
+        async def worker():
+            nonlocal dead_count, wildcard_count, unresolved_count
+            for name in pending:
+                if pacer is not None:
+                    wait = pacer.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                try:
+                    bucket, ips = await self.classify(name, domain)
+                except Exception as e:
+                    logger.debug(f"Resolution failed for {name}: {e}")
+                    unresolved_count += 1
+                    if keep_unresolved and len(unresolved) < self.MAX_UNRESOLVED:
+                        unresolved.append(name)
+                    continue
+                if bucket == 'live':
+                    live[name] = ips
+                elif bucket == 'wildcard':
+                    wildcard_count += 1
+                    if keep_wildcard:
+                        wildcard[name] = ips
+                else:
+                    dead_count += 1
+                    if keep_dead:
+                        dead.append(name)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        duration = time.monotonic() - started
+
+        return {
+            'live': dict(sorted(live.items())),
+            'wildcard': dict(sorted(wildcard.items())),
+            'dead': sorted(dead),
+            'unresolved': sorted(unresolved),
+            'wildcard_zones': dict(self.wildcard_zones),
+            'statistics': {
+                'names': resolved,
+                'live': len(live),
+                'wildcard': wildcard_count,
+                'dead': dead_count,
+                'unresolved': unresolved_count,
+                'duration': round(duration, 3),
+                'names_per_second': round(resolved / duration, 1) if duration > 0 else None
+            }
+        }
@@ -0,0 +1,195 @@
+"""
+Header-aware rate limiting for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Mapping, Tuple
+from urllib.parse import urlparse
+
+from .config_manager import config
+from .logger import logger
+
+
+# Known upstream plan limits (requests per second, burst size)
+DEFAULT_RATE_LIMITS = {
+    "api.shodan.io": {"rate": 1.0, "burst": 1},
+    "www.virustotal.com": {"rate": 4 / 60, "burst": 4}
+}
+
+# Hosts that meter separate quotas (named by X-RateLimit-Resource) on one
+# host, mapped from path prefix to resource; other paths use "core"
+RATE_LIMIT_RESOURCES = {
+    "api.github.com": {"/graphql": "graphql", "/search/code": "code_search", "/search/": "search"}
+}
+
+
+class TokenBucket:
+    """Token bucket for a single upstream host
+
+    Besides the static refill rate, the bucket mirrors the server-reported
+    quota window (remaining requests until a reset time) and any explicit
+    "do not call before" deadline coming from Retry-After.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.quota_remaining: Optional[int] = None
+        self.quota_reset = 0.0
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Reserve a request slot and return how long to wait before using it"""
+        now = time.monotonic()
+        start = max(now, self.blocked_until)
+
+        # Server-reported quota: once it is used up, wait for the window reset
+        if self.quota_remaining is not None:
+            if self.quota_reset <= now:
+                self.quota_remaining = None
+            elif self.quota_remaining <= 0:
+                start = max(start, self.quota_reset)
+            else:
+                self.quota_remaining -= 1
+
+        if self.rate:
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens < 0:
+                start = max(start, now + (-self.tokens / self.rate))
+
+        return start - now
+
+    def block_for(self, seconds: float):
+        """Do not issue requests for the given number of seconds"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + max(0.0, seconds))
+
+    def set_quota(self, remaining: int, reset_in: float):
+        """Sync the local quota counter with the server-reported window"""
+        self.quota_remaining = remaining
+        self.quota_reset = time.monotonic() + max(0.0, reset_in)
+
+
+class RateLimiter:
+    """Per-host rate limiter shared by all modules and investigations
+
+    Hosts listed in RATE_LIMIT_RESOURCES get one bucket per quota resource,
+    so e.g. GitHub's GraphQL quota never overwrites its REST quota.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.limits = dict(DEFAULT_RATE_LIMITS)
+        self.limits.update(limits if limits is not None else config.get("settings.rate_limits", {}) or {})
+        self._buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {}
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        """Extract the host name from a URL (or return the host unchanged)"""
+        if "://" in url_or_host:
+            return (urlparse(url_or_host).hostname or "").lower()
+        return url_or_host.lower()
+
+    @staticmethod
+    def resource_of(url_or_host: str) -> Optional[str]:
+        """Quota resource a request counts against, for hosts that meter several"""
+        if "://" not in url_or_host:
+            return None
+        parsed = urlparse(url_or_host)
+        resources = RATE_LIMIT_RESOURCES.get((parsed.hostname or "").lower())
+        if resources is None:
+            return None
+        for prefix, resource in resources.items():
+            if parsed.path.startswith(prefix):
+                return resource
+        return "core"
+
+    def get_bucket(self, host: str, resource: Optional[str] = None) -> TokenBucket:
+        """Get or create the bucket for a host (and quota resource)"""
+        bucket = self._buckets.get((host, resource))
+        if bucket is None:
+            limit = self.limits.get(host, {})
+            bucket = TokenBucket(rate=limit.get("rate"), burst=limit.get("burst", 1))
+            self._buckets[(host, resource)] = bucket
+        return bucket
+
+    def set_limit(self, host: str, rate: Optional[float], burst: int = 1):
+        """Configure the static request rate for a host"""
+        self.limits[host] = {"rate": rate, "burst": burst}
+        for (bucket_host, _), bucket in self._buckets.items():
+            if bucket_host != host:
+                continue
+            bucket.rate = rate
+            bucket.burst = max(1, burst)
+            bucket.tokens = min(bucket.tokens, bucket.burst)
+
+    async def acquire(self, url_or_host: str):
+        """Wait until a request to the given host is allowed"""
+        host = self.host_of(url_or_host)
+        wait = self.get_bucket(host, self.resource_of(url_or_host)).reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiter pacing {host}: waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def update_from_response(self, url_or_host: str, status: int, headers: Mapping[str, str]) -> bool:
+        """Apply rate limit information from response headers
+
+        Returns True if the server told us when it is safe to retry. Quota
+        headers go to the bucket of the resource they name, so they cannot
+        overwrite the quota of another resource on the same host.
+        """
+        host = self.host_of(url_or_host)
+        resource = self.resource_of(url_or_host)
+        bucket = self.get_bucket(host, resource)
+        informed = False
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            named = headers.get("X-RateLimit-Resource")
+            quota_bucket = bucket
+            if resource is not None and named and named != resource:
+                quota_bucket = self.get_bucket(host, named)
+            try:
+                reset_in = float(reset) - time.time()
+                quota_bucket.set_quota(int(remaining), reset_in)
+                informed = quota_bucket is bucket and int(remaining) <= 0
+            except ValueError:
+                pass
+
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            delay = self._parse_retry_after(retry_after)
+            if delay is not None:
+                bucket.block_for(delay)
+                informed = True
+
+        if informed and status in (403, 429):
+            logger.warning(f"Rate limit reached for {host}, pausing requests")
+
+        return informed
+
+    def backoff(self, url_or_host: str, seconds: float):
+        """Pause a host when it throttled us without saying for how long"""
+        self.get_bucket(self.host_of(url_or_host), self.resource_of(url_or_host)).block_for(seconds)
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
@@ -3,16 +3,29 @@ Main reconnaissance engine for xPOURY4 Recon
 Author: xPOURY4
 """
 
+import sys
+import math
+import time
 import asyncio
+import itertools
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, AsyncIterable, Callable, Awaitable, Iterator, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .config_manager import config
 from .logger import logger
 from .exceptions import ReconException
+from .http_client import HTTPClientPool
+from .rate_limiter import RateLimiter
+from .http_cache import ResponseCache
+from .single_flight import SingleFlight
+from .dns_resolver import DNSResolver
+from .dns_cache import DNSCache
+from .budget import BudgetManager, request_priority
+from ..modules.github_recon import GitHubOrgAggregate
+from ..modules.shodan_recon import ShodanBulkAggregate, ShodanSearchSummary, expand_ip_targets
 from ..modules import (
     GitHubRecon,
     DomainRecon,
@@ -22,6 +35,10 @@ from ..modules import (
 )
 
 
+# A bulk target, optionally paired with its scheduling priority
+BulkTarget = Union[str, Tuple[str, int]]
+
+
 class ReconEngine:
     """Advanced reconnaissance engine for xPOURY4 Recon"""
     
@@ -33,6 +50,28 @@ class ReconEngine:
             'linkedin': LinkedInRecon(),
             'shodan': ShodanRecon()
         }
+        
+        # Shared connection pool, rate limiter, response cache, request
+        # coalescing and DNS resolver (with its answer cache) handed to every module
+        self.http_pool = HTTPClientPool()
+        self.rate_limiter = RateLimiter()
+        self.single_flight = SingleFlight()
+        self.dns_cache = DNSCache()
+        self.dns_resolver = DNSResolver(cache=self.dns_cache)
+        self.response_cache = None
+        if config.get("settings.http_cache.enabled", True):
+            self.response_cache = ResponseCache()
+        self.budget = None
+        if config.get("settings.budget.enabled", True):
+            self.budget = BudgetManager()
+        for module in self.modules.values():
+            module.http_pool = self.http_pool
+            module.rate_limiter = self.rate_limiter
+            module.response_cache = self.response_cache
+            module.single_flight = self.single_flight
+            module.dns_resolver = self.dns_resolver
+            module.budget = self.budget
+        
         self.results = {}
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         
@@ -46,7 +85,8 @@ class ReconEngine:
         """Run GitHub reconnaissance"""
         try:
             logger.info(f"Starting GitHub reconnaissance for: {username}")
-            result = await self.modules['github'].investigate(username, **kwargs)
+            with request_priority(kwargs.pop('priority', 0)):
+                result = await self.modules['github'].investigate(username, **kwargs)
             self.results['github'] = result
             logger.info("GitHub reconnaissance completed successfully")
             return result
@@ -58,7 +98,8 @@ class ReconEngine:
         """Run domain reconnaissance"""
         try:
             logger.info(f"Starting domain reconnaissance for: {domain}")
-            result = await self.modules['domain'].investigate(domain, **kwargs)
+            with request_priority(kwargs.pop('priority', 0)):
+                result = await self.modules['domain'].investigate(domain, **kwargs)
             self.results['domain'] = result
             logger.info("Domain reconnaissance completed successfully")
             return result
@@ -94,7 +135,8 @@ class ReconEngine:
         """Run Shodan reconnaissance"""
         try:
             logger.info(f"Starting Shodan reconnaissance for: {target}")
-            result = await self.modules['shodan'].investigate(target, **kwargs)
+            with request_priority(kwargs.pop('priority', 0)):
+                result = await self.modules['shodan'].investigate(target, **kwargs)
             self.results['shodan'] = result
             logger.info("Shodan reconnaissance completed successfully")
             return result
@@ -102,6 +144,273 @@ class ReconEngine:
             logger.error(f"Shodan reconnaissance failed: {e}")
             raise ReconException(f"Shodan recon failed: {e}")
     
+    async def run_github_bulk_recon(self, usernames: Union[Iterable[BulkTarget], AsyncIterable[BulkTarget]],
+                                    output_path: Optional[str] = None,
+                                    concurrency: Optional[int] = None,
+                                    priority: Optional[Callable[[str], int]] = None) -> Dict[str, Any]:
+        """Run GitHub reconnaissance over a stream of usernames
+        
+        Each finished profile is written to an NDJSON file right away instead of
+        being kept in memory, so the input can be arbitrarily large. Usernames
+        may come as (username, priority) pairs, or priority may map a username
+        to its scheduling priority (higher first).
+        """
+        github = self.modules['github']
+        batch_size = github.graphql_batch_size if github.backend == "graphql" else 1
+        output_path = output_path or str(self.results_dir / f"github_bulk_{self.session_id}.ndjson")
+        
+        logger.info(f"Starting bulk GitHub reconnaissance, writing to: {output_path}")
+        summary = await self._run_bulk(
+            usernames, github.investigate_many, output_path,
+            concurrency=concurrency, batch_size=batch_size, priority=priority
+        )
+        logger.info(
+            f"Bulk GitHub reconnaissance completed: {summary['successful']} succeeded, "
+            f"{summary['failed']} failed"
+        )
+        return summary
+    
+    async def run_github_org_recon(self, org: str, output_path: Optional[str] = None,
+                                   concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Run GitHub reconnaissance on every public member of an organization
+        
+        Members are investigated concurrently as they are enumerated, and the
+        organization aggregate is updated as each member finishes.
+        """
+        github = self.modules['github']
+        if not github.validate_input(org, github._validate_username):
+            raise ReconException(f"Invalid GitHub organization: {org}")
+        
+        batch_size = github.graphql_batch_size if github.backend == "graphql" else 1
+        output_path = output_path or str(self.results_dir / f"github_org_{org}_{self.session_id}.ndjson")
+        aggregate = GitHubOrgAggregate(org)
+        
+        try:
+            logger.info(f"Starting GitHub organization reconnaissance for: {org}")
+            async with github:
+                summary = await self._run_bulk(
+                    github.iter_org_members(org), github.investigate_many, output_path,
+                    concurrency=concurrency, batch_size=batch_size, on_result=aggregate.add
+                )
+        except Exception as e:
+            logger.error(f"GitHub organization reconnaissance failed: {e}")
+            raise ReconException(f"GitHub org recon failed: {e}")
+        
+        summary['aggregate'] = aggregate.to_dict()
+        self.results['github_org'] = summary
+        logger.info(f"GitHub organization reconnaissance completed: {summary['total']} members")
+        return summary
+    
+    async def run_shodan_bulk_recon(self, targets: Iterable[BulkTarget],
+                                    output_path: Optional[str] = None,
+                                    concurrency: Optional[int] = None,
+                                    priority: Optional[Callable[[str], int]] = None) -> Dict[str, Any]:
+        """Run Shodan host lookups over a stream of IP addresses and CIDR blocks
+        
+        Blocks are expanded lazily and non-global space is skipped. Each host
+        record is written to an NDJSON file as soon as it arrives, and a
+        running aggregate of ports, vulnerabilities and countries is kept.
+        Entries given as (entry, priority) pass their priority to every
+        address of the block.
+        """
+        shodan = self.modules['shodan']
+        if not shodan.is_configured():
+            raise ReconException("Shodan API key not configured")
+        
+        output_path = output_path or str(self.results_dir / f"shodan_bulk_{self.session_id}.ndjson")
+        aggregate = ShodanBulkAggregate()
+        
+        def expand() -> Iterator[BulkTarget]:
+            for target in targets:
+                entry, rank = target if isinstance(target, tuple) else (target, None)
+                for address in expand_ip_targets([entry], on_skip=aggregate.skip):
+                    yield address if rank is None else (address, rank)
+        
+        try:
+            logger.info(f"Starting bulk Shodan reconnaissance, writing to: {output_path}")
+            summary = await self._run_bulk(
+                expand(), shodan.investigate_many, output_path,
+                concurrency=concurrency, on_result=aggregate.add, priority=priority
+            )
+        except Exception as e:
+            logger.error(f"Bulk Shodan reconnaissance failed: {e}")
+            raise ReconException(f"Shodan bulk recon failed: {e}")
+        
+        summary['aggregate'] = aggregate.to_dict()
+        self.results['shodan_bulk'] = summary
+        logger.info(
+            f"Bulk Shodan reconnaissance completed: {aggregate.hosts_found} hosts with data, "
+            f"{aggregate.hosts_skipped} skipped"
+        )
+        return summary
+    
+    async def run_shodan_search(self, query: str, output_path: Optional[str] = None,
+                                max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Run a Shodan search query and stream every match to an NDJSON file
+        
+        Matches are written as their page arrives while the next page is
+        being fetched; the returned summary carries the facet counts.
+        """
+        shodan = self.modules['shodan']
+        if not shodan.is_configured():
+            raise ReconException("Shodan API key not configured")
+        
+        output_path = output_path or str(self.results_dir / f"shodan_search_{self.session_id}.ndjson")
+        summary = ShodanSearchSummary(query)
+        started = time.monotonic()
+        
+        try:
+            logger.info(f"Starting Shodan search for: {query}")
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            async with shodan:
+                with open(output_path, 'w', encoding='utf-8') as output:
+                    async for match in shodan.iter_search(query, max_pages=max_pages, summary=summary):
+                        output.write(json.dumps(match, default=str) + "\n")
+        except Exception as e:
+            logger.error(f"Shodan search failed: {e}")
+            raise ReconException(f"Shodan search failed: {e}")
+        
+        result = {
+            'session_id': self.session_id,
+            'output_file': output_path,
+            **summary.to_dict(),
+            'duration_seconds': round(time.monotonic() - started, 2)
+        }
+        self.results['shodan_search'] = result
+        logger.info(f"Shodan search completed: {summary.matches} of {summary.total} matches fetched")
+        return result
+    
+    async def _run_bulk(self, targets: Union[Iterable[BulkTarget], AsyncIterable[BulkTarget]],
+                        handler: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+                        output_path: str, concurrency: Optional[int] = None,
+                        batch_size: int = 1,
+                        on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                        priority: Optional[Callable[[str], int]] = None) -> Dict[str, Any]:
+        """Feed targets through a bounded worker pool and stream results as NDJSON
+        
+        The input is consumed lazily through a bounded priority buffer and
+        results are written as soon as they finish, so memory stays flat for
+        any input size. Targets are (target, priority) pairs or plain targets
+        ranked by the priority callable; the highest priority targets in the
+        buffer are served first, FIFO within a priority. A batch's requests
+        run at the highest priority of its targets, and targets deferred for
+        lack of query budget are counted separately.
+        """
+        concurrency = concurrency or config.get("settings.bulk_concurrency", 10)
+        buffer_size = max(config.get("settings.bulk_buffer_size", 1000), concurrency * batch_size * 2)
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=buffer_size)
+        sequence = itertools.count()
+        stats = {'total': 0, 'successful': 0, 'failed': 0, 'deferred': 0}
+        started = time.monotonic()
+        
+        def entry(item: BulkTarget) -> Tuple[float, int, str, int]:
+            target, rank = item if isinstance(item, tuple) else (item, priority(item) if priority else 0)
+            return -rank, next(sequence), target, rank
+        
+        async def produce():
+            if hasattr(targets, '__aiter__'):
+                async for item in targets:
+                    await queue.put(entry(item))
+            else:
+                for item in targets:
+                    await queue.put(entry(item))
+            # End markers sort after every real target
+            for _ in range(concurrency):
+                await queue.put((math.inf, next(sequence), None, 0))
+        
+        async def work(output):
+            done = False
+            while not done:
+                batch = []
+                ranks = []
+                _, _, target, rank = await queue.get()
+                while target is not None:
+                    batch.append(target)
+                    ranks.append(rank)
+                    if len(batch) >= batch_size or queue.empty():
+                        break
+                    _, _, target, rank = queue.get_nowait()
+                done = target is None
+                if not batch:
+                    continue
+                
+                try:
+                    with request_priority(max(ranks)):
+                        results = await handler(batch)
+                except Exception as e:
+                    logger.error(f"Bulk reconnaissance batch failed: {e}")
+                    results = [{'success': False, 'data': None, 'error': str(e)} for _ in batch]
+                
+                for target, result in zip(batch, results):
+                    stats['total'] += 1
+                    if result.get('deferred'):
+                        stats['deferred'] += 1
+                    else:
+                        stats['successful' if result.get('success') else 'failed'] += 1
+                    try:
+                        output.write(json.dumps({'target': target, **result}, default=str) + "\n")
+                        if on_result:
+                            on_result(target, result)
+                    except Exception as e:
+                        logger.error(f"Could not record bulk result for {target}: {e}")
+                output.flush()
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as output:
+            # If the producer or any worker dies, the rest are cancelled rather
+            # than left blocked on a queue nobody serves any more
+            tasks = [asyncio.ensure_future(produce())]
+            tasks += [asyncio.ensure_future(work(output)) for _ in range(concurrency)]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        
+        return {
+            'session_id': self.session_id,
+            'output_file': output_path,
+            'total': stats['total'],
+            'successful': stats['successful'],
+            'failed': stats['failed'],
+            'deferred': stats['deferred'],
+            'duration_seconds': round(time.monotonic() - started, 2)
+        }
+    
+    @staticmethod
+    def iter_targets(path: str, with_priority: bool = False) -> Iterator[BulkTarget]:
+        """Lazily read one target per line from a file ('-' for stdin), skipping blanks and comments
+        
+        With with_priority set, lines may carry a priority column
+        ("target,priority") and (target, priority) pairs are yielded, with
+        priority 0 where the column is missing.
+        """
+        handle = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+        try:
+            for line in handle:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if not with_priority:
+                    yield line
+                    continue
+                target, separator, rank = line.rpartition(',')
+                if not separator:
+                    yield line, 0
+                    continue
+                try:
+                    yield target.strip(), int(rank)
+                except ValueError:
+                    logger.warning(f"Ignoring invalid priority in target line: {line}")
+                    yield target.strip(), 0
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+    
     async def run_comprehensive_recon(self, targets: Dict[str, str]) -> Dict[str, Any]:
         """Run comprehensive reconnaissance on multiple targets"""
         logger.info("Starting comprehensive reconnaissance")
@@ -200,6 +509,30 @@ class ReconEngine:
                 status[name] = False
         return status
     
+    def get_budget_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get the remaining query budget of each module's providers"""
+        return {
+            name: self.budget.status(module.module_name) if self.budget else {}
+            for name, module in self.modules.items()
+        }
+    
+    def get_dns_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters of the DNS cache shared by all modules"""
+        return self.dns_cache.stats()
+    
+    async def close(self):
+        """Release pooled connections for the running event loop and close open stores"""
+        await self.http_pool.close()
+        await self.dns_resolver.close()
+        if self.response_cache:
+            self.response_cache.close()
+        self.modules['domain'].ct_index.close()
+        if self.modules['shodan'].host_store is not None:
+            self.modules['shodan'].host_store.close()
+        if self.budget:
+            self.budget.close()
+        logger.info("ReconEngine connections closed")
+    
     def clear_results(self):
         """Clear current results"""
         self.results.clear()
@@ -0,0 +1,73 @@
+"""
+Request coalescing for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+from .config_manager import config
+
+
+class SingleFlight:
+    """Coalesce concurrent identical operations into a single call
+
+    Callers asking for the same key while a call is in flight await the same
+    task instead of starting another one. Successful results are kept for a
+    short time afterwards so back-to-back callers are served too. Results
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else config.get("settings.single_flight_ttl", 60)
+        self._inflight: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self._prune_at = 1024
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func once per key and share its result with all concurrent callers"""
+        now = time.monotonic()
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            del self._results[key]
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is loop:
+            self.hits += 1
+            return await asyncio.shield(inflight[1])
+
+        self.misses += 1
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = (loop, task)
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        """Publish a finished call's result and drop it from the in-flight table"""
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[1] is task:
+            del self._inflight[key]
+
+        if not task.cancelled() and task.exception() is None and self.ttl > 0:
+            self._prune()
+            self._results[key] = (time.monotonic() + self.ttl, task.result())
+
+    def _prune(self):
+        """Drop expired results once the table grows"""
+        if len(self._results) < self._prune_at:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[key]
+        self._prune_at = max(1024, 2 * len(self._results))
+
+    def forget(self, key: Hashable):
+        """Drop a kept result so the next call runs again"""
+        self._results.pop(key, None)
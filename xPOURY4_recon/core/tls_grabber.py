@@ -0,0 +1,327 @@
+"""
+Asynchronous TLS certificate harvesting for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import ssl
+import time
+import asyncio
+import hashlib
+import ipaddress
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+
+from .config_manager import config
+from .logger import logger
+from .exceptions import ReconException
+
+
+# X.509 attribute and algorithm names, as reported by ssl.getpeercert()
+NAME_ATTRIBUTES = {
+    '2.5.4.3': 'commonName',
+    '2.5.4.5': 'serialNumber',
+    '2.5.4.6': 'countryName',
+    '2.5.4.7': 'localityName',
+    '2.5.4.8': 'stateOrProvinceName',
+    '2.5.4.10': 'organizationName',
+    '2.5.4.11': 'organizationalUnitName',
+    '1.2.840.113549.1.9.1': 'emailAddress'
+}
+
+SIGNATURE_ALGORITHMS = {
+    '1.2.840.113549.1.1.5': 'sha1WithRSAEncryption',
+    '1.2.840.113549.1.1.11': 'sha256WithRSAEncryption',
+    '1.2.840.113549.1.1.12': 'sha384WithRSAEncryption',
+    '1.2.840.113549.1.1.13': 'sha512WithRSAEncryption',
+    '1.2.840.113549.1.1.10': 'rsassaPss',
+    '1.2.840.10045.4.3.2': 'ecdsa-with-SHA256',
+    '1.2.840.10045.4.3.3': 'ecdsa-with-SHA384',
+    '1.2.840.10045.4.3.4': 'ecdsa-with-SHA512',
+    '1.3.101.112': 'ED25519'
+}
+
+OID_SUBJECT_ALT_NAME = '2.5.29.17'
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _read_tlv(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """Read a DER tag and length; return (tag, content start, content end)"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset:offset + size], 'big')
+        offset += size
+    if offset + length > len(data):
+        raise ValueError("Truncated DER value")
+    return tag, offset, offset + length
+
+
+def _children(data: bytes, start: int, end: int) -> List[Tuple[int, int, int]]:
+    """List the (tag, start, end) of every element inside a constructed value"""
+    items = []
+    while start < end:
+        tag, content_start, content_end = _read_tlv(data, start)
+        items.append((tag, content_start, content_end))
+        start = content_end
+    return items
+
+
+def _decode_oid(raw: bytes) -> str:
+    parts = [raw[0] // 40, raw[0] % 40]
+    value = 0
+    for byte in raw[1:]:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            parts.append(value)
+            value = 0
+    return '.'.join(str(part) for part in parts)
+
+
+def _decode_string(tag: int, raw: bytes) -> str:
+    if tag == 0x1E:
+        return raw.decode('utf-16-be', errors='replace')
+    if tag == 0x14:
+        return raw.decode('latin-1')
+    return raw.decode('utf-8', errors='replace')
+
+
+def _decode_time(tag: int, raw: bytes) -> str:
+    """Format an ASN.1 time the way ssl.getpeercert() does (e.g. 'Jun  1 00:00:00 2024 GMT')"""
+    text = raw.decode('ascii').rstrip('Z')
+    if tag == 0x17:
+        year = int(text[:2])
+        year += 2000 if year < 50 else 1900
+        text = text[2:]
+    else:
+        year = int(text[:4])
+        text = text[4:]
+    month, day = int(text[0:2]), int(text[2:4])
+    return f"{_MONTHS[month - 1]} {day:2d} {text[4:6]}:{text[6:8]}:{text[8:10]} {year} GMT"
+
+
+def _decode_name(data: bytes, start: int, end: int) -> Dict[str, str]:
+    name = {}
+    for _, set_start, set_end in _children(data, start, end):
+        for _, seq_start, seq_end in _children(data, set_start, set_end):
+            (_, oid_start, oid_end), (value_tag, value_start, value_end) = _children(data, seq_start, seq_end)[:2]
+            oid = _decode_oid(data[oid_start:oid_end])
+            name[NAME_ATTRIBUTES.get(oid, oid)] = _decode_string(value_tag, data[value_start:value_end])
+    return name
+
+
+def _decode_alt_names(data: bytes, start: int, end: int) -> List[str]:
+    names = []
+    for tag, name_start, name_end in _children(data, start, end):
+        raw = data[name_start:name_end]
+        if tag == 0x82:
+            names.append(raw.decode('ascii', errors='replace'))
+        elif tag == 0x87 and len(raw) in (4, 16):
+            names.append(str(ipaddress.ip_address(raw)))
+    return names
+
+
+def parse_certificate(der: bytes) -> Dict[str, Any]:
+    """Parse the interesting fields of a DER encoded X.509 certificate
+
+    The result mirrors the fields _get_ssl_info used to read from
+    ssl.getpeercert(), which only decodes verified certificates.
+    """
+    _, cert_start, cert_end = _read_tlv(der, 0)
+    (_, tbs_start, tbs_end), (_, alg_start, alg_end) = _children(der, cert_start, cert_end)[:2]
+    fields = _children(der, tbs_start, tbs_end)
+
+    version = 1
+    if fields[0][0] == 0xA0:
+        _, version_start, version_end = _read_tlv(der, fields[0][1])
+        version = int.from_bytes(der[version_start:version_end], 'big') + 1
+        fields = fields[1:]
+
+    serial = der[fields[0][1]:fields[0][2]].lstrip(b'\x00')
+    validity = _children(der, fields[3][1], fields[3][2])
+
+    alt_names: List[str] = []
+    for tag, start, end in fields[6:]:
+        if tag != 0xA3:
+            continue
+        _, extensions_start, extensions_end = _read_tlv(der, start)
+        for _, ext_start, ext_end in _children(der, extensions_start, extensions_end):
+            parts = _children(der, ext_start, ext_end)
+            if _decode_oid(der[parts[0][1]:parts[0][2]]) != OID_SUBJECT_ALT_NAME:
+                continue
+            _, value_start, value_end = parts[-1]
+            _, names_start, names_end = _read_tlv(der, value_start)
+            alt_names = _decode_alt_names(der, names_start, names_end)
+
+    algorithm = _children(der, alg_start, alg_end)[0]
+    algorithm_oid = _decode_oid(der[algorithm[1]:algorithm[2]])
+
+    return {
+        'subject': _decode_name(der, fields[4][1], fields[4][2]),
+        'issuer': _decode_name(der, fields[2][1], fields[2][2]),
+        'version': version,
+        'serial_number': serial.hex().upper() or '00',
+        'not_before': _decode_time(validity[0][0], der[validity[0][1]:validity[0][2]]),
+        'not_after': _decode_time(validity[1][0], der[validity[1][1]:validity[1][2]]),
+        'signature_algorithm': SIGNATURE_ALGORITHMS.get(algorithm_oid, algorithm_oid),
+        'subject_alt_names': alt_names
+    }
+
+
+class TLSGrabber:
+    """Collect TLS certificates from many hosts over asyncio connections
+
+    Certificates are fetched without verification so expired, self-signed
+    and mismatched certificates are harvested too. When asked to, grab()
+    also repeats the handshake with full chain and host name verification
+    and reports whether the certificate is valid. Host names are resolved
+    through the shared DNS resolver when one is given, which keeps lookups
+    off the default thread pool.
+    """
+
+    def __init__(self, resolver: Any = None, concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.resolver = resolver
+        self.concurrency = concurrency or config.get("modules.domain_recon.tls.concurrency", 200)
+        self.timeout = timeout or config.get("modules.domain_recon.tls.timeout", 10)
+        self._context = ssl.create_default_context()
+        self._context.check_hostname = False
+        self._context.verify_mode = ssl.CERT_NONE
+        self._verified_context = ssl.create_default_context()
+
+    @staticmethod
+    def parse_target(target: Union[str, Tuple[str, int]], default_port: int = 443) -> Tuple[str, int]:
+        """Split "host", "host:port" or "[v6]:port" into (host, port)"""
+        if isinstance(target, tuple):
+            return target[0], int(target[1])
+        target = target.strip()
+        if target.startswith('['):
+            host, _, rest = target[1:].partition(']')
+            return host, int(rest[1:]) if rest.startswith(':') else default_port
+        if target.count(':') == 1:
+            host, port = target.split(':')
+            return host, int(port)
+        return target, default_port
+
+    async def _address_of(self, host: str) -> str:
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        if self.resolver is None:
+            return host
+        addresses = await self.resolver.query(host, 'A') or await self.resolver.query(host, 'AAAA')
+        if not addresses:
+            raise OSError(f"{host} does not resolve")
+        return addresses[0]
+
+    async def grab(self, host: str, port: int = 443, address: Optional[str] = None,
+                   verify: bool = False) -> Dict[str, Any]:
+        """Fetch and parse the certificate a host presents on a port
+
+        With verify set, the result also tells whether the certificate
+        chains to a trusted root and matches the host name ('valid'), and
+        why not ('verification_error').
+        """
+        address = address or await self._address_of(host)
+        try:
+            ipaddress.ip_address(host)
+            server_name = ''
+        except ValueError:
+            server_name = host
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(address, port, ssl=self._context, server_hostname=server_name),
+            self.timeout
+        )
+        try:
+            der = writer.get_extra_info('ssl_object').getpeercert(binary_form=True)
+        finally:
+            await self._close(writer)
+
+        if not der:
+            raise ssl.SSLError(f"{host}:{port} presented no certificate")
+        info = parse_certificate(der)
+        info['fingerprint_sha256'] = hashlib.sha256(der).hexdigest()
+        if verify:
+            info['valid'], info['verification_error'] = await self._verify(host, port, address)
+        return info
+
+    async def _verify(self, host: str, port: int, address: str) -> Tuple[Optional[bool], Optional[str]]:
+        """Handshake with verification; (valid, error), valid is None if it could not be decided"""
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(address, port, ssl=self._verified_context, server_hostname=host),
+                self.timeout
+            )
+        except ssl.SSLCertVerificationError as e:
+            return False, e.verify_message or str(e)
+        except asyncio.TimeoutError:
+            return None, f"Verification timed out after {self.timeout}s"
+        except (OSError, ssl.SSLError) as e:
+            return None, str(e) or type(e).__name__
+        await self._close(writer)
+        return True, None
+
+    async def _close(self, writer: asyncio.StreamWriter):
+        """Close a connection and wait for it, ignoring a peer that botches the TLS shutdown"""
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), self.timeout)
+        except (asyncio.TimeoutError, OSError, ssl.SSLError):
+            pass
+
+    async def grab_many(self, targets: Iterable[Union[str, Tuple[str, int]]],
+                        addresses: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Harvest certificates from many host:port targets concurrently
+
+        Identical certificates are stored once, keyed by their SHA-256
+        fingerprint, together with every endpoint that presented them.
+        addresses optionally maps host names to already resolved addresses.
+        """
+        started = time.monotonic()
+        addresses = addresses or {}
+        certificates: Dict[str, Dict[str, Any]] = {}
+        endpoints: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        pending = iter(dict.fromkeys(self.parse_target(target) for target in targets))
+
+        async def worker():
+            for host, port in pending:
+                endpoint = f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+                try:
+                    info = await self.grab(host, port, addresses.get(host))
+                except asyncio.TimeoutError:
+                    errors[endpoint] = f"Timed out after {self.timeout}s"
+                    continue
+                except (OSError, ssl.SSLError, ValueError, IndexError, ReconException) as e:
+                    errors[endpoint] = str(e) or type(e).__name__
+                    continue
+                fingerprint = info['fingerprint_sha256']
+                endpoints[endpoint] = fingerprint
+                certificates.setdefault(fingerprint, {**info, 'endpoints': []})['endpoints'].append(endpoint)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        logger.info(f"Collected {len(certificates)} unique certificates from {len(endpoints)} endpoints")
+
+        names = set()
+        for info in certificates.values():
+            names.update(name.lower() for name in info['subject_alt_names'])
+            if info['subject'].get('commonName'):
+                names.add(info['subject']['commonName'].lower())
+
+        return {
+            'certificates': certificates,
+            'endpoints': dict(sorted(endpoints.items())),
+            'errors': dict(sorted(errors.items())),
+            'names': sorted(names),
+            'statistics': {
+                'endpoints': len(endpoints) + len(errors),
+                'collected': len(endpoints),
+                'unique_certificates': len(certificates),
+                'failed': len(errors),
+                'duration': round(time.monotonic() - started, 3)
+            }
+        }
@@ -0,0 +1,232 @@
+"""
+Asynchronous WHOIS client for xPOURY4 Recon
+Author: xPOURY4
+"""
+
+import re
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config_manager import config
+from .logger import logger
+from .exceptions import ReconException
+from .single_flight import SingleFlight
+
+
+# Response labels (lower case) for each field of the parsed record
+WHOIS_FIELDS = {
+    'domain_name': ('domain name', 'domain'),
+    'registrar': ('registrar', 'sponsoring registrar', 'registrar name'),
+    'creation_date': ('creation date', 'created', 'created on', 'registered on', 'registration time',
+                      'domain record activated', 'registered'),
+    'expiration_date': ('registry expiry date', 'registrar registration expiration date', 'expiration date',
+                        'expiry date', 'expires', 'expires on', 'expiration time', 'paid-till'),
+    'updated_date': ('updated date', 'last updated', 'last modified', 'last-modified', 'updated on',
+                     'changed', 'last update'),
+    'name_servers': ('name server', 'name servers', 'nameservers', 'nserver'),
+    'status': ('domain status', 'status', 'state'),
+    'org': ('registrant organization', 'registrant organisation', 'org', 'organization'),
+    'country': ('registrant country', 'country')
+}
+
+LIST_FIELDS = ('name_servers', 'status')
+
+NOT_FOUND_MARKERS = ('no match for', 'not found', 'no data found', 'no entries found', 'status: free',
+                     'no object found', 'domain not found')
+
+DATE_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d-%b-%Y', '%d.%m.%Y',
+                '%Y.%m.%d', '%Y/%m/%d', '%d/%m/%Y', '%Y%m%d')
+
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+
+def _parse_date(value: str) -> str:
+    """Normalise a WHOIS date to 'YYYY-MM-DD HH:MM:SS', keeping unknown formats as-is"""
+    text = value.strip()
+    candidate = re.sub(r'(?<=:\d\d)(\.\d+)?(Z|[+-]\d{2}:?\d{2}| UTC| GMT)?$', '', text)
+    for fmt in DATE_FORMATS:
+        try:
+            return str(datetime.strptime(candidate, fmt))
+        except ValueError:
+            continue
+    return text
+
+
+def parse_whois(text: str) -> Dict[str, Any]:
+    """Parse a raw WHOIS response into the fields DomainRecon reports
+
+    Both "Key: value" lines and indented continuation blocks (as used by
+    some ccTLD registries for name servers) are understood. The first value
+    wins for single fields; list fields collect every value.
+    """
+    values: Dict[str, List[str]] = {}
+    pending_key = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith(('%', '#', '>>>')):
+            pending_key = None
+            continue
+        key, separator, value = stripped.partition(':')
+        key, value = key.strip().lower(), value.strip()
+        # Indented lines under an empty key are its values, unless they are
+        # "Key: value" pairs themselves (name servers may carry IPv6 glue)
+        is_pair = bool(separator) and '.' not in key
+        if pending_key and line[:1].isspace() and not (is_pair and value):
+            values.setdefault(pending_key, []).append(stripped)
+        elif is_pair:
+            if value:
+                values.setdefault(key, []).append(value)
+                pending_key = None
+            else:
+                pending_key = key
+
+    record: Dict[str, Any] = {}
+    for field, labels in WHOIS_FIELDS.items():
+        found = [value for label in labels for value in values.get(label, [])]
+        if field in LIST_FIELDS:
+            items = [value.split()[0] for value in found if value.split()]
+            if field == 'name_servers':
+                items = [item.lower().rstrip('.') for item in items]
+            record[field] = sorted(set(items)) or None
+        elif field.endswith('_date'):
+            record[field] = _parse_date(found[0]) if found else None
+        else:
+            record[field] = found[0] if found else None
+
+    record['emails'] = sorted(set(email.lower().rstrip('.') for email in _EMAIL.findall(text))) or None
+    return record
+
+
+class WhoisClient:
+    """Native asyncio port-43 WHOIS client
+
+    The registry server for each TLD is learnt from IANA once and cached.
+    Thick registrar records are followed through the registry's "Registrar
+    WHOIS Server" referral. Parsed results are cached for a TTL, concurrent
+    lookups of the same domain share one query, and every WHOIS server gets
+    its own small concurrency limit so bulk runs do not get us banned.
+    """
+
+    def __init__(self, resolver: Any = None, timeout: Optional[float] = None,
+                 cache_ttl: Optional[float] = None, per_server_concurrency: Optional[int] = None):
+        self.resolver = resolver
+        self.timeout = timeout or config.get("modules.domain_recon.whois.timeout", 10)
+        self.cache_ttl = cache_ttl or config.get("modules.domain_recon.whois.cache_ttl", 86400)
+        self.per_server_concurrency = per_server_concurrency or config.get(
+            "modules.domain_recon.whois.per_server_concurrency", 2)
+        self.iana_server = config.get("modules.domain_recon.whois.iana_server", "whois.iana.org")
+        self.servers: Dict[str, str] = dict(config.get("modules.domain_recon.whois.servers", {}) or {})
+        self.max_response_size = 1024 * 1024
+        self._referrals = SingleFlight(ttl=config.get("modules.domain_recon.whois.referral_ttl", 604800))
+        self._results = SingleFlight(ttl=self.cache_ttl)
+        self._semaphores: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+
+    @staticmethod
+    def _parse_server(server: str) -> Tuple[str, int]:
+        """Split "host" or "host:port" into (host, port)"""
+        server = server.strip()
+        for prefix in ('whois://', 'rwhois://', 'http://', 'https://'):
+            if server.lower().startswith(prefix):
+                server = server[len(prefix):]
+        server = server.rstrip('/')
+        if server.count(':') == 1:
+            host, port = server.split(':')
+            return host, int(port)
+        return server, 43
+
+    def _semaphore(self, server: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        for key in [k for k in self._semaphores if k[0].is_closed()]:
+            del self._semaphores[key]
+        semaphore = self._semaphores.get((loop, server))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_server_concurrency)
+            self._semaphores[(loop, server)] = semaphore
+        return semaphore
+
+    async def query_server(self, server: str, query: str) -> str:
+        """Send one query to a WHOIS server and return the raw response"""
+        host, port = self._parse_server(server)
+        async with self._semaphore(f"{host}:{port}"):
+            address = await self._address_of(host)
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port), self.timeout)
+            try:
+                writer.write(f"{query}\r\n".encode('utf-8'))
+                await writer.drain()
+                chunks, size = [], 0
+                while size < self.max_response_size:
+                    data = await asyncio.wait_for(reader.read(65536), self.timeout)
+                    if not data:
+                        break
+                    chunks.append(data)
+                    size += len(data)
+            finally:
+                writer.close()
+
+        raw = b''.join(chunks)
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return raw.decode('latin-1')
+
+    async def _address_of(self, host: str) -> str:
+        """Resolve a WHOIS server through the shared DNS resolver when one is given"""
+        if self.resolver is None or re.match(r'^[\d.]+$|:', host):
+            return host
+        addresses = await self.resolver.query(host, 'A')
+        return addresses[0] if addresses else host
+
+    async def registry_server(self, tld: str) -> str:
+        """Find the registry WHOIS server for a TLD (cached)"""
+        tld = tld.lower()
+        if tld in self.servers:
+            return self.servers[tld]
+        return await self._referrals.do(tld, lambda: self._ask_iana(tld))
+
+    async def _ask_iana(self, tld: str) -> str:
+        response = await self.query_server(self.iana_server, tld)
+        for line in response.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() in ('refer', 'whois') and value.strip():
+                logger.debug(f"WHOIS server for .{tld} is {value.strip()}")
+                return value.strip()
+        raise ReconException(f"No WHOIS server known for .{tld}")
+
+    async def lookup(self, domain: str) -> Dict[str, Any]:
+        """Look up and parse the WHOIS record of a domain (cached for cache_ttl)"""
+        domain = domain.strip().rstrip('.').lower().encode('idna').decode('ascii')
+        record = await self._results.do(domain, lambda: self._lookup(domain))
+        return dict(record)
+
+    async def _lookup(self, domain: str) -> Dict[str, Any]:
+        registry = await self.registry_server(domain.rsplit('.', 1)[-1])
+        response = await self.query_server(registry, domain)
+        record = parse_whois(response)
+        lowered = response.lower()
+        if not (record['domain_name'] or record['creation_date']) and any(
+                marker in lowered for marker in NOT_FOUND_MARKERS):
+            raise ReconException(f"No WHOIS record found for {domain}")
+        record['whois_server'] = registry
+
+        # Thin registries (e.g. .com) point at the registrar's server for the full record
+        referral = self._find_referral(response)
+        if referral and self._parse_server(referral) != self._parse_server(registry):
+            try:
+                details = parse_whois(await self.query_server(referral, domain))
+                record.update({key: value for key, value in details.items() if value})
+                record['whois_server'] = referral
+            except (OSError, asyncio.TimeoutError, ReconException) as e:
+                logger.debug(f"Registrar WHOIS {referral} failed for {domain}: {e}")
+                record['referral_error'] = f"{referral}: {str(e) or type(e).__name__}"
+
+        return record
+
+    @staticmethod
+    def _find_referral(response: str) -> Optional[str]:
+        for line in response.splitlines():
+            key, _, value = line.strip().partition(':')
+            if key.lower() in ('registrar whois server', 'whois server', 'referralserver') and value.strip():
+                return value.strip()
+        return None
@@ -5,7 +5,7 @@ Author: xPOURY4
 
 from .base_module import BaseReconModule
 from .github_recon import GitHubRecon
-from .domain_recon import DomainRecon
+from .domain_recon import DomainRecon, subdomain_source
 from .phone_recon import PhoneRecon
 from .linkedin_recon import LinkedInRecon
 from .shodan_recon import ShodanRecon
@@ -14,6 +14,7 @@ __all__ = [
     "BaseReconModule",
     "GitHubRecon",
     "DomainRecon", 
+    "subdomain_source",
     "PhoneRecon",
     "LinkedInRecon",
     "ShodanRecon"
@@ -3,39 +3,75 @@ Base module for all reconnaissance modules
 Author: xPOURY4
 """
 
+import copy
+import json
+import time
+import socket
 import asyncio
 import aiohttp
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, AsyncIterator, Awaitable, List, Optional, Tuple, Union
+from datetime import datetime, timezone
 
 from ..core.config_manager import config
 from ..core.logger import logger
-from ..core.exceptions import APIException, NetworkException
+from ..core.exceptions import APIException, NetworkException, BudgetExhausted
+from ..core.rate_limiter import RateLimiter
+from ..core.single_flight import SingleFlight
 
 
 class BaseReconModule(ABC):
     """Base class for all reconnaissance modules"""
     
+    # Response headers returned by make_request_with_headers (and kept in the cache)
+    KEPT_HEADERS = ('Link',)
+    
     def __init__(self, module_name: str):
         self.module_name = module_name
         self.session = None
+        self.http_pool = None
+        self.rate_limiter = RateLimiter()
+        self.response_cache = None
+        self.single_flight = SingleFlight()
+        self.dns_resolver = None
+        self.budget = None
+        self._owns_session = False
+        self._session_users = 0
         self.timeout = config.get("settings.timeout", 30)
         self.max_retries = config.get("settings.max_retries", 3)
         self.rate_limit_delay = config.get("settings.rate_limit_delay", 1.0)
     
     async def __aenter__(self):
-        """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={'User-Agent': 'xPOURY4-Recon/1.0.0'}
-        )
+        """Async context manager entry
+        
+        Without the engine's pool, concurrent investigations on one instance
+        share a single owned session, which the last of them to exit closes.
+        """
+        if self.http_pool:
+            # Reuse the engine's pooled connections
+            self.session = self.http_pool.get_session()
+            self._owns_session = False
+            return self
+        
+        if not self._session_users or self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': 'xPOURY4-Recon/1.0.0'}
+            )
+            self._owns_session = True
+        self._session_users += 1
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        if not self._owns_session:
+            return
+        self._session_users -= 1
+        if self._session_users <= 0:
+            self._session_users = 0
+            session, self.session = self.session, None
+            if session:
+                await session.close()
     
     @abstractmethod
     async def investigate(self, target: str, **kwargs) -> Dict[str, Any]:
@@ -48,19 +84,87 @@ class BaseReconModule(ABC):
         pass
     
     async def make_request(self, url: str, method: str = "GET", **kwargs) -> Dict[str, Any]:
-        """Make HTTP request with retry logic and error handling"""
-        if not self.session:
+        """Make HTTP request, coalescing identical concurrent GET requests"""
+        data, _ = await self.make_request_with_headers(url, method, **kwargs)
+        return data
+    
+    async def make_request_with_headers(self, url: str, method: str = "GET",
+                                        **kwargs) -> Tuple[Any, Dict[str, str]]:
+        """Make HTTP request and also return the response headers listed in KEPT_HEADERS
+        
+        Identical concurrent GET requests (same URL, parameters and headers)
+        share one call; every caller gets its own copy of the result.
+        """
+        if self.single_flight and method.upper() == "GET":
+            key = ('http', url, json.dumps([
+                sorted((kwargs.get('params') or {}).items()),
+                sorted((name.lower(), value) for name, value in (kwargs.get('headers') or {}).items())
+            ], default=str))
+            data, headers = await self.single_flight.do(
+                key, lambda: self._send_request(url, method, **kwargs)
+            )
+            return copy.deepcopy(data), dict(headers)
+        return await self._send_request(url, method, **kwargs)
+    
+    async def _send_request(self, url: str, method: str = "GET", **kwargs) -> Tuple[Any, Dict[str, str]]:
+        """Send HTTP request with retry logic and error handling"""
+        session = self.http_pool.get_session() if self.http_pool else self.session
+        if not session:
             raise NetworkException("Session not initialized. Use async context manager.")
         
+        # Revalidate cached GET responses with conditional headers
+        cache_key = None
+        cached = None
+        if self.response_cache and method.upper() == "GET":
+            cache_key = self.response_cache.make_key(
+                method, url, kwargs.get('params'), kwargs.get('headers')
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached:
+                headers = dict(kwargs.get('headers') or {})
+                headers.update(self.response_cache.conditional_headers(cached))
+                kwargs['headers'] = headers
+        
+        # A logical request is charged to its query budget once, however
+        # many times it has to be retried
+        charged = False
         for attempt in range(self.max_retries):
             try:
-                async with self.session.request(method, url, **kwargs) as response:
+                await self._acquire_slot(url, charge=not charged)
+                charged = True
+                async with session.request(method, url, **kwargs) as response:
+                    informed = self.rate_limiter.update_from_response(
+                        url, response.status, response.headers
+                    )
+                    reconciled = self.budget.reconcile(url, response.headers) if self.budget else False
+                    
                     if response.status == 200:
-                        return await response.json()
-                    elif response.status == 429:  # Rate limited
-                        wait_time = self.rate_limit_delay * (2 ** attempt)
-                        logger.warning(f"Rate limited. Waiting {wait_time}s before retry...")
-                        await asyncio.sleep(wait_time)
+                        data = await response.json()
+                        kept = {
+                            name: response.headers[name]
+                            for name in self.KEPT_HEADERS if name in response.headers
+                        }
+                        if cache_key:
+                            self.response_cache.put(
+                                cache_key,
+                                response.headers.get('ETag'),
+                                response.headers.get('Last-Modified'),
+                                await response.text(),
+                                kept
+                            )
+                        return data, kept
+                    elif response.status == 304 and cached:
+                        # Not Modified answers are free, unless the provider's
+                        # own count (already adopted above) says otherwise
+                        if self.budget and not reconciled:
+                            self.budget.refund(url)
+                        self.response_cache.touch(cache_key)
+                        return json.loads(cached['body']), cached['headers']
+                    elif response.status == 429 or (response.status == 403 and informed):
+                        # Rate limited - the limiter holds the host until it is safe to retry
+                        if not informed:
+                            self.rate_limiter.backoff(url, self.rate_limit_delay * (2 ** attempt))
+                        logger.warning(f"Rate limited by {RateLimiter.host_of(url)}, retrying...")
                         continue
                     else:
                         raise APIException(
@@ -72,8 +176,114 @@ class BaseReconModule(ABC):
                     raise NetworkException(f"Network error after {self.max_retries} attempts: {e}")
                 await asyncio.sleep(self.rate_limit_delay * (attempt + 1))
         
+        # Every attempt was rate limited, so the provider never served (or counted) it
+        if self.budget and charged:
+            self.budget.refund(url)
         raise NetworkException(f"Failed to complete request after {self.max_retries} attempts")
     
+    async def _acquire_slot(self, url: str, charge: bool = True):
+        """Wait for the request's budget turn (in priority order) and rate limit clearance"""
+        if self.budget:
+            async with self.budget.slot(url, charge=charge):
+                await self.rate_limiter.acquire(url)
+        else:
+            await self.rate_limiter.acquire(url)
+    
+    async def stream_request(self, url: str, method: str = "GET", chunk_size: int = 65536,
+                             **kwargs) -> AsyncIterator[bytes]:
+        """Make HTTP request and yield the response body in chunks as it arrives
+        
+        Rate limiting and retries apply until the body starts; responses are
+        neither coalesced nor cached, so very large bodies never sit in memory.
+        """
+        session = self.http_pool.get_session() if self.http_pool else self.session
+        if not session:
+            raise NetworkException("Session not initialized. Use async context manager.")
+        
+        streamed = False
+        charged = False
+        for attempt in range(self.max_retries):
+            try:
+                await self._acquire_slot(url, charge=not charged)
+                charged = True
+                async with session.request(method, url, **kwargs) as response:
+                    informed = self.rate_limiter.update_from_response(
+                        url, response.status, response.headers
+                    )
+                    if self.budget:
+                        self.budget.reconcile(url, response.headers)
+                    
+                    if response.status == 200:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            streamed = True
+                            yield chunk
+                        return
+                    elif response.status == 429 or (response.status == 403 and informed):
+                        if not informed:
+                            self.rate_limiter.backoff(url, self.rate_limit_delay * (2 ** attempt))
+                        logger.warning(f"Rate limited by {RateLimiter.host_of(url)}, retrying...")
+                        continue
+                    else:
+                        body = await response.content.read(1024)
+                        raise APIException(
+                            f"HTTP {response.status}: {body.decode('utf-8', 'replace')}",
+                            status_code=response.status
+                        )
+            except aiohttp.ClientError as e:
+                if streamed:
+                    # Part of the body was already consumed, so it cannot be replayed
+                    raise NetworkException(f"Connection lost while streaming: {e}")
+                if attempt == self.max_retries - 1:
+                    raise NetworkException(f"Network error after {self.max_retries} attempts: {e}")
+                await asyncio.sleep(self.rate_limit_delay * (attempt + 1))
+        
+        if self.budget and charged:
+            self.budget.refund(url)
+        raise NetworkException(f"Failed to complete request after {self.max_retries} attempts")
+    
+    async def gather_sections(self, sections: Dict[str, Awaitable],
+                              timeout: Union[float, Dict[str, float], None] = None
+                              ) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, float]]:
+        """Run independent coroutines concurrently, each with its own timeout
+        
+        The timeout is either shared by all sections or given per section name.
+        Returns (results, errors, timings) keyed by section name. A section that
+        fails or times out is missing from results and recorded in errors.
+        If a section ran out of query budget, BudgetExhausted is raised once
+        all sections are done, so the whole investigation is deferred.
+        """
+        def timeout_for(name: str) -> Optional[float]:
+            return timeout.get(name) if isinstance(timeout, dict) else timeout
+        
+        async def run(name: str, coro: Awaitable):
+            started = time.monotonic()
+            try:
+                return await asyncio.wait_for(coro, timeout_for(name))
+            finally:
+                timings[name] = round(time.monotonic() - started, 3)
+        
+        timings: Dict[str, float] = {}
+        names = list(sections)
+        outcomes = await asyncio.gather(
+            *(run(name, sections[name]) for name in names), return_exceptions=True
+        )
+        
+        for outcome in outcomes:
+            if isinstance(outcome, BudgetExhausted):
+                raise outcome
+        
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors[name] = f"Timed out after {timeout_for(name)}s"
+            elif isinstance(outcome, BaseException):
+                errors[name] = str(outcome) or type(outcome).__name__
+            else:
+                results[name] = outcome
+        
+        return results, errors, timings
+    
     def format_result(self, success: bool, data: Any = None, error: str = None) -> Dict[str, Any]:
         """Format module result in standard format"""
         return {
@@ -84,6 +294,15 @@ class BaseReconModule(ABC):
             'error': error
         }
     
+    def failure_result(self, error: Exception) -> Dict[str, Any]:
+        """Format a failed investigation; running out of budget yields a deferred result"""
+        if isinstance(error, BudgetExhausted):
+            result = self.format_result(False, error=str(error))
+            result['deferred'] = True
+            result['retry_after'] = datetime.fromtimestamp(error.resets_at, timezone.utc).isoformat()
+            return result
+        return self.format_result(False, error=str(error))
+    
     def validate_input(self, target: str, validation_func=None) -> bool:
         """Validate input target"""
         if not target or not target.strip():
@@ -94,6 +313,25 @@ class BaseReconModule(ABC):
         
         return True
     
-    async def rate_limit(self):
-        """Apply rate limiting"""
-        await asyncio.sleep(self.rate_limit_delay) 
\ No newline at end of file
+    async def resolve_host(self, hostname: str) -> List[str]:
+        """Resolve a host name to its IPv4 addresses, sharing concurrent lookups
+        
+        Goes through the engine's DNS resolver when one is set, so answers
+        are cached for their TTL and shared with every other module.
+        """
+        if self.dns_resolver is not None:
+            return await self.dns_resolver.query(hostname, 'A')
+        
+        async def lookup():
+            loop = asyncio.get_event_loop()
+            _, _, ips = await loop.run_in_executor(None, socket.gethostbyname_ex, hostname)
+            return ips
+        
+        return list(await self.single_flight.do(('dns', hostname.lower()), lookup))
+    
+    async def rate_limit(self, url: Optional[str] = None):
+        """Apply rate limiting, paced by the shared limiter when a URL or host is given"""
+        if url:
+            await self.rate_limiter.acquire(url)
+        else:
+            await asyncio.sleep(self.rate_limit_delay) 
\ No newline at end of file
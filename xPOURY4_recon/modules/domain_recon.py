@@ -4,14 +4,57 @@ Author: xPOURY4
 """
 
 import re
-import socket
+import time
 import asyncio
-import whois
-from typing import Dict, Any, List, Set
+import aiohttp
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, NamedTuple, Optional, Set
 from .base_module import BaseReconModule
 from ..core.config_manager import config
 from ..core.logger import logger
-from ..core.exceptions import ValidationException
+from ..core.exceptions import ReconException, ValidationException, BudgetExhausted
+from ..core.dns_resolver import DNSResolver
+from ..core.mass_resolver import MassResolver
+from ..core.dns_bruteforce import DNSBruteForcer
+from ..core.tls_grabber import TLSGrabber
+from ..core.http_prober import HTTPProber
+from ..core.whois_client import WhoisClient
+from ..core.json_stream import iter_json_array
+from ..core.ct_index import CTIndex
+
+
+DNS_RECORD_TYPES = ('A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME')
+
+# Seconds each phase may run when modules.domain_recon.phase_timeouts does
+# not name it (e.g. a config.yaml written before the phase existed)
+DEFAULT_PHASE_TIMEOUTS = {
+    'whois': 30, 'dns': 15, 'subdomains': 60, 'resolution': 120, 'bruteforce': 600,
+    'certificates': 180, 'http_probe': 300, 'ssl': 15, 'reputation': 30
+}
+
+
+class SubdomainSource(NamedTuple):
+    """A passive subdomain provider: fetch(module, domain) returns host names"""
+    fetch: Callable[[Any, str], Awaitable[Iterable[str]]]
+    available: Optional[Callable[[Any], bool]] = None
+
+
+# Registry of passive subdomain sources, keyed by the names used in
+# modules.domain_recon.subdomain_sources
+SUBDOMAIN_SOURCES: Dict[str, SubdomainSource] = {}
+
+
+def subdomain_source(name: str, available: Optional[Callable[[Any], bool]] = None):
+    """Register an async subdomain source under a name
+
+    The decorated coroutine receives the DomainRecon instance and the domain
+    and returns an iterable of host names; it should raise on failure.
+    available, if given, decides per instance whether the source can run
+    (e.g. whether its API key is configured).
+    """
+    def register(fetch):
+        SUBDOMAIN_SOURCES[name] = SubdomainSource(fetch, available)
+        return fetch
+    return register
 
 
 class DomainRecon(BaseReconModule):
@@ -20,10 +63,29 @@ class DomainRecon(BaseReconModule):
     def __init__(self):
         super().__init__("domain_recon")
         self.subdomain_sources = config.get("modules.domain_recon.subdomain_sources", 
-                                           ["crt.sh", "threatcrowd", "virustotal"])
+                                           ["crt.sh", "threatcrowd", "virustotal", "ct_index"])
         self.dns_servers = config.get("modules.domain_recon.dns_servers", 
                                     ["8.8.8.8", "1.1.1.1"])
+        self.dns_resolver = DNSResolver(self.dns_servers)
+        self.whois_client = WhoisClient(self.dns_resolver)
         self.virustotal_api_key = config.get("api_keys.virustotal_api_key")
+        self.source_timeouts = config.get("modules.domain_recon.source_timeouts", {}) or {}
+        self.crtsh_max_subdomains = config.get("modules.domain_recon.crtsh_max_subdomains", 100000)
+        self.ct_index = CTIndex()
+        # Resolution, certificate harvesting and HTTP probing connect to every
+        # discovered host, so they only run when active reconnaissance is on
+        self.active = config.get("modules.domain_recon.active", False)
+        self.resolve_subdomains = config.get("modules.domain_recon.resolve_subdomains", True)
+        self.bruteforce_enabled = config.get("modules.domain_recon.bruteforce.enabled", False)
+        self.bruteforce_wordlist = config.get("modules.domain_recon.bruteforce.wordlist")
+        self.bruteforce_permutations = config.get("modules.domain_recon.bruteforce.permutations", True)
+        self.tls_enabled = config.get("modules.domain_recon.tls.enabled", True)
+        self.tls_ports = config.get("modules.domain_recon.tls.ports", [443])
+        self.http_probe_enabled = config.get("modules.domain_recon.http_probe.enabled", True)
+        self.phase_timeouts = {
+            phase: config.get(f"modules.domain_recon.phase_timeouts.{phase}", default)
+            for phase, default in DEFAULT_PHASE_TIMEOUTS.items()
+        }
     
     def is_configured(self) -> bool:
         """Check if module is properly configured"""
@@ -40,21 +102,82 @@ class DomainRecon(BaseReconModule):
             if not self.validate_input(domain, self._validate_domain):
                 raise ValidationException(f"Invalid domain format: {domain}")
             
+            active = kwargs.get('active', self.active)
+            resolve = kwargs.get('resolve', active and self.resolve_subdomains)
+            bruteforce = kwargs.get('bruteforce', self.bruteforce_enabled)
+            certificates = kwargs.get('certificates', active and self.tls_enabled) and (resolve or bruteforce)
+            probe = kwargs.get('probe', active and self.http_probe_enabled) and (resolve or bruteforce)
+            mass_resolver = MassResolver(self.dns_resolver)
+            
             async with self:
-                # Get WHOIS information
-                whois_data = await self._get_whois_info(domain)
-                
-                # Get DNS records
-                dns_data = await self._get_dns_records(domain)
+                # The phases are independent, so run them side by side; only
+                # resolution and brute-forcing wait for the enumerated subdomains,
+                # and certificate harvesting and HTTP probing wait for the live
+                # hosts they found
+                subdomains_task = asyncio.ensure_future(self._get_subdomains(domain))
+                host_tasks = []
+                sections = {
+                    'whois': self._get_whois_info(domain),
+                    'dns': self._get_dns_records(domain),
+                    'subdomains': subdomains_task,
+                    'ssl': self._get_ssl_info(domain),
+                    'reputation': self._get_domain_reputation(domain)
+                }
+                if resolve:
+                    sections['resolution'] = asyncio.ensure_future(
+                        self._resolve_discovered(domain, subdomains_task, mass_resolver)
+                    )
+                    host_tasks.append(sections['resolution'])
+                if bruteforce:
+                    sections['bruteforce'] = asyncio.ensure_future(self._bruteforce_subdomains(
+                        domain, subdomains_task, mass_resolver,
+                        wordlist=kwargs.get('wordlist', self.bruteforce_wordlist),
+                        permutations=kwargs.get('permutations', self.bruteforce_permutations)
+                    ))
+                    host_tasks.append(sections['bruteforce'])
+                if certificates:
+                    sections['certificates'] = asyncio.ensure_future(self._harvest_certificates(
+                        domain, subdomains_task, host_tasks, mass_resolver
+                    ))
+                if probe:
+                    sections['http_probe'] = self._probe_hosts(
+                        host_tasks, sections.get('certificates')
+                    )
+                results, errors, timings = await self.gather_sections(sections, self.phase_timeouts)
                 
-                # Get subdomains
-                subdomains_data = await self._get_subdomains(domain)
+                for phase, error in errors.items():
+                    logger.warning(f"Domain phase {phase} failed for {domain}: {error}")
                 
-                # Get SSL certificate information
-                ssl_data = await self._get_ssl_info(domain)
+                whois_data = results.get('whois', {'error': errors.get('whois')})
+                dns_data = results.get('dns', {record_type: [] for record_type in DNS_RECORD_TYPES})
+                subdomains_data = results.get('subdomains', {'subdomains': [], 'count': 0, 'sources_used': []})
+                ssl_data = results.get('ssl', {'error': errors.get('ssl')})
+                reputation_data = results.get('reputation', {'error': errors.get('reputation')})
+                resolution_data = results.get('resolution')
+                if resolution_data is None and resolve:
+                    resolution_data = {'error': errors.get('resolution')}
+                bruteforce_data = results.get('bruteforce')
+                if bruteforce_data is None and bruteforce:
+                    bruteforce_data = {'error': errors.get('bruteforce')}
+                elif bruteforce_data is not None:
+                    subdomains_data = self._merge_found(
+                        subdomains_data, resolution_data, bruteforce_data['live'], 'bruteforce'
+                    )
+                certificates_data = results.get('certificates')
+                if certificates_data is None and certificates:
+                    certificates_data = {'error': errors.get('certificates')}
+                elif certificates_data is not None:
+                    subdomains_data = self._merge_found(
+                        subdomains_data, resolution_data, certificates_data['new_subdomains'], 'tls'
+                    )
+                http_probe_data = results.get('http_probe')
+                if http_probe_data is None and probe:
+                    http_probe_data = {'error': errors.get('http_probe')}
                 
-                # Get domain reputation (if VirusTotal API is available)
-                reputation_data = await self._get_domain_reputation(domain)
+                # Phases report their own soft failures as {'error': ...}
+                for phase, data in results.items():
+                    if isinstance(data, dict) and data.get('error') and phase not in errors:
+                        errors[phase] = data['error']
                 
                 result_data = {
                     'domain': domain,
@@ -63,186 +186,286 @@ class DomainRecon(BaseReconModule):
                     'subdomains': subdomains_data,
                     'ssl_certificate': ssl_data,
                     'reputation': reputation_data,
-                    'statistics': self._generate_statistics(subdomains_data, dns_data)
+                    'statistics': self._generate_statistics(subdomains_data, dns_data, resolution_data),
+                    'phases': {
+                        phase: {'duration': timings.get(phase), 'error': errors.get(phase)}
+                        for phase in self.phase_timeouts if phase in timings
+                    }
                 }
+                if resolution_data is not None:
+                    result_data['resolution'] = resolution_data
+                if bruteforce_data is not None:
+                    result_data['bruteforce'] = bruteforce_data
+                if certificates_data is not None:
+                    result_data['certificates'] = certificates_data
+                if http_probe_data is not None:
+                    result_data['http_probe'] = http_probe_data
+                    if 'statistics' in http_probe_data:
+                        result_data['statistics']['serving_hosts'] = http_probe_data['statistics']['serving']
                 
                 return self.format_result(True, result_data)
                 
         except Exception as e:
             logger.error(f"Domain reconnaissance failed for {domain}: {e}")
-            return self.format_result(False, error=str(e))
+            return self.failure_result(e)
+    
+    @staticmethod
+    async def _await_phase(task: asyncio.Future, description: str) -> Any:
+        """Wait for another phase's result without cancelling it on our own timeout"""
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise ReconException(f"{description} did not finish")
+            raise
+    
+    async def _await_subdomains(self, subdomains_task: asyncio.Future) -> List[str]:
+        """Wait for enumeration to finish and return the names it found"""
+        subdomains_data = await self._await_phase(subdomains_task, "Subdomain enumeration")
+        return subdomains_data.get('subdomains', [])
+    
+    async def _resolve_discovered(self, domain: str, subdomains_task: asyncio.Future,
+                                  mass_resolver: MassResolver) -> Dict[str, Any]:
+        """Resolve the enumerated subdomains once enumeration has finished"""
+        names = await self._await_subdomains(subdomains_task)
+        logger.info(f"Resolving {len(names)} subdomains of {domain}")
+        return await mass_resolver.resolve_all(names, domain)
+    
+    async def _bruteforce_subdomains(self, domain: str, subdomains_task: asyncio.Future,
+                                     mass_resolver: MassResolver, wordlist: Optional[str] = None,
+                                     permutations: bool = True) -> Dict[str, Any]:
+        """Actively discover subdomains the passive sources did not report"""
+        try:
+            known = set(await self._await_subdomains(subdomains_task))
+        except Exception as e:
+            logger.warning(f"Brute-forcing {domain} without passive results: {e}")
+            known = set()
+        known.add(domain.lower())
+        return await DNSBruteForcer(mass_resolver).run(domain, known, wordlist, permutations)
+    
+    async def _harvest_certificates(self, domain: str, subdomains_task: asyncio.Future,
+                                    host_tasks: List[asyncio.Future],
+                                    mass_resolver: MassResolver) -> Dict[str, Any]:
+        """Collect certificates from every live host and resolve new names from their SANs"""
+        live: Dict[str, List[str]] = {}
+        for task in host_tasks:
+            try:
+                live.update((await self._await_phase(task, "Host discovery")).get('live', {}))
+            except Exception as e:
+                logger.debug(f"Certificate harvest skips a failed discovery phase: {e}")
+        
+        grabber = TLSGrabber(self.dns_resolver)
+        harvest = await grabber.grab_many(
+            [(host, port) for host in live for port in self.tls_ports],
+            addresses={host: ips[0] for host, ips in live.items()}
+        )
+        
+        try:
+            known = set(await self._await_subdomains(subdomains_task))
+        except Exception:
+            known = set()
+        known.update(live)
+        new_names = self._filter_subdomains(harvest['names'], domain) - known
+        
+        harvest['new_subdomains'] = {}
+        if new_names:
+            logger.info(f"Certificates named {len(new_names)} new subdomains of {domain}")
+            resolved = await mass_resolver.resolve_all(new_names, domain, keep_dead=False)
+            harvest['new_subdomains'] = resolved['live']
+        return harvest
+    
+    async def _probe_hosts(self, host_tasks: List[asyncio.Future],
+                           certificates_task: Optional[asyncio.Future] = None) -> Dict[str, Any]:
+        """Probe every live host over HTTP(S), including names learnt from certificates"""
+        live: Dict[str, List[str]] = {}
+        for task in host_tasks:
+            try:
+                live.update((await self._await_phase(task, "Host discovery")).get('live', {}))
+            except Exception as e:
+                logger.debug(f"HTTP probing skips a failed discovery phase: {e}")
+        if certificates_task is not None:
+            try:
+                live.update((await self._await_phase(certificates_task, "Certificate harvest"))['new_subdomains'])
+            except Exception as e:
+                logger.debug(f"HTTP probing skips certificate names: {e}")
+        
+        prober = HTTPProber(self.dns_resolver)
+        return await prober.probe_many(sorted(live), addresses={host: ips[0] for host, ips in live.items()})
+    
+    def _merge_found(self, subdomains_data: Dict, resolution_data: Optional[Dict],
+                     live: Dict[str, List[str]], source: str) -> Dict[str, Any]:
+        """Add actively discovered live names to the subdomain list and resolution buckets"""
+        subdomains = sorted(set(subdomains_data.get('subdomains', [])) | set(live))
+        sources = list(subdomains_data.get('sources_used', []))
+        if live and source not in sources:
+            sources.append(source)
+        
+        if resolution_data and 'statistics' in resolution_data:
+            resolution_data['live'] = dict(sorted({**resolution_data['live'], **live}.items()))
+            resolution_data['statistics']['live'] = len(resolution_data['live'])
+        
+        return {**subdomains_data, 'subdomains': subdomains, 'count': len(subdomains), 'sources_used': sources}
     
     async def _get_whois_info(self, domain: str) -> Dict[str, Any]:
         """Get WHOIS information"""
         try:
-            # Run WHOIS lookup in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            whois_data = await loop.run_in_executor(None, whois.whois, domain)
-            
-            return {
-                'domain_name': whois_data.domain_name,
-                'registrar': whois_data.registrar,
-                'creation_date': str(whois_data.creation_date) if whois_data.creation_date else None,
-                'expiration_date': str(whois_data.expiration_date) if whois_data.expiration_date else None,
-                'updated_date': str(whois_data.updated_date) if whois_data.updated_date else None,
-                'name_servers': whois_data.name_servers,
-                'status': whois_data.status,
-                'emails': whois_data.emails,
-                'country': getattr(whois_data, 'country', None),
-                'org': getattr(whois_data, 'org', None)
-            }
-            
+            # Follow the resolver the engine may have assigned after __init__
+            self.whois_client.resolver = self.dns_resolver
+            return await self.whois_client.lookup(domain)
+        except asyncio.TimeoutError:
+            logger.warning(f"WHOIS lookup timed out for {domain}")
+            return {'error': "timed out"}
         except Exception as e:
             logger.warning(f"WHOIS lookup failed for {domain}: {e}")
             return {'error': str(e)}
     
     async def _get_dns_records(self, domain: str) -> Dict[str, List[str]]:
         """Get DNS records"""
-        dns_records = {
-            'A': [],
-            'AAAA': [],
-            'MX': [],
-            'NS': [],
-            'TXT': [],
-            'CNAME': []
-        }
+        dns_records = {record_type: [] for record_type in DNS_RECORD_TYPES}
         
         try:
-            loop = asyncio.get_event_loop()
-            
-            # A records
-            try:
-                a_records = await loop.run_in_executor(None, socket.gethostbyname_ex, domain)
-                dns_records['A'] = a_records[2]
-            except:
-                pass
-            
-            # Additional DNS lookups would require dnspython library
-            # For now, we'll keep it simple with basic socket operations
-            
+            # All record types are queried concurrently against the configured servers
+            dns_records.update(await self.dns_resolver.resolve(domain, DNS_RECORD_TYPES))
         except Exception as e:
             logger.warning(f"DNS lookup failed for {domain}: {e}")
         
         return dns_records
     
     async def _get_subdomains(self, domain: str) -> Dict[str, Any]:
-        """Get subdomains from multiple sources"""
-        all_subdomains = set()
+        """Get subdomains from all enabled sources concurrently
+        
+        Every source runs under its own deadline and its names are merged as
+        soon as it finishes, so a slow or dead source only costs its own
+        timeout instead of delaying the others.
+        """
+        all_subdomains: Set[str] = set()
         sources_used = []
+        source_stats = {}
+        exhausted: List[BudgetExhausted] = []
+        
+        sources = {}
+        for name in self.subdomain_sources:
+            source = SUBDOMAIN_SOURCES.get(name)
+            if source is None:
+                logger.warning(f"Unknown subdomain source: {name}")
+            elif source.available is None or source.available(self):
+                sources[name] = source
         
-        # Certificate Transparency logs (crt.sh)
-        if "crt.sh" in self.subdomain_sources:
-            crt_subdomains = await self._get_crtsh_subdomains(domain)
-            all_subdomains.update(crt_subdomains)
-            sources_used.append("crt.sh")
+        async def run_source(name: str, source: SubdomainSource):
+            started = time.monotonic()
+            timeout = self.source_timeouts.get(name, self.timeout)
+            try:
+                names = await asyncio.wait_for(source.fetch(self, domain), timeout)
+                error = None
+            except asyncio.TimeoutError:
+                names, error = (), f"Timed out after {timeout}s"
+            except BudgetExhausted as e:
+                exhausted.append(e)
+                names, error = (), str(e)
+            except Exception as e:
+                names, error = (), str(e) or type(e).__name__
+            return name, names, error, time.monotonic() - started
         
-        # ThreatCrowd
-        if "threatcrowd" in self.subdomain_sources:
-            tc_subdomains = await self._get_threatcrowd_subdomains(domain)
-            all_subdomains.update(tc_subdomains)
-            sources_used.append("threatcrowd")
+        for finished in asyncio.as_completed([run_source(n, s) for n, s in sources.items()]):
+            name, names, error, duration = await finished
+            found = self._filter_subdomains(names, domain)
+            all_subdomains.update(found)
+            source_stats[name] = {'count': len(found), 'duration': round(duration, 3), 'error': error}
+            if error:
+                logger.warning(f"Subdomain source {name} failed for {domain}: {error}")
+            else:
+                sources_used.append(name)
         
-        # VirusTotal (if API key is available)
-        if "virustotal" in self.subdomain_sources and self.virustotal_api_key:
-            vt_subdomains = await self._get_virustotal_subdomains(domain)
-            all_subdomains.update(vt_subdomains)
-            sources_used.append("virustotal")
+        # Let the other sources finish, then defer the investigation
+        if exhausted:
+            raise exhausted[0]
         
         return {
             'subdomains': sorted(list(all_subdomains)),
             'count': len(all_subdomains),
-            'sources_used': sources_used
+            'sources_used': sources_used,
+            'sources': source_stats
         }
     
+    @staticmethod
+    def _filter_subdomains(names: Iterable[str], domain: str) -> Set[str]:
+        """Normalise source output and keep only names below the domain"""
+        domain = domain.lower()
+        suffix = '.' + domain
+        subdomains = set()
+        for name in names:
+            name = str(name).strip().lower().rstrip('.')
+            if name and not name.startswith('*') and (name == domain or name.endswith(suffix)):
+                subdomains.add(name)
+        return subdomains
+    
+    @subdomain_source("crt.sh")
     async def _get_crtsh_subdomains(self, domain: str) -> Set[str]:
-        """Get subdomains from Certificate Transparency logs"""
+        """Get subdomains from Certificate Transparency logs
+        
+        The response can run to hundreds of megabytes for popular domains, so
+        it is parsed as it streams in and only the unique names are kept, up
+        to crtsh_max_subdomains.
+        """
         subdomains = set()
+        domain = domain.lower()
+        suffix = '.' + domain
         
+        url = f"https://crt.sh/?q=%25.{domain}&output=json"
+        # The overall session timeout would cut long downloads short; the
+        # source deadline bounds the whole fetch instead
+        entries = iter_json_array(self.stream_request(
+            url, timeout=aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        ))
         try:
-            url = f"https://crt.sh/?q=%25.{domain}&output=json"
-            response = await self.make_request(url)
-            
-            for entry in response:
-                name_value = entry.get('name_value', '')
+            async for entry in entries:
                 # Split by newlines as crt.sh can return multiple domains per entry
-                for subdomain in name_value.split('\n'):
-                    subdomain = subdomain.strip()
-                    if subdomain and not subdomain.startswith('*'):
+                for subdomain in entry.get('name_value', '').split('\n'):
+                    subdomain = subdomain.strip().lower()
+                    if subdomain == domain or subdomain.endswith(suffix) and not subdomain.startswith('*'):
                         subdomains.add(subdomain)
-            
-        except Exception as e:
-            logger.warning(f"crt.sh lookup failed for {domain}: {e}")
+                if len(subdomains) >= self.crtsh_max_subdomains:
+                    logger.warning(f"crt.sh returned over {self.crtsh_max_subdomains} subdomains for {domain}, "
+                                   f"keeping the first {self.crtsh_max_subdomains}")
+                    break
+        finally:
+            await entries.aclose()
         
         return subdomains
     
+    @subdomain_source("ct_index", available=lambda recon: recon.ct_index.exists())
+    async def _get_ct_index_subdomains(self, domain: str) -> List[str]:
+        """Get subdomains from the local Certificate Transparency index"""
+        return self.ct_index.subdomains(domain, limit=self.crtsh_max_subdomains)
+    
+    @subdomain_source("threatcrowd")
     async def _get_threatcrowd_subdomains(self, domain: str) -> Set[str]:
         """Get subdomains from ThreatCrowd"""
-        subdomains = set()
-        
-        try:
-            url = f"https://www.threatcrowd.org/searchApi/v2/domain/report/?domain={domain}"
-            response = await self.make_request(url)
-            
-            if response.get('subdomains'):
-                subdomains.update(response['subdomains'])
-            
-        except Exception as e:
-            logger.warning(f"ThreatCrowd lookup failed for {domain}: {e}")
+        url = f"https://www.threatcrowd.org/searchApi/v2/domain/report/?domain={domain}"
+        response = await self.make_request(url)
         
-        return subdomains
+        return set(response.get('subdomains') or [])
     
+    @subdomain_source("virustotal", available=lambda recon: bool(recon.virustotal_api_key))
     async def _get_virustotal_subdomains(self, domain: str) -> Set[str]:
         """Get subdomains from VirusTotal"""
-        subdomains = set()
+        url = f"https://www.virustotal.com/vtapi/v2/domain/report"
+        params = {
+            'apikey': self.virustotal_api_key,
+            'domain': domain
+        }
         
-        if not self.virustotal_api_key:
-            return subdomains
+        response = await self.make_request(url, params=params)
         
-        try:
-            url = f"https://www.virustotal.com/vtapi/v2/domain/report"
-            params = {
-                'apikey': self.virustotal_api_key,
-                'domain': domain
-            }
-            
-            response = await self.make_request(url, params=params)
-            
-            if response.get('subdomains'):
-                subdomains.update(response['subdomains'])
-            
-        except Exception as e:
-            logger.warning(f"VirusTotal lookup failed for {domain}: {e}")
-        
-        return subdomains
+        return set(response.get('subdomains') or [])
     
     async def _get_ssl_info(self, domain: str) -> Dict[str, Any]:
-        """Get SSL certificate information"""
+        """Get SSL certificate information, including whether it verifies for the domain"""
         try:
-            import ssl
-            import socket
-            
-            loop = asyncio.get_event_loop()
-            
-            def get_cert_info():
-                context = ssl.create_default_context()
-                with socket.create_connection((domain, 443), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                        cert = ssock.getpeercert()
-                        return cert
-            
-            cert_info = await loop.run_in_executor(None, get_cert_info)
-            
-            return {
-                'subject': dict(x[0] for x in cert_info.get('subject', [])),
-                'issuer': dict(x[0] for x in cert_info.get('issuer', [])),
-                'version': cert_info.get('version'),
-                'serial_number': cert_info.get('serialNumber'),
-                'not_before': cert_info.get('notBefore'),
-                'not_after': cert_info.get('notAfter'),
-                'signature_algorithm': cert_info.get('signatureAlgorithm'),
-                'subject_alt_names': [x[1] for x in cert_info.get('subjectAltName', [])]
-            }
-            
+            return await TLSGrabber(self.dns_resolver).grab(domain, 443, verify=True)
+        except asyncio.TimeoutError:
+            logger.warning(f"SSL certificate lookup timed out for {domain}")
+            return {'error': "timed out"}
         except Exception as e:
             logger.warning(f"SSL certificate lookup failed for {domain}: {e}")
             return {'error': str(e)}
@@ -270,17 +493,24 @@ class DomainRecon(BaseReconModule):
                 'permalink': response.get('permalink')
             }
             
+        except BudgetExhausted:
+            raise
         except Exception as e:
             logger.warning(f"VirusTotal reputation lookup failed for {domain}: {e}")
             return {'error': str(e)}
     
-    def _generate_statistics(self, subdomains_data: Dict, dns_data: Dict) -> Dict[str, Any]:
+    def _generate_statistics(self, subdomains_data: Dict, dns_data: Dict,
+                             resolution_data: Optional[Dict] = None) -> Dict[str, Any]:
         """Generate statistics from collected data"""
-        return {
+        statistics = {
             'total_subdomains': subdomains_data.get('count', 0),
             'subdomain_sources': subdomains_data.get('sources_used', []),
             'dns_records_found': sum(1 for records in dns_data.values() if records),
             'has_a_records': bool(dns_data.get('A')),
             'has_mx_records': bool(dns_data.get('MX')),
             'has_txt_records': bool(dns_data.get('TXT'))
-        } 
\ No newline at end of file
+        }
+        if resolution_data and 'statistics' in resolution_data:
+            statistics['live_subdomains'] = resolution_data['statistics']['live']
+            statistics['wildcard_subdomains'] = resolution_data['statistics']['wildcard']
+        return statistics 
\ No newline at end of file
@@ -4,13 +4,52 @@ Author: xPOURY4
 """
 
 import re
-from typing import Dict, Any, List
+import json
+import heapq
+import asyncio
+from collections import Counter
+from typing import Dict, Any, List, Optional, AsyncIterator, Set
+from urllib.parse import urlparse, parse_qs
 from .base_module import BaseReconModule
 from ..core.config_manager import config
 from ..core.logger import logger
-from ..core.exceptions import ValidationException
+from ..core.exceptions import ValidationException, APIException
 
 
+# Fields fetched per user by the GraphQL backend, mirroring the REST sections
+GRAPHQL_USER_FRAGMENT = """
+fragment UserFields on User {
+  login name bio location company email websiteUrl twitterUsername
+  avatarUrl url createdAt updatedAt isHireable isSiteAdmin
+  followers { totalCount }
+  following { totalCount }
+  repositories(first: $repos, ownerAffiliations: OWNER, privacy: PUBLIC,
+               orderBy: {field: UPDATED_AT, direction: DESC}) {
+    totalCount
+    nodes {
+      name nameWithOwner description url diskUsage
+      primaryLanguage { name }
+      stargazerCount forkCount
+      issues(states: OPEN) { totalCount }
+      createdAt updatedAt pushedAt
+      isPrivate isFork isArchived isDisabled
+      repositoryTopics(first: 20) { nodes { topic { name } } }
+    }
+  }
+  gists(first: $gists, privacy: PUBLIC, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    totalCount
+    nodes {
+      name description url isPublic createdAt updatedAt
+      files { name }
+      comments { totalCount }
+    }
+  }
+  organizations(first: $orgs) {
+    nodes { login description url avatarUrl }
+  }
+}
+"""
+
 class GitHubRecon(BaseReconModule):
     """Enhanced GitHub reconnaissance module"""
     
@@ -21,6 +60,13 @@ class GitHubRecon(BaseReconModule):
         self.include_repos = config.get("modules.github_recon.include_repos", True)
         self.include_gists = config.get("modules.github_recon.include_gists", True)
         self.max_repos = config.get("modules.github_recon.max_repos", 100)
+        self.max_gists = config.get("modules.github_recon.max_gists", 50)
+        self.max_organizations = config.get("modules.github_recon.max_organizations", 100)
+        self.max_events = config.get("modules.github_recon.max_events", 20)
+        self.page_concurrency = config.get("modules.github_recon.page_concurrency", 4)
+        self.backend = config.get("modules.github_recon.backend", "rest")
+        self.graphql_batch_size = config.get("modules.github_recon.graphql_batch_size", 20)
+        self.section_timeout = config.get("modules.github_recon.section_timeout", self.timeout)
     
     def is_configured(self) -> bool:
         """Check if GitHub token is configured"""
@@ -41,39 +87,101 @@ class GitHubRecon(BaseReconModule):
                 logger.warning("GitHub token not configured. Some features may be limited.")
             
             async with self:
-                # Get user profile
-                user_data = await self._get_user_profile(username)
+                if self._use_graphql():
+                    users = await self._get_graphql_users([username])
+                    return await self._investigate_graphql_user(username, users.get(username))
                 
-                # Get repositories if enabled
-                repos_data = []
+                # None of the sub-requests depend on each other, so fan them out
+                sections = {
+                    'profile': self._get_user_profile(username),
+                    'organizations': self._get_user_organizations(username),
+                    'recent_activity': self._get_user_events(username)
+                }
                 if self.include_repos:
-                    repos_data = await self._get_user_repositories(username)
-                
-                # Get gists if enabled
-                gists_data = []
+                    sections['repositories'] = self._get_user_repositories(username)
                 if self.include_gists:
-                    gists_data = await self._get_user_gists(username)
-                
-                # Get organizations
-                orgs_data = await self._get_user_organizations(username)
-                
-                # Get events (recent activity)
-                events_data = await self._get_user_events(username)
-                
-                result_data = {
-                    'profile': user_data,
-                    'repositories': repos_data,
-                    'gists': gists_data,
-                    'organizations': orgs_data,
-                    'recent_activity': events_data,
-                    'statistics': self._generate_statistics(user_data, repos_data, gists_data)
-                }
+                    sections['gists'] = self._get_user_gists(username)
                 
-                return self.format_result(True, result_data)
+                results, errors, _ = await self.gather_sections(sections, self.section_timeout)
+                return self._build_result(username, results, errors)
                 
         except Exception as e:
             logger.error(f"GitHub reconnaissance failed for {username}: {e}")
-            return self.format_result(False, error=str(e))
+            return self.failure_result(e)
+    
+    async def investigate_many(self, usernames: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Investigate several GitHub users
+        
+        With the GraphQL backend the profiles, repositories, gists and
+        organizations of the whole list are fetched in aliased batch queries.
+        """
+        if not self._use_graphql():
+            return list(await asyncio.gather(*(self.investigate(u, **kwargs) for u in usernames)))
+        
+        valid = [u for u in usernames if self.validate_input(u, self._validate_username)]
+        
+        async def investigate_user(username: str, users: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                if username not in valid:
+                    raise ValidationException(f"Invalid GitHub username: {username}")
+                return await self._investigate_graphql_user(username, users.get(username))
+            except Exception as e:
+                logger.error(f"GitHub reconnaissance failed for {username}: {e}")
+                return self.failure_result(e)
+        
+        try:
+            async with self:
+                users = await self._get_graphql_users(valid)
+                return list(await asyncio.gather(*(investigate_user(u, users) for u in usernames)))
+        except Exception as e:
+            logger.error(f"GitHub batch reconnaissance failed: {e}")
+            return [self.failure_result(e) for _ in usernames]
+    
+    def _use_graphql(self) -> bool:
+        """Check whether the GraphQL backend is selected and usable"""
+        if self.backend != "graphql":
+            return False
+        if not self.is_configured():
+            logger.warning("GitHub GraphQL backend requires a token. Falling back to REST.")
+            return False
+        return True
+    
+    async def _investigate_graphql_user(self, username: str, user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Complete a GraphQL-fetched user with the REST-only sections"""
+        if user is None:
+            raise APIException(f"GitHub user not found: {username}", status_code=404, api_name="github")
+        
+        # Public events are only exposed by the REST API
+        results, errors, _ = await self.gather_sections(
+            {'recent_activity': self._get_user_events(username)}, self.section_timeout
+        )
+        results.update(user)
+        return self._build_result(username, results, errors)
+    
+    def _build_result(self, username: str, results: Dict[str, Any], errors: Dict[str, str]) -> Dict[str, Any]:
+        """Assemble the investigation result from the collected sections"""
+        # Without a profile there is nothing to report on
+        if 'profile' in errors:
+            raise APIException(errors['profile'], api_name="github")
+        
+        for section, error in errors.items():
+            logger.warning(f"Failed to get {section} for {username}: {error}")
+        
+        user_data = results['profile']
+        repos_data = results.get('repositories', [])
+        gists_data = results.get('gists', [])
+        
+        result_data = {
+            'profile': user_data,
+            'repositories': repos_data,
+            'gists': gists_data,
+            'organizations': results.get('organizations', []),
+            'recent_activity': results.get('recent_activity', []),
+            'statistics': self._generate_statistics(user_data, repos_data, gists_data),
+            'errors': errors
+        }
+        
+        return self.format_result(True, result_data)
     
     async def _get_user_profile(self, username: str) -> Dict[str, Any]:
         """Get user profile information"""
@@ -108,50 +216,68 @@ class GitHubRecon(BaseReconModule):
         }
     
     async def _get_user_repositories(self, username: str) -> List[Dict[str, Any]]:
-        """Get user repositories"""
+        """Get user repositories, up to max_repos across all pages"""
         url = f"{self.base_url}/users/{username}/repos"
         headers = {}
         
         if self.api_token:
             headers['Authorization'] = f"token {self.api_token}"
         
-        params = {
-            'sort': 'updated',
-            'per_page': min(self.max_repos, 100)
-        }
+        params = {'sort': 'updated'}
         
-        try:
-            response = await self.make_request(url, headers=headers, params=params)
-            
-            repos = []
-            for repo in response[:self.max_repos]:
-                repos.append({
-                    'name': repo.get('name'),
-                    'full_name': repo.get('full_name'),
-                    'description': repo.get('description'),
-                    'html_url': repo.get('html_url'),
-                    'clone_url': repo.get('clone_url'),
-                    'language': repo.get('language'),
-                    'size': repo.get('size'),
-                    'stargazers_count': repo.get('stargazers_count', 0),
-                    'watchers_count': repo.get('watchers_count', 0),
-                    'forks_count': repo.get('forks_count', 0),
-                    'open_issues_count': repo.get('open_issues_count', 0),
-                    'created_at': repo.get('created_at'),
-                    'updated_at': repo.get('updated_at'),
-                    'pushed_at': repo.get('pushed_at'),
-                    'private': repo.get('private', False),
-                    'fork': repo.get('fork', False),
-                    'archived': repo.get('archived', False),
-                    'disabled': repo.get('disabled', False),
-                    'topics': repo.get('topics', [])
-                })
-            
-            return repos
-            
-        except Exception as e:
-            logger.warning(f"Failed to get repositories for {username}: {e}")
-            return []
+        response = await self._get_paginated(url, self.max_repos, headers=headers, params=params)
+        
+        return [self._format_repository(repo) for repo in response]
+    
+    async def iter_user_repositories(self, username: str,
+                                     limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream user repositories page by page without holding them all in memory"""
+        url = f"{self.base_url}/users/{username}/repos"
+        headers = {}
+        
+        if self.api_token:
+            headers['Authorization'] = f"token {self.api_token}"
+        
+        params = {'sort': 'updated'}
+        
+        async for repo in self._iter_pages(url, headers=headers, params=params, limit=limit):
+            yield self._format_repository(repo)
+    
+    async def iter_org_members(self, org: str, limit: Optional[int] = None) -> AsyncIterator[str]:
+        """Stream the public members of an organization"""
+        url = f"{self.base_url}/orgs/{org}/members"
+        headers = {}
+        
+        if self.api_token:
+            headers['Authorization'] = f"token {self.api_token}"
+        
+        async for member in self._iter_pages(url, headers=headers, limit=limit):
+            if member.get('login'):
+                yield member['login']
+    
+    def _format_repository(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a repository returned by the REST API"""
+        return {
+            'name': repo.get('name'),
+            'full_name': repo.get('full_name'),
+            'description': repo.get('description'),
+            'html_url': repo.get('html_url'),
+            'clone_url': repo.get('clone_url'),
+            'language': repo.get('language'),
+            'size': repo.get('size'),
+            'stargazers_count': repo.get('stargazers_count', 0),
+            'watchers_count': repo.get('watchers_count', 0),
+            'forks_count': repo.get('forks_count', 0),
+            'open_issues_count': repo.get('open_issues_count', 0),
+            'created_at': repo.get('created_at'),
+            'updated_at': repo.get('updated_at'),
+            'pushed_at': repo.get('pushed_at'),
+            'private': repo.get('private', False),
+            'fork': repo.get('fork', False),
+            'archived': repo.get('archived', False),
+            'disabled': repo.get('disabled', False),
+            'topics': repo.get('topics', [])
+        }
     
     async def _get_user_gists(self, username: str) -> List[Dict[str, Any]]:
         """Get user gists"""
@@ -161,27 +287,22 @@ class GitHubRecon(BaseReconModule):
         if self.api_token:
             headers['Authorization'] = f"token {self.api_token}"
         
-        try:
-            response = await self.make_request(url, headers=headers)
-            
-            gists = []
-            for gist in response[:50]:  # Limit to 50 gists
-                gists.append({
-                    'id': gist.get('id'),
-                    'description': gist.get('description'),
-                    'html_url': gist.get('html_url'),
-                    'public': gist.get('public', False),
-                    'created_at': gist.get('created_at'),
-                    'updated_at': gist.get('updated_at'),
-                    'files': list(gist.get('files', {}).keys()),
-                    'comments': gist.get('comments', 0)
-                })
-            
-            return gists
-            
-        except Exception as e:
-            logger.warning(f"Failed to get gists for {username}: {e}")
-            return []
+        response = await self._get_paginated(url, self.max_gists, headers=headers)
+        
+        gists = []
+        for gist in response:
+            gists.append({
+                'id': gist.get('id'),
+                'description': gist.get('description'),
+                'html_url': gist.get('html_url'),
+                'public': gist.get('public', False),
+                'created_at': gist.get('created_at'),
+                'updated_at': gist.get('updated_at'),
+                'files': list(gist.get('files', {}).keys()),
+                'comments': gist.get('comments', 0)
+            })
+        
+        return gists
     
     async def _get_user_organizations(self, username: str) -> List[Dict[str, Any]]:
         """Get user organizations"""
@@ -191,23 +312,18 @@ class GitHubRecon(BaseReconModule):
         if self.api_token:
             headers['Authorization'] = f"token {self.api_token}"
         
-        try:
-            response = await self.make_request(url, headers=headers)
-            
-            orgs = []
-            for org in response:
-                orgs.append({
-                    'login': org.get('login'),
-                    'description': org.get('description'),
-                    'html_url': org.get('html_url'),
-                    'avatar_url': org.get('avatar_url')
-                })
-            
-            return orgs
-            
-        except Exception as e:
-            logger.warning(f"Failed to get organizations for {username}: {e}")
-            return []
+        response = await self._get_paginated(url, self.max_organizations, headers=headers)
+        
+        orgs = []
+        for org in response:
+            orgs.append({
+                'login': org.get('login'),
+                'description': org.get('description'),
+                'html_url': org.get('html_url'),
+                'avatar_url': org.get('avatar_url')
+            })
+        
+        return orgs
     
     async def _get_user_events(self, username: str) -> List[Dict[str, Any]]:
         """Get user recent events"""
@@ -217,23 +333,235 @@ class GitHubRecon(BaseReconModule):
         if self.api_token:
             headers['Authorization'] = f"token {self.api_token}"
         
+        response = await self._get_paginated(url, self.max_events, headers=headers)
+        
+        events = []
+        for event in response:
+            events.append({
+                'type': event.get('type'),
+                'repo': event.get('repo', {}).get('name'),
+                'created_at': event.get('created_at'),
+                'public': event.get('public', False)
+            })
+        
+        return events
+    
+    async def _get_paginated(self, url: str, limit: int, headers: Optional[Dict[str, str]] = None,
+                             params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch up to limit items from a paginated endpoint
+        
+        The first page reveals the last page number through the Link header;
+        the remaining pages are then fetched concurrently.
+        """
+        if limit <= 0:
+            return []
+        
+        per_page = min(limit, 100)
+        params = dict(params or {}, per_page=per_page)
+        
+        first_page, response_headers = await self.make_request_with_headers(
+            url, headers=headers, params=dict(params, page=1)
+        )
+        items = list(first_page)
+        
+        links = self._parse_link_header(response_headers.get('Link'))
+        last_page = self._page_number(links.get('last'))
+        pages_needed = min(last_page or 1, -(-limit // per_page))
+        
+        if pages_needed > 1:
+            semaphore = asyncio.Semaphore(self.page_concurrency)
+            
+            async def fetch_page(page: int) -> List[Dict[str, Any]]:
+                async with semaphore:
+                    return await self.make_request(url, headers=headers, params=dict(params, page=page))
+            
+            pages = await asyncio.gather(*(fetch_page(page) for page in range(2, pages_needed + 1)))
+            for page in pages:
+                items.extend(page)
+        
+        return items[:limit]
+    
+    async def _iter_pages(self, url: str, headers: Optional[Dict[str, str]] = None,
+                          params: Optional[Dict[str, Any]] = None,
+                          limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream items from a paginated endpoint by following rel="next" links
+        
+        The next page is prefetched while the current one is being consumed.
+        """
+        pending = asyncio.ensure_future(
+            self.make_request_with_headers(url, headers=headers, params=dict(params or {}, per_page=100))
+        )
+        yielded = 0
+        
         try:
-            response = await self.make_request(url, headers=headers)
+            while pending is not None:
+                response, response_headers = await pending
+                pending = None
+                
+                next_url = self._parse_link_header(response_headers.get('Link')).get('next')
+                if next_url and (limit is None or yielded + len(response) < limit):
+                    pending = asyncio.ensure_future(
+                        self.make_request_with_headers(next_url, headers=headers)
+                    )
+                
+                for item in response:
+                    if limit is not None and yielded >= limit:
+                        return
+                    yielded += 1
+                    yield item
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    @staticmethod
+    def _parse_link_header(link_header: Optional[str]) -> Dict[str, str]:
+        """Parse an RFC 5988 Link header into a rel -> URL mapping"""
+        links = {}
+        for match in re.finditer(r'<([^>]+)>\s*;\s*rel="([^"]+)"', link_header or ""):
+            for rel in match.group(2).split():
+                links[rel] = match.group(1)
+        return links
+    
+    @staticmethod
+    def _page_number(url: Optional[str]) -> Optional[int]:
+        """Extract the page query parameter from a pagination URL"""
+        if not url:
+            return None
+        page = parse_qs(urlparse(url).query).get('page')
+        try:
+            return int(page[0]) if page else None
+        except ValueError:
+            return None
+    
+    async def _get_graphql_users(self, usernames: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch profile, repositories, gists and organizations for many users
+        
+        Users are batched into aliased queries (u0: user(login: ...) u1: ...)
+        of graphql_batch_size users each. Unknown users map to None.
+        """
+        headers = {'Authorization': f"bearer {self.api_token}"}
+        variables = {
+            'repos': min(self.max_repos, 100) if self.include_repos else 0,
+            'gists': min(self.max_gists, 100) if self.include_gists else 0,
+            'orgs': min(self.max_organizations, 100)
+        }
+        
+        async def fetch_batch(batch: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+            aliases = " ".join(
+                f"u{i}: user(login: {json.dumps(login)}) {{ ...UserFields }}"
+                for i, login in enumerate(batch)
+            )
+            query = f"query($repos: Int!, $gists: Int!, $orgs: Int!) {{ {aliases} }} {GRAPHQL_USER_FRAGMENT}"
             
-            events = []
-            for event in response[:20]:  # Limit to 20 recent events
-                events.append({
-                    'type': event.get('type'),
-                    'repo': event.get('repo', {}).get('name'),
-                    'created_at': event.get('created_at'),
-                    'public': event.get('public', False)
-                })
+            response = await self.make_request(
+                f"{self.base_url}/graphql", method="POST", headers=headers,
+                json={'query': query, 'variables': variables}
+            )
             
-            return events
+            data = response.get('data') or {}
+            errors = [e for e in response.get('errors', []) if e.get('type') != 'NOT_FOUND']
+            if errors and not data:
+                raise APIException(
+                    f"GraphQL error: {'; '.join(e.get('message', '') for e in errors)}",
+                    api_name="github"
+                )
             
-        except Exception as e:
-            logger.warning(f"Failed to get events for {username}: {e}")
-            return []
+            return {
+                login: self._format_graphql_user(data[f"u{i}"]) if data.get(f"u{i}") else None
+                for i, login in enumerate(batch)
+            }
+        
+        batches = [
+            usernames[i:i + self.graphql_batch_size]
+            for i in range(0, len(usernames), self.graphql_batch_size)
+        ]
+        users = {}
+        for batch_users in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+            users.update(batch_users)
+        return users
+    
+    def _format_graphql_user(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a GraphQL user node into the REST result sections"""
+        repositories = user.get('repositories') or {}
+        gists = user.get('gists') or {}
+        
+        profile = {
+            'username': user.get('login'),
+            'name': user.get('name'),
+            'bio': user.get('bio'),
+            'location': user.get('location'),
+            'company': user.get('company'),
+            'email': user.get('email') or None,
+            'blog': user.get('websiteUrl') or "",
+            'twitter_username': user.get('twitterUsername'),
+            'avatar_url': user.get('avatarUrl'),
+            'html_url': user.get('url'),
+            'created_at': user.get('createdAt'),
+            'updated_at': user.get('updatedAt'),
+            'public_repos': repositories.get('totalCount', 0),
+            'public_gists': gists.get('totalCount', 0),
+            'followers': (user.get('followers') or {}).get('totalCount', 0),
+            'following': (user.get('following') or {}).get('totalCount', 0),
+            'hireable': user.get('isHireable'),
+            'type': 'User',
+            'site_admin': user.get('isSiteAdmin', False)
+        }
+        
+        repos = []
+        for repo in repositories.get('nodes') or []:
+            repos.append({
+                'name': repo.get('name'),
+                'full_name': repo.get('nameWithOwner'),
+                'description': repo.get('description'),
+                'html_url': repo.get('url'),
+                'clone_url': f"{repo.get('url')}.git",
+                'language': (repo.get('primaryLanguage') or {}).get('name'),
+                'size': repo.get('diskUsage'),
+                'stargazers_count': repo.get('stargazerCount', 0),
+                'watchers_count': repo.get('stargazerCount', 0),
+                'forks_count': repo.get('forkCount', 0),
+                'open_issues_count': (repo.get('issues') or {}).get('totalCount', 0),
+                'created_at': repo.get('createdAt'),
+                'updated_at': repo.get('updatedAt'),
+                'pushed_at': repo.get('pushedAt'),
+                'private': repo.get('isPrivate', False),
+                'fork': repo.get('isFork', False),
+                'archived': repo.get('isArchived', False),
+                'disabled': repo.get('isDisabled', False),
+                'topics': [
+                    node['topic']['name']
+                    for node in (repo.get('repositoryTopics') or {}).get('nodes', [])
+                ]
+            })
+        
+        gists_data = []
+        for gist in gists.get('nodes') or []:
+            gists_data.append({
+                'id': gist.get('name'),
+                'description': gist.get('description'),
+                'html_url': gist.get('url'),
+                'public': gist.get('isPublic', False),
+                'created_at': gist.get('createdAt'),
+                'updated_at': gist.get('updatedAt'),
+                'files': [f.get('name') for f in gist.get('files') or []],
+                'comments': (gist.get('comments') or {}).get('totalCount', 0)
+            })
+        
+        orgs = []
+        for org in (user.get('organizations') or {}).get('nodes') or []:
+            orgs.append({
+                'login': org.get('login'),
+                'description': org.get('description'),
+                'html_url': org.get('url'),
+                'avatar_url': org.get('avatarUrl')
+            })
+        
+        return {
+            'profile': profile,
+            'repositories': repos,
+            'gists': gists_data,
+            'organizations': orgs
+        }
     
     def _generate_statistics(self, profile: Dict, repos: List, gists: List) -> Dict[str, Any]:
         """Generate statistics from collected data"""
@@ -270,4 +598,83 @@ class GitHubRecon(BaseReconModule):
             age = datetime.now(created.tzinfo) - created
             stats['account_age_days'] = age.days
         
-        return stats 
\ No newline at end of file
+        return stats 
+
+
+class GitHubOrgAggregate:
+    """Organization-level roll-up of member investigations, updated as members finish"""
+    
+    def __init__(self, org: str, top_n: int = 10):
+        self.org = org
+        self.top_n = top_n
+        self.members_total = 0
+        self.members_failed = 0
+        self.total_repos = 0
+        self.total_stars = 0
+        self.languages: Counter = Counter()
+        self.repo_activity: Counter = Counter()
+        self.repo_stars: Dict[str, int] = {}
+        self.emails: Set[str] = set()
+    
+    def add(self, username: str, result: Dict[str, Any]):
+        """Fold one member's investigation result into the aggregate"""
+        self.members_total += 1
+        if not result.get('success') or not result.get('data'):
+            self.members_failed += 1
+            return
+        
+        data = result['data']
+        email = (data.get('profile') or {}).get('email')
+        if email:
+            self.emails.add(email)
+        
+        for repo in data.get('repositories', []):
+            self.total_repos += 1
+            self.total_stars += repo.get('stargazers_count', 0)
+            if repo.get('language'):
+                self.languages[repo['language']] += 1
+            self._track_starred(repo.get('full_name'), repo.get('stargazers_count', 0))
+        
+        for event in data.get('recent_activity', []):
+            if event.get('repo'):
+                self.repo_activity[event['repo']] += 1
+        self._prune_activity()
+    
+    def _prune_activity(self):
+        """Keep activity counts for a bounded set of the busiest repositories
+        
+        Repositories dropped here start from zero if they show up again, so
+        counts are approximate for large organizations, but the busiest
+        repositories stay on top while memory stays bounded.
+        """
+        if len(self.repo_activity) > self.top_n * 20:
+            self.repo_activity = Counter(dict(self.repo_activity.most_common(self.top_n * 10)))
+    
+    def _track_starred(self, name: Optional[str], stars: int):
+        """Keep only the most starred repositories seen so far"""
+        if not name:
+            return
+        self.repo_stars[name] = stars
+        if len(self.repo_stars) > self.top_n * 4:
+            kept = heapq.nlargest(self.top_n, self.repo_stars.items(), key=lambda item: item[1])
+            self.repo_stars = dict(kept)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the aggregate as a plain dictionary"""
+        return {
+            'organization': self.org,
+            'members_investigated': self.members_total,
+            'members_failed': self.members_failed,
+            'total_repos': self.total_repos,
+            'total_stars': self.total_stars,
+            'languages': dict(self.languages.most_common()),
+            'most_active_repos': [
+                {'name': name, 'events': count}
+                for name, count in self.repo_activity.most_common(self.top_n)
+            ],
+            'most_starred_repos': [
+                {'name': name, 'stars': stars}
+                for name, stars in heapq.nlargest(self.top_n, self.repo_stars.items(), key=lambda item: item[1])
+            ],
+            'member_emails': sorted(self.emails)
+        }
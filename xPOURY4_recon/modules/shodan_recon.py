@@ -5,11 +5,167 @@ Author: xPOURY4
 
 import re
 import socket
-from typing import Dict, Any, List
+import asyncio
+import ipaddress
+from collections import Counter
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Union
 from .base_module import BaseReconModule
 from ..core.config_manager import config
 from ..core.logger import logger
 from ..core.exceptions import ValidationException, APIException
+from ..core.host_store import HostStore
+
+
+def _global_blocks(network: Union[ipaddress.IPv4Network, ipaddress.IPv6Network],
+                   on_skip: Optional[Callable[[str, str], None]] = None
+                   ) -> Iterator[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """Split a network into blocks of at most 256 addresses, dropping wholly non-global parts
+    
+    Halves that lie entirely in private, shared (CGNAT) or reserved space
+    are skipped in one step, so ranges such as 100.64.0.0/10 cost a few
+    checks instead of one per address.
+    """
+    pending = [network]
+    while pending:
+        block = pending.pop()
+        if not block.is_global:
+            if on_skip:
+                on_skip(str(block), 'non-global network')
+        elif block.num_addresses <= 256:
+            yield block
+        else:
+            pending.extend(reversed(list(block.subnets(prefixlen_diff=1))))
+
+
+def expand_ip_targets(entries: Iterable[str],
+                      on_skip: Optional[Callable[[str, str], None]] = None) -> Iterator[str]:
+    """Lazily expand IP addresses and CIDR blocks into individual addresses
+    
+    Private, reserved and other non-global addresses are skipped (and passed
+    to on_skip with the reason); wholly non-global parts of a block are
+    skipped without walking them. Entries that are not IPs are yielded as-is
+    so the caller can report them as invalid.
+    """
+    for entry in entries:
+        entry = entry.strip()
+        try:
+            if '/' in entry:
+                network = ipaddress.ip_network(entry, strict=False)
+                if network.num_addresses > 2:
+                    addresses = (address for block in _global_blocks(network, on_skip) for address in block
+                                 if address not in (network.network_address, network.broadcast_address))
+                else:
+                    addresses = iter(network)
+            else:
+                addresses = iter([ipaddress.ip_address(entry)])
+        except ValueError:
+            yield entry
+            continue
+        
+        for address in addresses:
+            if address.is_global:
+                yield str(address)
+            elif on_skip:
+                on_skip(str(address), 'non-global address')
+
+
+class ShodanBulkAggregate:
+    """Running roll-up of bulk host lookups, updated as each host finishes
+    
+    Only counters are kept, so memory does not grow with the number of hosts.
+    """
+    
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self.hosts_total = 0
+        self.hosts_found = 0
+        self.hosts_without_data = 0
+        self.hosts_failed = 0
+        self.hosts_skipped = 0
+        self.ports: Counter = Counter()
+        self.vulns: Counter = Counter()
+        self.countries: Counter = Counter()
+        self.organizations: Counter = Counter()
+    
+    def skip(self, target: str, reason: str):
+        """Count an address that was not looked up"""
+        self.hosts_skipped += 1
+        logger.debug(f"Skipping {target}: {reason}")
+    
+    def add(self, ip: str, result: Dict[str, Any]):
+        """Fold one host's lookup result into the aggregate"""
+        self.hosts_total += 1
+        if not result.get('success') or not result.get('data'):
+            self.hosts_failed += 1
+            return
+        
+        info = result['data']
+        if info.get('error'):
+            self.hosts_without_data += 1
+            return
+        
+        self.hosts_found += 1
+        self.ports.update(info.get('ports', []))
+        self.vulns.update(info.get('vulns', []))
+        if info.get('country_name'):
+            self.countries[info['country_name']] += 1
+        if info.get('organization'):
+            self.organizations[info['organization']] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the aggregate as a plain dictionary"""
+        return {
+            'hosts_investigated': self.hosts_total,
+            'hosts_found': self.hosts_found,
+            'hosts_without_data': self.hosts_without_data,
+            'hosts_failed': self.hosts_failed,
+            'hosts_skipped': self.hosts_skipped,
+            'ports': dict(self.ports.most_common(self.top_n)),
+            'vulnerabilities': dict(self.vulns.most_common(self.top_n)),
+            'total_vulnerabilities': sum(self.vulns.values()),
+            'countries': dict(self.countries.most_common()),
+            'organizations': dict(self.organizations.most_common(self.top_n))
+        }
+
+
+class ShodanSearchSummary:
+    """Facet counts over streamed search matches, updated as each match arrives
+    
+    Shodan's own facets (computed over the whole result set) are kept next
+    to the local counts, which only cover the pages actually fetched.
+    """
+    
+    FIELDS = ('port', 'country', 'org', 'product', 'asn', 'vulns')
+    
+    def __init__(self, query: str, top_n: int = 20):
+        self.query = query
+        self.top_n = top_n
+        self.total: Optional[int] = None
+        self.matches = 0
+        self.pages = 0
+        self.server_facets: Dict[str, List[Dict[str, Any]]] = {}
+        self.facets: Dict[str, Counter] = {field: Counter() for field in self.FIELDS}
+    
+    def add(self, match: Dict[str, Any]):
+        """Fold one search match into the facet counts"""
+        self.matches += 1
+        for field in self.FIELDS:
+            value = match.get(field)
+            if field == 'vulns':
+                self.facets[field].update(value or [])
+            elif value is not None:
+                self.facets[field][value] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the summary as a plain dictionary"""
+        return {
+            'query': self.query,
+            'total': self.total,
+            'matches_fetched': self.matches,
+            'pages_fetched': self.pages,
+            'facets': {field: dict(counts.most_common(self.top_n)) for field, counts in self.facets.items()},
+            'server_facets': self.server_facets
+        }
 
 
 class ShodanRecon(BaseReconModule):
@@ -19,10 +175,18 @@ class ShodanRecon(BaseReconModule):
         super().__init__("shodan_recon")
         self.api_key = config.get("api_keys.shodan_api_key")
         self.base_url = "https://api.shodan.io"
+        self.max_ips = config.get("modules.shodan_recon.max_ips", 20)
+        self.search_max_pages = config.get("modules.shodan_recon.search.max_pages", 10)
+        self.search_facets = config.get("modules.shodan_recon.search.facets", ["port", "country", "org", "product"])
+        self.host_concurrency = config.get("modules.shodan_recon.host_concurrency", 4)
+        self.cache_only = config.get("modules.shodan_recon.host_store.cache_only", False)
+        self.host_store = None
+        if config.get("modules.shodan_recon.host_store.enabled", True) or self.cache_only:
+            self.host_store = HostStore()
     
     def is_configured(self) -> bool:
-        """Check if Shodan API key is configured"""
-        return bool(self.api_key and self.api_key != "")
+        """Check if Shodan API key is configured (cache-only mode needs none)"""
+        return bool(self.api_key and self.api_key != "") or self.cache_only
     
     def _validate_ip(self, ip: str) -> bool:
         """Validate IP address format"""
@@ -59,13 +223,110 @@ class ShodanRecon(BaseReconModule):
                 elif is_domain:
                     # Domain lookup - first resolve to IP, then investigate
                     ips = await self._resolve_domain(target)
-                    result_data = await self._investigate_domain(target, ips)
+                    result_data = await self._investigate_domain(
+                        target, ips, max_ips=kwargs.get('max_ips', self.max_ips)
+                    )
                 
                 return self.format_result(True, result_data)
                 
         except Exception as e:
             logger.error(f"Shodan reconnaissance failed for {target}: {e}")
-            return self.format_result(False, error=str(e))
+            return self.failure_result(e)
+    
+    async def investigate_many(self, ips: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Look up the Shodan host records of several IPs
+        
+        Used by bulk mode: only /shodan/host is queried (no history), and the
+        shared rate limiter paces the lookups across all workers.
+        """
+        async def lookup(ip: str) -> Dict[str, Any]:
+            try:
+                if not self.is_configured():
+                    raise ValidationException("Shodan API key not configured")
+                ipaddress.ip_address(ip)
+                return self.format_result(True, await self._get_host_info(ip))
+            except ValueError:
+                return self.format_result(False, error=f"Invalid IP address: {ip}")
+            except Exception as e:
+                logger.warning(f"Shodan lookup failed for {ip}: {e}")
+                return self.failure_result(e)
+        
+        async with self:
+            return list(await asyncio.gather(*(lookup(ip) for ip in ips)))
+    
+    async def iter_search(self, query: str, max_pages: Optional[int] = None,
+                          summary: Optional[ShodanSearchSummary] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the matches of a /shodan/host/search query page by page
+        
+        The next page is prefetched while the current one is being consumed,
+        so at most two pages are held at once. Every page costs a query
+        credit, hence max_pages (0 or None in config means no limit). When a
+        summary is given its facet counts are updated as matches are yielded.
+        """
+        if not query or not query.strip():
+            raise ValidationException("Empty Shodan search query")
+        if self.cache_only:
+            raise ValidationException("Shodan search is not available in cache-only mode")
+        
+        max_pages = self.search_max_pages if max_pages is None else max_pages
+        url = f"{self.base_url}/shodan/host/search"
+        
+        def fetch(page: int) -> asyncio.Future:
+            params = {'key': self.api_key, 'query': query, 'page': page}
+            if page == 1 and self.search_facets:
+                params['facets'] = ','.join(self.search_facets)
+            return asyncio.ensure_future(self.make_request(url, params=params))
+        
+        page = 1
+        pending = fetch(page)
+        try:
+            while pending is not None:
+                response = await pending
+                pending = None
+                matches = response.get('matches', [])
+                
+                if summary is not None:
+                    summary.pages += 1
+                    if page == 1:
+                        summary.total = response.get('total')
+                        summary.server_facets = response.get('facets', {})
+                
+                pages_total = -(-(response.get('total') or 0) // 100)
+                if matches and page < pages_total and not (max_pages and page >= max_pages):
+                    page += 1
+                    pending = fetch(page)
+                
+                for match in matches:
+                    item = self._extract_match(match)
+                    if summary is not None:
+                        summary.add(item)
+                    yield item
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    def _extract_match(self, match: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalise one search match (a single service banner)"""
+        location = match.get('location') or {}
+        certificate = ((match.get('ssl') or {}).get('cert') or {}).get('subject') or {}
+        return {
+            'ip': match.get('ip_str'),
+            'port': match.get('port'),
+            'transport': match.get('transport'),
+            'hostnames': match.get('hostnames', []),
+            'domains': match.get('domains', []),
+            'org': match.get('org'),
+            'isp': match.get('isp'),
+            'asn': match.get('asn'),
+            'country': location.get('country_code'),
+            'city': location.get('city'),
+            'product': match.get('product'),
+            'version': match.get('version'),
+            'vulns': list(match.get('vulns') or []),
+            'ssl_subject_cn': certificate.get('CN'),
+            'banner': (match.get('data') or '')[:200],
+            'timestamp': match.get('timestamp')
+        }
     
     async def _investigate_ip(self, ip: str) -> Dict[str, Any]:
         """Investigate specific IP address"""
@@ -83,44 +344,94 @@ class ShodanRecon(BaseReconModule):
             'statistics': self._generate_ip_statistics(host_info)
         }
     
-    async def _investigate_domain(self, domain: str, ips: List[str]) -> Dict[str, Any]:
-        """Investigate domain and its associated IPs"""
+    async def _investigate_domain(self, domain: str, ips: List[str],
+                                  max_ips: Optional[int] = None) -> Dict[str, Any]:
+        """Investigate domain and its associated IPs
+        
+        The DNS lookup and the host lookups run side by side; the host lookups
+        are pipelined and paced by the shared rate limiter, so they go out at
+        the rate configured for api.shodan.io. max_ips caps how many resolved
+        addresses are looked up (0 or None looks up all of them).
+        """
+        max_ips = self.max_ips if max_ips is None else max_ips
+        selected = ips[:max_ips] if max_ips else ips
+        
+        results, errors, _ = await self.gather_sections({
+            'dns_info': self._get_dns_info(domain),
+            'hosts': self._get_hosts_info(selected)
+        })
+        
         domain_data = {
             'target': domain,
             'type': 'domain',
             'resolved_ips': ips,
-            'hosts': [],
-            'dns_info': await self._get_dns_info(domain)
+            'hosts': results.get('hosts', []),
+            'dns_info': results.get('dns_info', {'error': errors.get('dns_info')})
         }
-        
-        # Investigate each resolved IP
-        for ip in ips[:5]:  # Limit to 5 IPs to avoid rate limiting
-            try:
-                host_info = await self._get_host_info(ip)
-                domain_data['hosts'].append({
-                    'ip': ip,
-                    'info': host_info
-                })
-                await self.rate_limit()  # Rate limiting
-            except Exception as e:
-                logger.warning(f"Failed to get info for IP {ip}: {e}")
+        if len(selected) < len(ips):
+            domain_data['skipped_ips'] = ips[len(selected):]
         
         domain_data['statistics'] = self._generate_domain_statistics(domain_data)
         return domain_data
     
+    async def _get_hosts_info(self, ips: List[str]) -> List[Dict[str, Any]]:
+        """Look up many IPs concurrently, keeping the order they were given in"""
+        found: List[Optional[Dict[str, Any]]] = [None] * len(ips)
+        pending = iter(enumerate(ips))
+        
+        async def worker():
+            for index, ip in pending:
+                try:
+                    found[index] = {'ip': ip, 'info': await self._get_host_info(ip)}
+                except Exception as e:
+                    logger.warning(f"Failed to get info for IP {ip}: {e}")
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.host_concurrency, len(ips)))))
+        return [host for host in found if host is not None]
+    
     async def _resolve_domain(self, domain: str) -> List[str]:
         """Resolve domain to IP addresses"""
         try:
-            import asyncio
-            loop = asyncio.get_event_loop()
-            _, _, ips = await loop.run_in_executor(None, socket.gethostbyname_ex, domain)
-            return ips
+            return await self.resolve_host(domain)
         except Exception as e:
             logger.warning(f"Failed to resolve domain {domain}: {e}")
             return []
     
+    async def _stored(self, kind: str, ip: str,
+                      fetch: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Serve a host record from the local store while fresh, else fetch and store it
+        
+        In cache-only mode stored records are served however old they are and
+        Shodan is never called.
+        """
+        if self.host_store is None:
+            return await fetch(ip)
+        
+        stored = self.host_store.get(kind, ip)
+        if stored is not None:
+            record, fresh = stored
+            if fresh or self.cache_only:
+                return {**record, 'cached': True, 'stale': not fresh}
+        if self.cache_only:
+            return {'error': 'Not in the local host store (cache-only mode)'}
+        
+        record = await fetch(ip)
+        self.host_store.put(kind, ip, record)
+        return record
+    
     async def _get_host_info(self, ip: str) -> Dict[str, Any]:
-        """Get host information from Shodan"""
+        """Get host information from Shodan (or the local host store)"""
+        return await self._stored('host', ip, self._fetch_host_info)
+    
+    async def _get_host_history(self, ip: str) -> Dict[str, Any]:
+        """Get host history from Shodan (or the local host store)"""
+        try:
+            return await self._stored('history', ip, self._fetch_host_history)
+        except APIException as e:
+            return {'error': str(e)}
+    
+    async def _fetch_host_info(self, ip: str) -> Dict[str, Any]:
+        """Fetch host information from Shodan"""
         try:
             url = f"{self.base_url}/shodan/host/{ip}"
             params = {'key': self.api_key}
@@ -152,8 +463,8 @@ class ShodanRecon(BaseReconModule):
                 return {'error': 'No information available for this IP'}
             raise
     
-    async def _get_host_history(self, ip: str) -> Dict[str, Any]:
-        """Get host history from Shodan"""
+    async def _fetch_host_history(self, ip: str) -> Dict[str, Any]:
+        """Fetch host history from Shodan"""
         try:
             url = f"{self.base_url}/shodan/host/{ip}/history"
             params = {'key': self.api_key}
@@ -179,10 +490,12 @@ class ShodanRecon(BaseReconModule):
         except APIException as e:
             if e.status_code == 404:
                 return {'error': 'No history available for this IP'}
-            return {'error': str(e)}
+            raise
     
     async def _get_dns_info(self, domain: str) -> Dict[str, Any]:
         """Get DNS information for domain"""
+        if self.cache_only:
+            return {'error': 'DNS information is not available in cache-only mode'}
         try:
             url = f"{self.base_url}/dns/domain/{domain}"
             params = {'key': self.api_key}
@@ -3,8 +3,10 @@ Flask web application for xPOURY4 Recon
 Author: xPOURY4
 """
 
+import atexit
 import asyncio
 import json
+import threading
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 from flask_socketio import SocketIO, emit
@@ -29,12 +31,30 @@ def create_app():
     # Initialize ReconEngine
     recon_engine = ReconEngine()
     
+    # One long-lived event loop serves every request, so the pooled HTTP
+    # session (bound to its loop) keeps connections alive between requests
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="recon-event-loop", daemon=True).start()
+    
+    def run_async(coro):
+        """Run a coroutine on the shared event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+    
+    @atexit.register
+    def shutdown():
+        """Release pooled connections and open stores when the app exits"""
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(recon_engine.close(), loop).result(timeout=10)
+            loop.call_soon_threadsafe(loop.stop)
+    
     @app.route('/')
     def index():
         """Main dashboard"""
         module_status = recon_engine.get_module_status()
+        budget_status = recon_engine.get_budget_status()
         return render_template('index.html', 
                              module_status=module_status,
+                             budget_status=budget_status,
                              version="1.0.0",
                              author="xPOURY4")
     
@@ -90,11 +110,7 @@ def create_app():
             if not username:
                 return jsonify({'error': 'Username is required'}), 400
             
-            # Run investigation in background
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(recon_engine.run_github_recon(username))
-            loop.close()
+            result = run_async(recon_engine.run_github_recon(username))
             
             return jsonify(result)
             
@@ -112,10 +128,7 @@ def create_app():
             if not domain:
                 return jsonify({'error': 'Domain is required'}), 400
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(recon_engine.run_domain_recon(domain))
-            loop.close()
+            result = run_async(recon_engine.run_domain_recon(domain))
             
             return jsonify(result)
             
@@ -133,10 +146,7 @@ def create_app():
             if not phone_number:
                 return jsonify({'error': 'Phone number is required'}), 400
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(recon_engine.run_phone_recon(phone_number))
-            loop.close()
+            result = run_async(recon_engine.run_phone_recon(phone_number))
             
             return jsonify(result)
             
@@ -158,15 +168,12 @@ def create_app():
             if not first_name or not last_name:
                 return jsonify({'error': 'First and last name are required'}), 400
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
+            result = run_async(
                 recon_engine.run_linkedin_recon(
                     first_name, last_name, 
                     company=company, location=location, keywords=keywords
                 )
             )
-            loop.close()
             
             return jsonify(result)
             
@@ -184,10 +191,7 @@ def create_app():
             if not target:
                 return jsonify({'error': 'Target is required'}), 400
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(recon_engine.run_shodan_recon(target))
-            loop.close()
+            result = run_async(recon_engine.run_shodan_recon(target))
             
             return jsonify(result)
             
@@ -205,10 +209,7 @@ def create_app():
             if not targets:
                 return jsonify({'error': 'At least one target is required'}), 400
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(recon_engine.run_comprehensive_recon(targets))
-            loop.close()
+            result = run_async(recon_engine.run_comprehensive_recon(targets))
             
             return jsonify(result)
             
@@ -224,6 +225,7 @@ def create_app():
             return jsonify({
                 'status': 'ok',
                 'modules': status,
+                'budget': recon_engine.get_budget_status(),
                 'timestamp': datetime.now().isoformat()
             })
         except Exception as e:
@@ -281,37 +283,32 @@ def create_app():
             emit('investigation_started', {'type': investigation_type})
             
             # Run investigation based on type
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
             if investigation_type == 'github':
-                result = loop.run_until_complete(
+                result = run_async(
                     recon_engine.run_github_recon(params.get('username'))
                 )
             elif investigation_type == 'domain':
-                result = loop.run_until_complete(
+                result = run_async(
                     recon_engine.run_domain_recon(params.get('domain'))
                 )
             elif investigation_type == 'phone':
-                result = loop.run_until_complete(
+                result = run_async(
                     recon_engine.run_phone_recon(params.get('phone_number'))
                 )
             elif investigation_type == 'linkedin':
-                result = loop.run_until_complete(
+                result = run_async(
                     recon_engine.run_linkedin_recon(
                         params.get('first_name'), params.get('last_name'),
                         **{k: v for k, v in params.items() if k not in ['first_name', 'last_name']}
                     )
                 )
             elif investigation_type == 'shodan':
-                result = loop.run_until_complete(
+                result = run_async(
                     recon_engine.run_shodan_recon(params.get('target'))
                 )
             else:
                 result = {'error': 'Unknown investigation type'}
             
-            loop.close()
-            
             emit('investigation_complete', {
                 'type': investigation_type,
                 'result': result